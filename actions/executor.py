@@ -1,5 +1,6 @@
 from typing import Any, Dict, List
 
+from actions.tool_runner import submit_call
 from core.memory import add_memory_item
 from core.goals import update_goal
 from utils.logging_utils import log_internal
@@ -12,7 +13,9 @@ RESET = "\033[0m"
 def execute_actions(actions: List[Dict[str, Any]], decision: Dict[str, Any], state: Dict[str, Any]) -> None:
     """
     Execute an ActionPlan produced by the conscious layer.
-    For now, we just print responses and apply simple updates.
+    Responses and store updates are applied inline; tool calls are only
+    started here and report back as percepts (see actions/tool_runner.py),
+    so they run in parallel with each other and never hold up the tick.
     """
 
     for action in actions:
@@ -36,6 +39,11 @@ def execute_actions(actions: List[Dict[str, Any]], decision: Dict[str, Any], sta
             if goal_id:
                 update_goal(goal_id, **patch)
 
+        elif a_type == "call_tool":
+            tool = payload.get("tool")
+            if tool:
+                submit_call(str(tool), payload.get("args") or {})
+
         elif a_type == "log_internal":
             msg = payload.get("message", "")
             log_internal(msg)
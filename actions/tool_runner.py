@@ -0,0 +1,177 @@
+"""
+Runs tool calls off the tick thread.
+
+`submit_call()` validates the arguments, starts the call and returns right
+away. Plain tools run on a bounded thread pool, `async def` tools on one
+shared event loop thread. Each call has the tool's timeout; when it fires
+(or the tool returns or raises, whichever comes first) the outcome is
+posted as a percept with source "tool", so the mind sees it on a later
+tick like any other input: through the ingest queue while its writer runs,
+written straight to the percept log otherwise (simulations, replays).
+
+A sync tool that overruns its timeout cannot be killed: its timeout
+percept is posted and the late result dropped, but it keeps a worker until
+it returns. MAX_IN_FLIGHT counts those too, so a pile of hung tools makes
+new calls fail fast instead of queueing behind them.
+"""
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict
+
+from actions.tools import ToolSpec, get_tool, validate_args
+from core import ingest
+from core.percepts import record_percept
+from utils import clock
+from utils.logging_utils import log_internal
+from utils.serialization import encode_line
+
+MAX_WORKERS = 4
+MAX_IN_FLIGHT = 16
+RESULT_MAX_CHARS = 1000
+
+_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+_loop: Any = None  # asyncio loop, started with the first async tool call
+_in_flight = 0
+_open_calls: Dict[str, Dict[str, Any]] = {}  # call id -> {"tool", "started", "timer"}
+_stats: Dict[str, int] = {"submitted": 0, "ok": 0, "error": 0, "timeout": 0, "rejected": 0}
+
+
+def configure(**settings: Any) -> None:
+    """Override module settings before the first call, e.g. configure(MAX_WORKERS=8)."""
+    for name, value in settings.items():
+        if name not in globals() or not name.isupper():
+            raise AttributeError(f"Unknown tool runner setting: {name}")
+        globals()[name] = value
+
+
+def get_stats() -> Dict[str, int]:
+    with _lock:
+        stats = dict(_stats)
+        stats["in_flight"] = _in_flight
+    return stats
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="tool")
+        return _executor
+
+
+def _get_loop() -> Any:
+    global _loop
+    import asyncio  # deferred: only async tools need it, and it is a slow import
+
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="tool-loop", daemon=True).start()
+        return _loop
+
+
+def _post(call_id: str, tool: str, status: str, body: Any) -> None:
+    text = body if isinstance(body, str) else encode_line(body)
+    if len(text) > RESULT_MAX_CHARS:
+        text = text[:RESULT_MAX_CHARS] + "…"
+    content, tags = f"[{tool} {call_id}] {status}: {text}", ["tool", tool, status]
+    if ingest.is_running():
+        ingest.submit("tool", content, tags)
+    else:
+        record_percept("tool", content, tags)
+
+
+def _finish(call_id: str, status: str, body: Any) -> None:
+    """Post the outcome of a call; only the first of result/error/timeout counts."""
+    with _lock:
+        call = _open_calls.pop(call_id, None)
+        if call is None:
+            return
+        _stats[status] += 1
+    if call["timer"] is not None:
+        call["timer"].cancel()
+    if status != "ok":
+        log_internal(f"[tools] {call['tool']} {call_id} {status} after {clock.now() - call['started']:.2f}s: {body}")
+    _post(call_id, call["tool"], status, body)
+
+
+def _release(_: Any = None) -> None:
+    global _in_flight
+    with _lock:
+        _in_flight -= 1
+
+
+def _on_done(call_id: str, future: "Future[Any]") -> None:
+    if future.cancelled():
+        _finish(call_id, "error", "cancelled")
+        return
+    exc = future.exception()
+    if isinstance(exc, TimeoutError):  # asyncio.TimeoutError is TimeoutError on 3.11+
+        _finish(call_id, "timeout", "timed out")
+    elif exc is not None:
+        _finish(call_id, "error", f"{type(exc).__name__}: {exc}")
+    else:
+        _finish(call_id, "ok", future.result())
+
+
+def _start(spec: ToolSpec, call_id: str, args: Dict[str, Any]) -> None:
+    if spec.is_async:
+        import asyncio
+
+        coro = asyncio.wait_for(spec.fn(**args), spec.timeout)
+        future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    else:
+        timer = threading.Timer(spec.timeout, _finish, (call_id, "timeout", f"no result within {spec.timeout}s"))
+        timer.daemon = True
+        _open_calls[call_id]["timer"] = timer
+        future = _get_executor().submit(spec.fn, **args)
+        timer.start()
+    future.add_done_callback(_release)
+    future.add_done_callback(lambda f: _on_done(call_id, f))
+
+
+def submit_call(tool: str, args: Dict[str, Any] | None = None) -> str | None:
+    """
+    Start a tool call without waiting for it. Returns its call id, or None if
+    it was rejected (unknown tool, bad arguments, or too many calls in flight);
+    rejections are posted as percepts too, so the model learns about them.
+    """
+    global _in_flight
+    args = args or {}
+    call_id = clock.new_id("call")
+    spec = get_tool(tool)
+    error = f"unknown tool '{tool}'" if spec is None else validate_args(spec, args)
+    if error is None:
+        with _lock:
+            if _in_flight >= MAX_IN_FLIGHT:
+                error = f"too many tool calls in flight ({_in_flight})"
+            else:
+                _in_flight += 1
+                _stats["submitted"] += 1
+                _open_calls[call_id] = {"tool": tool, "started": clock.now(), "timer": None}
+    if error is not None:
+        with _lock:
+            _stats["rejected"] += 1
+        _post(call_id, tool, "rejected", error)
+        return None
+
+    try:
+        _start(spec, call_id, args)
+    except RuntimeError as exc:  # the pool or loop is shutting down
+        _release()
+        _finish(call_id, "error", str(exc))
+        return None
+    return call_id
+
+
+def shutdown() -> None:
+    """Stop accepting work. Running sync tools finish in the background."""
+    global _executor, _loop
+    with _lock:
+        executor, _executor = _executor, None
+        loop, _loop = _loop, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+    if loop is not None:
+        loop.call_soon_threadsafe(loop.stop)
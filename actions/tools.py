@@ -1,14 +1,127 @@
-from typing import Any, Dict
+"""
+Tool registry.
 
+A tool is a function taking keyword arguments that match its declared
+schema and returning something JSON-serializable. Register one with
+`@register_tool(...)`; `async def` tools run on the runner's event loop
+(good for I/O), plain functions run on its thread pool. See
+actions/tool_runner.py for how calls are executed.
 
-def echo_tool(payload: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Placeholder example tool.
+Schemas are a small subset of JSON Schema:
+    {"properties": {"query": {"type": "string"}}, "required": ["query"]}
+"""
+import inspect
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
 
-    In future you might add:
-    - web search
-    - file operations
-    - running code
-    - discord / slack messages
-    """
-    return {"echo": payload}
+from core.percepts import query_percepts
+from utils import clock
+
+DEFAULT_TOOL_TIMEOUT_SECONDS = 10.0
+MAX_TOOL_CALLS_PER_TICK = 3  # the conscious layer starts at most this many per tick
+
+_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ToolSpec:
+    name: str
+    fn: Callable[..., Any]
+    description: str
+    schema: Dict[str, Any]
+    timeout: float
+    is_async: bool
+
+
+_registry: Dict[str, ToolSpec] = {}
+
+
+def register_tool(
+    name: str,
+    description: str,
+    schema: Dict[str, Any] | None = None,
+    timeout: float = DEFAULT_TOOL_TIMEOUT_SECONDS,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator adding a function to the registry under `name`."""
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        _registry[name] = ToolSpec(
+            name=name,
+            fn=fn,
+            description=description,
+            schema=schema or {"properties": {}},
+            timeout=timeout,
+            is_async=inspect.iscoroutinefunction(fn),
+        )
+        return fn
+
+    return decorator
+
+
+def get_tool(name: str) -> ToolSpec | None:
+    return _registry.get(name)
+
+
+def list_tools() -> List[ToolSpec]:
+    return sorted(_registry.values(), key=lambda t: t.name)
+
+
+def validate_args(spec: ToolSpec, args: Dict[str, Any]) -> str | None:
+    """Return an error message if `args` do not fit the tool's schema, else None."""
+    if not isinstance(args, dict):
+        return "arguments must be an object"
+    props = spec.schema.get("properties", {})
+    for key in spec.schema.get("required", []):
+        if key not in args:
+            return f"missing required argument '{key}'"
+    for key, value in args.items():
+        if key not in props:
+            return f"unknown argument '{key}'"
+        expected = _TYPES.get(props[key].get("type", ""))
+        if expected is None:
+            continue
+        # bool is an int subclass; don't let True pass as a number
+        if not isinstance(value, expected) or (isinstance(value, bool) and expected is not bool):
+            return f"argument '{key}' must be of type {props[key]['type']}"
+    return None
+
+
+@register_tool(
+    "echo",
+    "Return the given text unchanged. Useful to check the tool pipeline.",
+    {"properties": {"text": {"type": "string"}}, "required": ["text"]},
+    timeout=1.0,
+)
+def echo_tool(text: str) -> Dict[str, Any]:
+    return {"echo": text}
+
+
+@register_tool(
+    "search_percepts",
+    "Find earlier percepts by source and/or tag, newest first.",
+    {
+        "properties": {
+            "source": {"type": "string"},
+            "tag": {"type": "string"},
+            "last_seconds": {"type": "number"},
+            "limit": {"type": "integer"},
+        }
+    },
+    timeout=2.0,
+)
+def search_percepts_tool(
+    source: str | None = None,
+    tag: str | None = None,
+    last_seconds: float | None = None,
+    limit: int = 5,
+) -> List[Dict[str, Any]]:
+    since = clock.now() - last_seconds if last_seconds is not None else None
+    percepts = query_percepts(source=source, tag=tag, since=since, limit=max(1, min(limit, 20)))
+    return [{"source": p.source, "timestamp": p.timestamp, "content": p.content[:300]} for p in percepts]
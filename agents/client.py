@@ -0,0 +1,88 @@
+"""
+Process-wide model client.
+
+Both layers share one OpenAI client, built on first use rather than at
+import, so importing the agents (tools, benchmarks, replay) costs nothing
+and the process keeps a single HTTP connection pool. The pool is sized for
+the llm call pool plus hedged duplicates and keeps connections alive
+between ticks, so steady-state calls skip the TCP/TLS handshake.
+
+Tools that drive the loop offline install their own backend with
+`set_client()` (see tools/simulate.py, tools/replay.py).
+"""
+import threading
+from typing import Any
+
+from utils.logging_utils import log_internal
+
+KEEPALIVE_CONNECTIONS = 8
+MAX_CONNECTIONS = 16  # llm's 8 workers, each possibly hedged
+KEEPALIVE_EXPIRY_SECONDS = 90.0
+CONNECT_TIMEOUT_SECONDS = 5.0
+
+_lock = threading.Lock()
+_client: Any = None
+
+
+def configure(**settings: Any) -> None:
+    """Override pool settings before the client is built, e.g. configure(MAX_CONNECTIONS=32)."""
+    for name, value in settings.items():
+        if name not in globals() or not name.isupper():
+            raise AttributeError(f"Unknown client setting: {name}")
+        globals()[name] = value
+
+
+def _build() -> Any:
+    # Deferred: the SDK and httpx are the heaviest imports in the process.
+    import httpx
+    from openai import OpenAI
+
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        # Per-request read timeouts come from agents.llm via with_options().
+        timeout=httpx.Timeout(None, connect=CONNECT_TIMEOUT_SECONDS),
+    )
+    return OpenAI(http_client=http_client)
+
+
+def get_client() -> Any:
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = _build()
+    return _client
+
+
+def set_client(client: Any) -> None:
+    """Use `client` (anything with `responses.create`) for every model call."""
+    global _client
+    with _lock:
+        _client = client
+
+
+def _prewarm() -> None:
+    try:
+        get_client()
+    except Exception as exc:  # e.g. no API key; the first real call raises it again
+        log_internal(f"[client] prewarm failed: {exc}")
+
+
+def prewarm() -> threading.Thread:
+    """Build the client in the background so the first tick doesn't pay for it."""
+    thread = threading.Thread(target=_prewarm, name="client-prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+def close_client() -> None:
+    global _client
+    with _lock:
+        client, _client = _client, None
+    close = getattr(client, "close", None)
+    if close is not None:
+        close()
@@ -1,20 +1,23 @@
-import json
 from typing import Any, Dict, List
 
-from openai import OpenAI
-from agents.prompts_conscious import build_conscious_prompt
-from core.memory import add_memory_item, save_memory, load_memory
-from core.goals import save_goals, load_goals, update_goal
-
-client = OpenAI()
+from actions.tools import MAX_TOOL_CALLS_PER_TICK
+from agents import context_threads, router
+from agents.client import get_client
+from agents.llm import LLMUnavailable, create_response
+from agents.output_parser import CONSCIOUS_SCHEMA, ModelOutputError, parse_model_json
+from agents.prompts_conscious import build_conscious_prompt, conscious_sections
+from core.memory import add_memory_item, adopt_template_items, index_by_id, update_memory
+from core.records import Goal, MemoryItem, Percept
+from core.goals import update_goal
+from utils import clock
 
 
 def build_conscious_context(
     tick: int,
     subconscious_output: Dict[str, Any],
-    recent_percepts: List[Dict[str, Any]],
-    active_goals: List[Dict[str, Any]],
-    memory_candidates: List[Dict[str, Any]],
+    recent_percepts: List[Percept],
+    active_goals: List[Goal],
+    memory_candidates: List[MemoryItem],
     speech_state: Dict[str, Any],
 ) -> Dict[str, Any]:
     return {
@@ -30,6 +33,7 @@ def build_conscious_context(
                 "respond_to_user",
                 "update_memory",
                 "update_goal",
+                "call_tool",
                 "log_internal",
             ],
             "safety_level": "normal",
@@ -37,7 +41,7 @@ def build_conscious_context(
     }
 
 
-def call_conscious_llm(context: Dict[str, Any]) -> Dict[str, Any]:
+def call_conscious_llm(context: Dict[str, Any], deadline: float | None = None) -> Dict[str, Any]:
     """
     Call the conscious (executive) model, which includes
     a built-in SPEAK/STAY_SILENT governor.
@@ -55,76 +59,69 @@ def call_conscious_llm(context: Dict[str, Any]) -> Dict[str, Any]:
           "delete": []
         },
         "goal_updates": [],
+        "tool_calls": [{"tool": "name", "args": {...}}],
         "notes": "short justification"
       }
     }
     """
 
-    prompt = build_conscious_prompt(context)
-
-    response = client.responses.create(
-        model="gpt-4.1",
-        input=prompt,
-        temperature=0.2,
-        max_output_tokens=800,
-        response_format={"type": "json_object"},
-    )
-
-    text = response.output[0].content[0].text  # type: ignore[attr-defined]
-
-    try:
-        raw = json.loads(text)
-    except json.JSONDecodeError:
-        # Safe fallback: log internally and take no external action
-        decision = {
-            "action": "STAY_SILENT",
-            "user_message": {"content": None},
-            "internal": {
-                "guidance_delta": {
-                    "focus_tags_add": [],
-                    "focus_tags_remove": [],
-                    "temperature_adjustment": 0.0,
-                },
-                "memory_updates": {"add": [], "update": [], "delete": []},
-                "goal_updates": [],
-                "notes": f"Failed to parse conscious JSON at tick {context['tick']}. Raw: {text[:200]}",
-            },
-            "subconscious_guidance_delta": {
-                "focus_tags_add": [],
-                "focus_tags_remove": [],
-                "temperature_adjustment": 0.0,
-            },
-            "memory_updates": {"add": [], "update": [], "delete": []},
-            "goal_updates": [],
-            "actions": [],
-        }
-        return decision
-
-    # Normalize expected fields
-    action = raw.get("action", "STAY_SILENT")
-    user_message = raw.get("user_message", {"content": None}) or {"content": None}
-    internal = raw.get("internal", {}) or {}
-
-    guidance_delta = internal.get(
-        "guidance_delta",
-        {
-            "focus_tags_add": [],
-            "focus_tags_remove": [],
-            "temperature_adjustment": 0.0,
-        },
+    # Full context, or only what changed when the layer runs a delta thread
+    prompt = context_threads.build_request(
+        "conscious", context["tick"], lambda: conscious_sections(context), lambda: build_conscious_prompt(context)
     )
-
-    # Preserve the previous memory update schema if present,
-    # otherwise default to empty add/update/delete.
-    mem_updates = internal.get("memory_updates", {})
-    if isinstance(mem_updates, list):
-        # If the model returns a list by mistake, treat as "add" only.
-        mem_updates = {"add": mem_updates, "update": [], "delete": []}
-    mem_updates.setdefault("add", [])
-    mem_updates.setdefault("update", [])
-    mem_updates.setdefault("delete", [])
-
-    goal_updates = internal.get("goal_updates", [])
+    route = router.choose_route("conscious", context)
+    routes = [route, "full"] if router.can_escalate("conscious", route) else [route]
+
+    raw = None
+    for attempt in routes:
+        try:
+            started = clock.now()
+            response = create_response(
+                get_client(),
+                "conscious",
+                deadline=deadline,
+                model=router.model_for(attempt),
+                temperature=0.2,
+                max_output_tokens=800,
+                response_format={"type": "json_object"},
+                **prompt,
+            )
+            router.record_call("conscious", attempt, response, clock.now() - started)
+        except LLMUnavailable as exc:
+            context_threads.invalidate("conscious", str(exc))
+            return _fallback_decision(f"Conscious call unavailable at tick {context['tick']}: {exc}")
+
+        text = response.output[0].content[0].text  # type: ignore[attr-defined]
+        escalate = attempt != routes[-1]
+        problems: List[str] = []
+        try:
+            # Repairs fences/trailing commas/truncation and fills every default
+            raw = parse_model_json("conscious", text, CONSCIOUS_SCHEMA, problems)
+            unsafe = [p for p in problems if p == "truncated" or p.startswith("conscious.user_message")]
+            if unsafe:
+                # A cut-off reply may end mid-sentence; never act on a guessed ending
+                raise ModelOutputError(f"reply not usable as repaired: {', '.join(unsafe[:3])}")
+        except ModelOutputError as exc:
+            if escalate:
+                router.record_escalation("conscious", str(exc))
+                continue
+            # Safe fallback: log internally and take no external action
+            context_threads.invalidate("conscious", "unparseable reply")
+            return _fallback_decision(f"Failed to parse conscious JSON at tick {context['tick']}. Raw: {text[:200]}")
+        # The mini model's output is only kept if it needed no guessing
+        if escalate and problems:
+            router.record_escalation("conscious", "; ".join(problems[:3]))
+            continue
+        route = attempt
+        context_threads.commit("conscious", response)
+        break
+
+    action = raw["action"]
+    user_message = raw["user_message"]
+    internal = raw["internal"]
+    guidance_delta = internal["guidance_delta"]
+    mem_updates = internal["memory_updates"]
+    goal_updates = internal["goal_updates"]
 
     # Apply internal updates immediately so they take effect
     _apply_memory_updates(mem_updates)
@@ -135,7 +132,7 @@ def call_conscious_llm(context: Dict[str, Any]) -> Dict[str, Any]:
     actions: List[Dict[str, Any]] = []
 
     if action == "SPEAK":
-        content = (user_message or {}).get("content")
+        content = user_message["content"]
         if content:
             actions.append(
                 {
@@ -144,8 +141,18 @@ def call_conscious_llm(context: Dict[str, Any]) -> Dict[str, Any]:
                 }
             )
 
+    # Tool calls run in the background; results come back as "tool" percepts
+    for call in internal["tool_calls"][:MAX_TOOL_CALLS_PER_TICK]:
+        if call.get("tool"):
+            actions.append(
+                {
+                    "type": "call_tool",
+                    "payload": {"tool": call["tool"], "args": call.get("args") or {}},
+                }
+            )
+
     # Optionally, we add internal notes as a log action
-    notes = internal.get("notes")
+    notes = internal["notes"]
     if notes:
         actions.append(
             {
@@ -162,11 +169,39 @@ def call_conscious_llm(context: Dict[str, Any]) -> Dict[str, Any]:
         "memory_updates": mem_updates,
         "goal_updates": goal_updates,
         "actions": actions,
+        "route": route,
     }
+    router.note_decision(decision)
 
     return decision
 
 
+def _fallback_decision(notes: str) -> Dict[str, Any]:
+    """A STAY_SILENT no-op decision, used when the model call or its JSON fails."""
+    return {
+        "action": "STAY_SILENT",
+        "user_message": {"content": None},
+        "internal": {
+            "guidance_delta": {
+                "focus_tags_add": [],
+                "focus_tags_remove": [],
+                "temperature_adjustment": 0.0,
+            },
+            "memory_updates": {"add": [], "update": [], "delete": []},
+            "goal_updates": [],
+            "notes": notes,
+        },
+        "subconscious_guidance_delta": {
+            "focus_tags_add": [],
+            "focus_tags_remove": [],
+            "temperature_adjustment": 0.0,
+        },
+        "memory_updates": {"add": [], "update": [], "delete": []},
+        "goal_updates": [],
+        "actions": [],
+    }
+
+
 def _apply_memory_updates(mem_updates: Dict[str, Any]) -> None:
     if not mem_updates:
         return
@@ -177,21 +212,23 @@ def _apply_memory_updates(mem_updates: Dict[str, Any]) -> None:
             add_memory_item(item)
 
     to_update = mem_updates.get("update", [])
-    if to_update:
-        memory = load_memory()
-        memory_by_id = {m.get("id"): m for m in memory}
+    to_delete = mem_updates.get("delete", [])
+    if not to_update and not to_delete:
+        return
+    adopt_template_items([upd.get("id") for upd in to_update] + list(to_delete))
+
+    def _apply(memory: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Ids merged away by consolidation resolve to the item they were merged into
+        memory_by_id = index_by_id(memory)
         for upd in to_update:
             mid = upd.get("id")
             patch = upd.get("patch", {})
             if mid in memory_by_id:
                 memory_by_id[mid].update(patch)
-        save_memory(list(memory_by_id.values()))
+        deleted = {id(memory_by_id[mid]) for mid in to_delete if mid in memory_by_id}
+        return [m for m in memory if id(m) not in deleted]
 
-    to_delete = mem_updates.get("delete", [])
-    if to_delete:
-        memory = load_memory()
-        memory = [m for m in memory if m.get("id") not in to_delete]
-        save_memory(memory)
+    update_memory(_apply)
 
 
 def _apply_goal_updates(goal_updates: List[Dict[str, Any]]) -> None:
@@ -202,6 +239,3 @@ def _apply_goal_updates(goal_updates: List[Dict[str, Any]]) -> None:
         patch = {k: v for k, v in upd.items() if k != "goal_id"}
         if gid:
             update_goal(gid, **patch)
-    # Explicit save to ensure consistency
-    goals = load_goals()
-    save_goals(goals)
@@ -0,0 +1,207 @@
+"""
+Delta-context mode: one conversation thread per model layer, so a tick
+sends what changed instead of re-serializing the whole context.
+
+Opt in per layer with configure(DELTA_LAYERS={"conscious", "subconscious"}).
+The prompt modules describe their context as named sections:
+  - "static"   instructions/tool lists; any change re-bases the thread
+  - "replace"  small state (speech state, goals); re-sent whole when changed
+  - "stream"   keyed items (percepts, thoughts, memory); only unseen keys sent
+A thread starts (or is re-based) with the full prompt. Later turns send a
+short update and chain to the last accepted reply:
+  - THREAD_MODE "server": the Responses API's previous_response_id
+  - THREAD_MODE "local": the turns so far are re-sent as a message list, for
+    backends without stored responses (saves formatting, not tokens)
+Threads are re-based every REBASE_EVERY_TURNS turns, when the billed
+context passes REBASE_MAX_CONTEXT_TOKENS, when a static section changes,
+and after a failed or rejected turn. Counters are in `get_stats()`.
+"""
+import threading
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+from utils.logging_utils import log_internal
+
+DELTA_LAYERS: set = set()
+THREAD_MODE = "server"
+# A chained turn is billed for the whole thread again (as cached input), so
+# threads are kept short; see benchmarks/bench_delta_context.py.
+REBASE_EVERY_TURNS = 8
+REBASE_MAX_CONTEXT_TOKENS = 8_000
+
+_lock = threading.Lock()
+_threads: Dict[str, Dict[str, Any]] = {}
+_stats: Dict[str, Dict[str, Any]] = {}
+
+
+class Section(NamedTuple):
+    title: str
+    kind: str  # "static" | "replace" | "stream"
+    items: Tuple[Tuple[str, str], ...]  # (key, text); keys identify stream items
+
+
+def section(title: str, kind: str, texts: List[str], keys: List[str] | None = None) -> Section:
+    """Build a Section; without `keys` each text is its own key."""
+    return Section(title, kind, tuple(zip(keys if keys is not None else texts, texts)))
+
+
+def configure(**settings: Any) -> None:
+    """Override module settings (drops all threads), e.g. configure(DELTA_LAYERS={"conscious"})."""
+    for name, value in settings.items():
+        if name not in globals() or not name.isupper():
+            raise AttributeError(f"Unknown context_threads setting: {name}")
+        globals()[name] = value
+    reset()
+
+
+def enabled(layer: str) -> bool:
+    return layer in DELTA_LAYERS
+
+
+def _layer_stats(layer: str) -> Dict[str, Any]:
+    return _stats.setdefault(
+        layer,
+        {"turns": 0, "rebases": {}, "sent_tokens": 0, "input_tokens": 0, "cached_tokens": 0, "invalidated": 0},
+    )
+
+
+def _rebase_reason(thread: Dict[str, Any] | None, sections: Dict[str, Section]) -> str | None:
+    if thread is None or "sections" not in thread:
+        return "new"
+    if not thread.get("response_id") and THREAD_MODE == "server":
+        return "no_response_id"
+    if thread["turns"] >= REBASE_EVERY_TURNS:
+        return "turns"
+    if thread["context_tokens"] >= REBASE_MAX_CONTEXT_TOKENS:
+        return "context"
+    previous = thread["sections"]
+    for name, sec in sections.items():
+        if sec.kind == "static" and (name not in previous or previous[name].items != sec.items):
+            return "static"
+    return None
+
+
+def _delta_text(tick: int, sections: Dict[str, Section], previous: Dict[str, Section], sent: Dict[str, set]) -> str:
+    parts = [
+        f"TICK {tick} UPDATE. Only what changed since your last reply is listed below;"
+        " everything else is as before."
+    ]
+    for name, sec in sections.items():
+        if sec.kind == "replace":
+            if name not in previous or previous[name].items != sec.items:
+                parts.append(f"{sec.title} (now):\n" + "\n".join(text for _, text in sec.items))
+        elif sec.kind == "stream":
+            new = [text for key, text in sec.items if key not in sent.get(name, ())]
+            if new:
+                parts.append(f"{sec.title} (new):\n" + "\n".join(new))
+    if len(parts) == 1:
+        parts.append("Nothing else changed.")
+    parts.append("Respond ONLY with a JSON object in the same shape as before.")
+    return "\n\n".join(parts)
+
+
+def build_request(
+    layer: str, tick: int, sections: Callable[[], Dict[str, Section]], full_prompt: Callable[[], str]
+) -> Dict[str, Any]:
+    """
+    Request fields carrying the context for this call: {"input": ...} plus
+    previous_response_id when chained. Call commit() with the reply that
+    was accepted, or invalidate() if there was none.
+    """
+    if not enabled(layer):
+        return {"input": full_prompt()}
+    current = sections()
+    with _lock:
+        thread = _threads.get(layer)
+        reason = _rebase_reason(thread, current)
+        stats = _layer_stats(layer)
+        if reason is not None:
+            text = full_prompt()
+            stats["rebases"][reason] = stats["rebases"].get(reason, 0) + 1
+            pending = {"messages": [], "sent": {}, "turns": 0, "response_id": None}
+            request: Dict[str, Any] = {"input": text}
+            if THREAD_MODE == "local":
+                request["input"] = [{"role": "user", "content": text}]
+        else:
+            text = _delta_text(tick, current, thread["sections"], thread["sent"])
+            pending = {
+                "messages": thread["messages"],
+                "sent": thread["sent"],
+                "turns": thread["turns"],
+                "response_id": thread["response_id"],
+            }
+            if THREAD_MODE == "local":
+                request = {"input": thread["messages"] + [{"role": "user", "content": text}]}
+            else:
+                request = {"input": text, "previous_response_id": thread["response_id"]}
+        stats["sent_tokens"] += len(text) // 4
+        pending["sections"] = current
+        pending["text"] = text
+        _threads[layer] = dict(thread or {}, pending=pending)
+        return request
+
+
+def commit(layer: str, response: Any) -> None:
+    """The reply to the last build_request() was accepted: advance the thread to it."""
+    if not enabled(layer):
+        return
+    with _lock:
+        pending = (_threads.get(layer) or {}).get("pending")
+        if pending is None:
+            return
+        sent = {name: set(keys) for name, keys in pending["sent"].items()}
+        for name, sec in pending["sections"].items():
+            if sec.kind == "stream":
+                sent.setdefault(name, set()).update(key for key, _ in sec.items)
+        usage = getattr(response, "usage", None)
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
+        details = getattr(usage, "input_tokens_details", None)
+        text = response.output[0].content[0].text
+        messages = pending["messages"]
+        if THREAD_MODE == "local":
+            messages = messages + [
+                {"role": "user", "content": pending["text"]},
+                {"role": "assistant", "content": text},
+            ]
+        _threads[layer] = {
+            "response_id": getattr(response, "id", None) or None,
+            "sections": pending["sections"],
+            "sent": sent,
+            "messages": messages,
+            "turns": pending["turns"] + 1,
+            "context_tokens": input_tokens + output_tokens,
+        }
+        stats = _layer_stats(layer)
+        stats["turns"] += 1
+        stats["input_tokens"] += input_tokens
+        stats["cached_tokens"] += getattr(details, "cached_tokens", 0) or 0
+
+
+def invalidate(layer: str, reason: str = "") -> None:
+    """Drop the thread (failed call or rejected reply); the next call re-bases."""
+    with _lock:
+        if _threads.pop(layer, None) is None:
+            return
+        _layer_stats(layer)["invalidated"] += 1
+    log_internal(f"[context_threads] {layer} thread dropped, next call re-bases: {reason}")
+
+
+def reset() -> None:
+    with _lock:
+        _threads.clear()
+        _stats.clear()
+
+
+def get_stats() -> Dict[str, Dict[str, Any]]:
+    """Per layer: turns, rebases by reason, estimated sent tokens, billed and cached input tokens."""
+    with _lock:
+        out = {}
+        for layer, stats in _stats.items():
+            turns = stats["turns"] or 1
+            out[layer] = dict(
+                stats,
+                rebases=dict(stats["rebases"]),
+                sent_tokens_per_turn=round(stats["sent_tokens"] / turns, 1),
+                input_tokens_per_turn=round(stats["input_tokens"] / turns, 1),
+            )
+        return out
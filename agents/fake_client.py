@@ -0,0 +1,163 @@
+"""
+Local stand-in for the OpenAI client, for benchmarks and offline runs.
+
+It answers `responses.create` with schema-valid subconscious/conscious JSON
+after a configurable simulated latency, and reports token usage the same
+way the real Responses API does (`response.usage.input_tokens`, ...).
+"""
+import json
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict
+
+
+_BATCH_RE = re.compile(r"BATCH OF (\d+) TICKS")
+
+
+def lognormal_latency(median: float = 0.05, sigma: float = 0.3, tail_prob: float = 0.03, tail_factor: float = 10.0):
+    """Latency sampler with a lognormal body and an occasional slow tail."""
+
+    def sample() -> float:
+        latency = random.lognormvariate(0.0, sigma) * median
+        if random.random() < tail_prob:
+            latency *= tail_factor
+        return latency
+
+    return sample
+
+
+def _fake_thought(tick_hint: int) -> dict:
+    return {
+        "id": f"fake-{tick_hint}-{random.randrange(1 << 30)}",
+        "timestamp": tick_hint,
+        "content": "A quiet idea drifting around the current goals.",
+        "tags": ["fake"],
+        "confidence": round(random.random(), 2),
+        "novelty": round(random.random(), 2),
+        "related_goals": [],
+    }
+
+
+def _subconscious_text(tick_hint: int, batch: int = 1) -> str:
+    body: dict = {"raw_stream": "", "metrics": {"mean_novelty": 0.5, "mean_confidence": 0.5}}
+    if batch > 1:
+        body["ticks"] = [{"thoughts": [_fake_thought(tick_hint)]} for _ in range(batch)]
+    else:
+        body["thoughts"] = [_fake_thought(tick_hint)]
+    return json.dumps(body)
+
+
+def _conscious_text() -> str:
+    return json.dumps(
+        {
+            "action": "STAY_SILENT",
+            "user_message": {"content": None},
+            "internal": {
+                "guidance_delta": {"focus_tags_add": [], "focus_tags_remove": [], "temperature_adjustment": 0.0},
+                "memory_updates": {"add": [], "update": [], "delete": []},
+                "goal_updates": [],
+                "notes": "Nothing new to say.",
+            },
+        }
+    )
+
+
+def make_response(
+    text: str, input_tokens: int = 0, output_tokens: int = 0, response_id: str = "", cached_tokens: int = 0
+) -> Any:
+    return SimpleNamespace(
+        id=response_id,
+        output=[SimpleNamespace(content=[SimpleNamespace(text=text)])],
+        usage=SimpleNamespace(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=input_tokens + output_tokens,
+            input_tokens_details=SimpleNamespace(cached_tokens=cached_tokens),
+        ),
+    )
+
+
+class _FakeResponses:
+    def __init__(self, owner: "FakeClient"):
+        self._owner = owner
+
+    def create(self, **request: Any) -> Any:
+        return self._owner._create(request)
+
+
+class FakeClient:
+    """
+    Drop-in for `OpenAI()` as used by the agents. `latency` is a callable
+    returning seconds to sleep per request; `fail_rate` is the probability
+    of raising ConnectionError instead of answering. `model_latency` and
+    `bad_output_rate` are per model name: a latency callable that overrides
+    `latency`, and the probability of a truncated (cut-off) JSON answer.
+    `token_latency` adds seconds per uncached input token.
+
+    Like the Responses API, it keeps answered responses so a request can
+    chain to one with `previous_response_id`: the earlier turns are billed
+    as input again, reported as cached tokens.
+    """
+
+    def __init__(
+        self,
+        latency: Callable[[], float] | None = None,
+        fail_rate: float = 0.0,
+        sleep=time.sleep,
+        model_latency: Dict[str, Callable[[], float]] | None = None,
+        bad_output_rate: Dict[str, float] | None = None,
+        token_latency: float = 0.0,
+    ):
+        self.latency = latency or (lambda: 0.0)
+        self.fail_rate = fail_rate
+        self.model_latency = model_latency or {}
+        self.bad_output_rate = bad_output_rate or {}
+        self.token_latency = token_latency
+        self._stored: Dict[str, dict] = {}  # response id -> {"tokens", "subconscious"}
+        self.sleep = sleep
+        self.responses = _FakeResponses(self)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def with_options(self, **_: Any) -> "FakeClient":
+        return self
+
+    def _create(self, request: dict) -> Any:
+        with self._lock:
+            self.calls += 1
+            call_no = self.calls
+        model = request.get("model", "")
+        prompt = request.get("input", "")
+        if isinstance(prompt, list):
+            prompt = json.dumps(prompt)
+        previous = {"tokens": 0, "subconscious": False}
+        if request.get("previous_response_id"):
+            with self._lock:
+                previous = self._stored.get(request["previous_response_id"])
+            if previous is None:
+                raise LookupError(f"previous response {request['previous_response_id']} not found")
+        input_tokens = previous["tokens"] + len(prompt) // 4
+
+        delay = self.model_latency.get(model, self.latency)() + self.token_latency * (len(prompt) // 4)
+        if delay > 0:
+            self.sleep(delay)
+        if random.random() < self.fail_rate:
+            raise ConnectionError("fake backend error")
+
+        subconscious = previous["subconscious"] or "SUBCONSCIOUS layer" in prompt
+        if subconscious:
+            batch = _BATCH_RE.search(prompt)
+            text = _subconscious_text(call_no, int(batch.group(1)) if batch else 1)
+        else:
+            text = _conscious_text()
+        if random.random() < self.bad_output_rate.get(model, 0.0):
+            text = text[: len(text) // 2]
+        response_id = f"resp-{call_no}"
+        with self._lock:
+            self._stored[response_id] = {"tokens": input_tokens + len(text) // 4, "subconscious": subconscious}
+            if len(self._stored) > 4096:
+                self._stored.pop(next(iter(self._stored)))
+        return make_response(text, input_tokens, len(text) // 4, response_id, cached_tokens=previous["tokens"])
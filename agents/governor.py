@@ -0,0 +1,172 @@
+"""
+Token and request-rate governor for model calls.
+
+Tracks requests and token usage (from `response.usage`) in a sliding
+window and keeps sustained operation under the configured per-minute
+budgets:
+  - above SOFT_LIMIT utilization, output budgets shrink and the tick
+    interval stretches,
+  - at the hard limit, requests wait for the window to free up,
+  - a provider 429 starts a cooldown (honouring Retry-After).
+Throttling transitions are written to the internal log and counted in
+`get_stats()`.
+"""
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+from utils import clock
+from utils.logging_utils import log_internal
+
+TOKENS_PER_MINUTE_LIMIT = 200_000
+REQUESTS_PER_MINUTE_LIMIT = 500
+WINDOW_SECONDS = 60.0
+
+SOFT_LIMIT = 0.7  # utilization where shaping starts
+MIN_OUTPUT_FRACTION = 0.25  # smallest share of the requested max_output_tokens
+MAX_TICK_SLOWDOWN = 4.0  # tick interval multiplier at full utilization
+RATE_LIMIT_COOLDOWN_SECONDS = 5.0  # used when a 429 carries no Retry-After
+
+_lock = threading.Lock()
+_requests: Deque[float] = deque()
+_tokens: Deque[Tuple[float, int]] = deque()
+_token_total = 0
+_cooldown_until = 0.0
+_throttled = False
+_stats: Dict[str, int] = {
+    "requests": 0,
+    "tokens": 0,
+    "waits": 0,
+    "shrunk_outputs": 0,
+    "slowed_ticks": 0,
+    "rate_limited": 0,
+    "throttle_events": 0,
+}
+
+
+def configure(**settings: Any) -> None:
+    """Override module settings at runtime, e.g. configure(TOKENS_PER_MINUTE_LIMIT=30_000)."""
+    for name, value in settings.items():
+        if name not in globals() or not name.isupper():
+            raise AttributeError(f"Unknown governor setting: {name}")
+        globals()[name] = value
+
+
+def _expire(now: float) -> None:
+    global _token_total
+    cutoff = now - WINDOW_SECONDS
+    while _requests and _requests[0] <= cutoff:
+        _requests.popleft()
+    while _tokens and _tokens[0][0] <= cutoff:
+        _token_total -= _tokens.popleft()[1]
+
+
+def utilization(now: float | None = None) -> float:
+    """Fraction of the tighter of the two budgets used in the current window."""
+    now = clock.now() if now is None else now
+    with _lock:
+        _expire(now)
+        return max(len(_requests) / REQUESTS_PER_MINUTE_LIMIT, _token_total / TOKENS_PER_MINUTE_LIMIT)
+
+
+def _note_throttle(active: bool, reason: str) -> None:
+    global _throttled
+    if active and not _throttled:
+        _stats["throttle_events"] += 1
+        log_internal(f"[governor] throttling: {reason}")
+    elif not active and _throttled:
+        log_internal("[governor] back under soft limit")
+    _throttled = active
+
+
+def record_request() -> None:
+    with _lock:
+        _requests.append(clock.now())
+        _stats["requests"] += 1
+
+
+def record_usage(response: Any) -> None:
+    global _token_total
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    total = getattr(usage, "total_tokens", None)
+    if total is None:
+        total = (getattr(usage, "input_tokens", 0) or 0) + (getattr(usage, "output_tokens", 0) or 0)
+    with _lock:
+        _tokens.append((clock.now(), int(total)))
+        _token_total += int(total)
+        _stats["tokens"] += int(total)
+
+
+def output_budget(requested: int, now: float | None = None) -> int:
+    """Shrink `max_output_tokens` linearly between SOFT_LIMIT and full utilization."""
+    u = utilization(now)
+    if u <= SOFT_LIMIT:
+        _note_throttle(False, "")
+        return requested
+    pressure = min(1.0, (u - SOFT_LIMIT) / (1.0 - SOFT_LIMIT))
+    fraction = 1.0 - pressure * (1.0 - MIN_OUTPUT_FRACTION)
+    _stats["shrunk_outputs"] += 1
+    _note_throttle(True, f"utilization {u:.0%}, output budget x{fraction:.2f}")
+    return max(1, int(requested * fraction))
+
+
+def tick_interval(base_seconds: float, now: float | None = None) -> float:
+    """Stretch the scheduler interval as utilization approaches the limit."""
+    u = utilization(now)
+    if u <= SOFT_LIMIT:
+        return base_seconds
+    pressure = min(1.0, (u - SOFT_LIMIT) / (1.0 - SOFT_LIMIT))
+    _stats["slowed_ticks"] += 1
+    return base_seconds * (1.0 + pressure * (MAX_TICK_SLOWDOWN - 1.0))
+
+
+def wait_time(estimated_tokens: int, now: float | None = None) -> float:
+    """Seconds until a request of `estimated_tokens` fits in both budgets (0 if it fits now)."""
+    now = clock.now() if now is None else now
+    with _lock:
+        _expire(now)
+        wait = max(0.0, _cooldown_until - now)
+        if len(_requests) >= REQUESTS_PER_MINUTE_LIMIT:
+            wait = max(wait, _requests[0] + WINDOW_SECONDS - now)
+        if _token_total + estimated_tokens > TOKENS_PER_MINUTE_LIMIT:
+            # Walk forward until enough tokens have aged out of the window.
+            freed = 0
+            excess = _token_total + estimated_tokens - TOKENS_PER_MINUTE_LIMIT
+            for ts, n in _tokens:
+                freed += n
+                if freed >= excess:
+                    wait = max(wait, ts + WINDOW_SECONDS - now)
+                    break
+    if wait > 0:
+        _stats["waits"] += 1
+        _note_throttle(True, f"budget exhausted, waiting {wait:.1f}s")
+    return wait
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    return getattr(exc, "status_code", None) == 429
+
+
+def record_rate_limited(exc: BaseException) -> float:
+    """Start a cooldown after a provider 429. Returns the cooldown in seconds."""
+    global _cooldown_until
+    cooldown = RATE_LIMIT_COOLDOWN_SECONDS
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        cooldown = float(headers.get("retry-after", cooldown))
+    except (TypeError, ValueError):
+        pass
+    with _lock:
+        _cooldown_until = max(_cooldown_until, clock.now() + cooldown)
+        _stats["rate_limited"] += 1
+    _note_throttle(True, f"provider returned 429, cooling down {cooldown:.1f}s")
+    return cooldown
+
+
+def get_stats() -> Dict[str, Any]:
+    stats: Dict[str, Any] = dict(_stats)
+    stats["utilization"] = round(utilization(), 3)
+    stats["throttled"] = _throttled
+    return stats
@@ -0,0 +1,187 @@
+"""
+Shared call path for model requests.
+
+Every `responses.create` goes through `create_response`, which adds:
+  - a deadline (absolute utils.clock time) derived from the tick budget,
+  - a per-attempt timeout and retries with jittered exponential backoff,
+  - optional hedging: if the first request is slower than the recent p95
+    for that layer, a duplicate is fired and the first answer wins,
+  - a per-layer circuit breaker; while open, calls fail fast with
+    LLMUnavailable so the agents fall back to their no-op outputs,
+  - rate governance (agents.governor): output budgets shrink and requests
+    wait for quota as the per-minute token/request budgets fill up.
+"""
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Deque, Dict
+
+from agents import governor, recording
+from utils import clock
+
+DEFAULT_TIMEOUT_SECONDS = 15.0
+MAX_RETRIES = 2
+BACKOFF_BASE_SECONDS = 0.25
+BACKOFF_MAX_SECONDS = 2.0
+
+HEDGING_ENABLED = False
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30.0
+
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="llm")
+_lock = threading.Lock()
+_latencies: Dict[str, Deque[float]] = {}
+_breakers: Dict[str, Dict[str, float]] = {}
+_jitter = random.Random()  # private, so backoff does not shift the global stream that replay seeds
+
+
+class LLMUnavailable(RuntimeError):
+    """No usable response before the deadline, or the circuit breaker is open."""
+
+
+def configure(**settings: Any) -> None:
+    """Override module settings at runtime, e.g. configure(HEDGING_ENABLED=True)."""
+    for name, value in settings.items():
+        if name not in globals() or not name.isupper():
+            raise AttributeError(f"Unknown llm setting: {name}")
+        globals()[name] = value
+
+
+def latency_percentile(layer: str, q: float) -> float | None:
+    with _lock:
+        samples = sorted(_latencies.get(layer, ()))
+    if not samples:
+        return None
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def _record_latency(layer: str, seconds: float) -> None:
+    with _lock:
+        _latencies.setdefault(layer, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+
+def _breaker_open(layer: str) -> bool:
+    with _lock:
+        breaker = _breakers.get(layer)
+        if not breaker or breaker["failures"] < BREAKER_FAILURE_THRESHOLD:
+            return False
+        if clock.now() - breaker["opened_at"] >= BREAKER_RESET_SECONDS:
+            # Half-open: let one call through; a failure re-opens immediately.
+            breaker["failures"] = BREAKER_FAILURE_THRESHOLD - 1
+            return False
+        return True
+
+
+def _record_outcome(layer: str, ok: bool) -> None:
+    with _lock:
+        breaker = _breakers.setdefault(layer, {"failures": 0, "opened_at": 0.0})
+        if ok:
+            breaker["failures"] = 0
+            return
+        breaker["failures"] += 1
+        if breaker["failures"] >= BREAKER_FAILURE_THRESHOLD:
+            breaker["opened_at"] = clock.now()
+
+
+def _send(client: Any, timeout: float, request: Dict[str, Any]) -> Any:
+    with_options = getattr(client, "with_options", None)
+    if with_options is not None:
+        client = with_options(timeout=timeout, max_retries=0)
+    governor.record_request()
+    response = client.responses.create(**request)
+    governor.record_usage(response)
+    return response
+
+
+def _attempt(client: Any, layer: str, timeout: float, request: Dict[str, Any]) -> Any:
+    """One logical attempt, possibly hedged. Raises TimeoutError or the backend's error."""
+    start = time.time()
+    futures = {_pool.submit(_send, client, timeout, request)}
+
+    hedge_delay = None
+    if HEDGING_ENABLED and len(_latencies.get(layer, ())) >= HEDGE_MIN_SAMPLES:
+        hedge_delay = latency_percentile(layer, HEDGE_PERCENTILE)
+
+    if hedge_delay is not None and hedge_delay < timeout:
+        done, _ = wait(futures, timeout=hedge_delay)
+        if not done:
+            futures.add(_pool.submit(_send, client, timeout - hedge_delay, request))
+
+    error: BaseException | None = None
+    while futures:
+        remaining = timeout - (time.time() - start)
+        if remaining <= 0:
+            break
+        done, futures = wait(futures, timeout=remaining, return_when=FIRST_COMPLETED)
+        for fut in done:
+            if fut.exception() is None:
+                _record_latency(layer, time.time() - start)
+                return fut.result()
+            error = fut.exception()
+    if error is not None and not futures:
+        raise error
+    raise TimeoutError(f"{layer} request exceeded {timeout:.2f}s")
+
+
+def create_response(client: Any, layer: str, deadline: float | None = None, **request: Any) -> Any:
+    """
+    Call `client.responses.create(**request)` within `deadline`, retrying
+    with jittered backoff. Raises LLMUnavailable when no response arrives.
+    """
+    if _breaker_open(layer):
+        raise LLMUnavailable(f"{layer} circuit breaker is open")
+    if hasattr(client, "for_layer"):  # a replay client answers each layer from its own recorded calls
+        client = client.for_layer(layer)
+
+    if "max_output_tokens" in request:
+        request["max_output_tokens"] = governor.output_budget(request["max_output_tokens"])
+    estimated_tokens = len(str(request.get("input", ""))) // 4 + request.get("max_output_tokens", 0)
+
+    last_error: BaseException | None = None
+    rate_limited = False
+    for attempt in range(MAX_RETRIES + 1):
+        quota_wait = governor.wait_time(estimated_tokens)
+        if quota_wait > 0:
+            if deadline is not None and clock.now() + quota_wait >= deadline:
+                # Self-imposed throttling, not a backend failure: leave the breaker alone.
+                raise LLMUnavailable(f"{layer} rate budget needs {quota_wait:.1f}s, past the deadline")
+            clock.sleep(quota_wait)
+        remaining = DEFAULT_TIMEOUT_SECONDS if deadline is None else deadline - clock.now()
+        if remaining <= 0:
+            if last_error is None:
+                # The tick budget was spent before a request went out: not a backend failure.
+                raise LLMUnavailable(f"{layer} deadline passed before the call was made")
+            break
+        attempt_started = clock.now()
+        attempt_timer = time.perf_counter()
+        try:
+            response = _attempt(client, layer, min(DEFAULT_TIMEOUT_SECONDS, remaining), request)
+        except Exception as exc:  # SDK errors, timeouts, connection resets
+            last_error = exc
+            rate_limited = governor.is_rate_limit_error(exc)
+            if rate_limited:
+                # The cooldown is applied by wait_time() on the next attempt.
+                governor.record_rate_limited(exc)
+                continue
+            if attempt == MAX_RETRIES:
+                break  # no retry left to back off for
+            backoff = _jitter.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt))
+            if deadline is not None:
+                backoff = min(backoff, max(0.0, deadline - clock.now()))
+            clock.sleep(backoff)
+            continue
+        _record_outcome(layer, ok=True)
+        recording.record_call(layer, request, response, attempt_started, time.perf_counter() - attempt_timer)
+        return response
+
+    if rate_limited:
+        # Throttled on the last attempt: like the quota path, not a sign the backend is down.
+        raise LLMUnavailable(f"{layer} call rate limited: {last_error!r}")
+    _record_outcome(layer, ok=False)
+    raise LLMUnavailable(f"{layer} call failed: {last_error!r}")
@@ -0,0 +1,314 @@
+"""
+Tolerant parsing of model JSON output.
+
+`parse_model_json(layer, text, schema)` gets a usable object out of
+almost anything the models return, so a paid round-trip is rarely thrown
+away:
+  1. plain json.loads (the common case, no extra cost);
+  2. otherwise one repair pass: strip code fences and surrounding prose,
+     drop trailing commas, and close whatever a max_output_tokens cut left
+     open (string, objects, arrays), backing off to the last complete
+     value if the cut landed mid key/value;
+  3. conform the result to the layer's schema in the same walk that fills
+     defaults: wrong types are replaced by the default, unknown enum values
+     fall back, bad list items are dropped.
+
+Per-layer counts of clean parses, repairs (by kind), schema fixes and
+failures are kept in `get_stats()`.
+"""
+import copy
+import json
+import re
+import threading
+from typing import Any, Dict, List, Tuple
+
+from utils.logging_utils import log_internal
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+
+_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}, "default": []}
+_OBJECT_LIST = {"type": "array", "items": {"type": "object"}, "default": []}
+
+SUBCONSCIOUS_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        # Individual thoughts are coerced by core.records.Thought.from_dict.
+        "thoughts": _OBJECT_LIST,
+        "raw_stream": {"type": "string", "default": ""},
+        "metrics": {"type": "object", "default": {}},
+    },
+}
+
+# Batched mode (agents.subconscious.BATCH_TICKS > 1): one thoughts list per future tick.
+SUBCONSCIOUS_BATCH_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "ticks": {
+            "type": "array",
+            "items": {"type": "object", "properties": {"thoughts": _OBJECT_LIST}},
+            "default": [],
+        },
+        "thoughts": _OBJECT_LIST,
+        "raw_stream": {"type": "string", "default": ""},
+        "metrics": {"type": "object", "default": {}},
+    },
+}
+
+CONSCIOUS_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "action": {"type": "string", "enum": ["SPEAK", "STAY_SILENT"], "default": "STAY_SILENT"},
+        "user_message": {
+            "type": "object",
+            "default": {},
+            "properties": {"content": {"type": "string", "nullable": True, "default": None}},
+        },
+        "internal": {
+            "type": "object",
+            "default": {},
+            "properties": {
+                "guidance_delta": {
+                    "type": "object",
+                    "default": {},
+                    "properties": {
+                        "focus_tags_add": _STRING_LIST,
+                        "focus_tags_remove": _STRING_LIST,
+                        "temperature_adjustment": {"type": "number", "default": 0.0},
+                    },
+                },
+                "memory_updates": {
+                    "type": "object",
+                    "default": {},
+                    "list_means": "add",  # a bare list is treated as additions
+                    "properties": {"add": _OBJECT_LIST, "update": _OBJECT_LIST, "delete": _STRING_LIST},
+                },
+                "goal_updates": _OBJECT_LIST,
+                "tool_calls": _OBJECT_LIST,
+                "notes": {"type": "string", "nullable": True, "default": ""},
+            },
+        },
+    },
+}
+
+
+class ModelOutputError(ValueError):
+    """The output could not be turned into a JSON object, even after repair."""
+
+
+def _count(layer: str, key: str, n: int = 1) -> None:
+    with _lock:
+        counts = _stats.setdefault(layer, {"calls": 0, "clean": 0, "repaired": 0, "schema_fixes": 0, "failed": 0})
+        counts[key] = counts.get(key, 0) + n
+
+
+def get_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-layer counters plus repair_rate and failure_rate."""
+    with _lock:
+        out = {layer: dict(counts) for layer, counts in _stats.items()}
+    for counts in out.values():
+        calls = counts["calls"] or 1
+        counts["repair_rate"] = round(counts["repaired"] / calls, 4)
+        counts["failure_rate"] = round(counts["failed"] / calls, 4)
+    return out
+
+
+def _close_truncated(text: str, repairs: List[str]) -> str:
+    """Drop trailing commas and prose after the object, and close anything left open, in one scan."""
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = escaped = False
+    safe: Tuple[int, Tuple[str, ...]] | None = None  # last cut point after a complete value
+    for i, ch in enumerate(text):
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            out.append(ch)
+            safe = (len(out), tuple(stack))  # an empty container is complete
+            continue
+        elif ch in "}]":
+            end = len(out)
+            while end and out[end - 1].isspace():
+                end -= 1
+            if end and out[end - 1] == ",":
+                del out[end - 1]
+                repairs.append("trailing_comma")
+            if stack:
+                stack.pop()
+            out.append(ch)
+            safe = (len(out), tuple(stack))
+            if not stack:
+                if text[i + 1 :].strip():
+                    repairs.append("trailing_text")  # prose after the object, braces and all
+                break
+            continue
+        elif ch == ",":
+            safe = (len(out), tuple(stack))
+        out.append(ch)
+
+    if not stack and not in_string:
+        return "".join(out)
+
+    repairs.append("truncated")
+    closed = "".join(out) + ('"' if in_string else "") + "".join(reversed(stack))
+    try:
+        json.loads(closed)
+        return closed
+    except json.JSONDecodeError:
+        pass
+    if safe is None:
+        return closed
+    # The cut landed inside a key, a literal or before a value: keep only complete values.
+    cut, open_at_cut = safe
+    return "".join(out[:cut]) + "".join(reversed(open_at_cut))
+
+
+def repair_json(text: str) -> Tuple[Any, List[str]]:
+    """Parse `text`, repairing common defects. Returns (value, repairs applied)."""
+    repairs: List[str] = []
+    candidate = text.strip()
+    if candidate.startswith("```") or "```" in candidate[:200]:
+        match = _FENCE_RE.search(candidate)
+        if match:
+            candidate = match.group(1).strip()
+            repairs.append("code_fence")
+    start = candidate.find("{")
+    if start > 0:
+        candidate = candidate[start:]
+        repairs.append("leading_text")
+    elif start < 0:
+        raise ModelOutputError("no JSON object in output")
+
+    candidate = _close_truncated(candidate, repairs)
+    try:
+        return json.loads(candidate), repairs
+    except json.JSONDecodeError as exc:
+        raise ModelOutputError(f"unrepairable JSON ({exc.msg} at {exc.pos})") from exc
+
+
+def conform(value: Any, schema: Dict[str, Any], path: str, issues: List[str]) -> Any:
+    """Return `value` shaped like `schema`, recording each fix in `issues`."""
+    kind = schema.get("type")
+    if value is None and schema.get("nullable"):
+        return None
+
+    if kind == "object":
+        if isinstance(value, list) and schema.get("list_means"):
+            value = {schema["list_means"]: value}
+            issues.append(f"{path}: list")
+        if not isinstance(value, dict):
+            if value is not None:
+                issues.append(f"{path}: not an object")
+            value = {}
+        out = dict(value)
+        for key, sub in schema.get("properties", {}).items():
+            if key in value:
+                out[key] = conform(value[key], sub, f"{path}.{key}", issues)
+            else:
+                out[key] = conform(copy.deepcopy(sub.get("default")), sub, f"{path}.{key}", [])
+        return out
+
+    if kind == "array":
+        if not isinstance(value, list):
+            if value is not None:
+                issues.append(f"{path}: not a list")
+            return copy.deepcopy(schema.get("default", []))
+        items = schema.get("items")
+        if not items:
+            return value
+        out_items = []
+        for i, item in enumerate(value):
+            if _matches(item, items["type"]):
+                out_items.append(conform(item, items, f"{path}[{i}]", issues))
+            else:
+                issues.append(f"{path}[{i}]: dropped")
+        return out_items
+
+    if kind == "string":
+        if not isinstance(value, str):
+            if value is None or isinstance(value, (dict, list)):
+                issues.append(f"{path}: not a string")
+                return copy.deepcopy(schema.get("default"))
+            value = str(value)
+        enum = schema.get("enum")
+        if enum and value not in enum:
+            fixed = value.strip().upper().replace(" ", "_")
+            if fixed in enum:
+                return fixed
+            issues.append(f"{path}: {value!r} not allowed")
+            return schema.get("default")
+        return value
+
+    if kind == "number":
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                issues.append(f"{path}: not a number")
+                return schema.get("default", 0.0)
+        return value
+
+    return value
+
+
+def _matches(value: Any, kind: str) -> bool:
+    return {
+        "object": isinstance(value, dict),
+        "array": isinstance(value, list),
+        "string": isinstance(value, str),
+        "number": isinstance(value, (int, float)) and not isinstance(value, bool),
+    }.get(kind, True)
+
+
+def parse_model_json(
+    layer: str, text: str, schema: Dict[str, Any], problems: List[str] | None = None
+) -> Dict[str, Any]:
+    """
+    Parse and conform one model response. Raises ModelOutputError only when
+    no JSON object can be recovered at all. Repairs and schema fixes are
+    appended to `problems` if given (the router escalates on them).
+    """
+    _count(layer, "calls")
+    try:
+        data = json.loads(text)
+        repairs: List[str] = []
+    except json.JSONDecodeError:
+        try:
+            data, repairs = repair_json(text)
+        except ModelOutputError as exc:
+            _count(layer, "failed")
+            log_internal(f"[{layer}] unparseable output ({exc}): {text[:200]!r}")
+            raise
+    if not isinstance(data, dict):
+        _count(layer, "failed")
+        raise ModelOutputError(f"expected a JSON object, got {type(data).__name__}")
+
+    if repairs:
+        _count(layer, "repaired")
+        for kind in set(repairs):
+            _count(layer, f"repair:{kind}")
+        log_internal(f"[{layer}] repaired output: {', '.join(sorted(set(repairs)))}")
+    else:
+        _count(layer, "clean")
+
+    issues: List[str] = []
+    data = conform(data, schema, layer, issues)
+    if problems is not None:
+        problems.extend(repairs)
+        problems.extend(issues)
+    if issues:
+        _count(layer, "schema_fixes")
+        log_internal(f"[{layer}] schema fixes: {'; '.join(issues[:5])}")
+    return data
@@ -0,0 +1,131 @@
+"""
+Memoized prompt rendering, shared by the conscious and subconscious prompts.
+
+Formatters render their items one line at a time through `lines()` and
+`block()`:
+  - a line is cached under (kind, key), where the key holds exactly the
+    fields the line shows, so it is rendered once for as long as those
+    fields are unchanged (a memory item's access counters, which change
+    every tick, are not part of its key)
+  - a block (a whole section) is cached under the keys of its items, so an
+    unchanged section costs one lookup per tick and a changed one only
+    renders its new lines
+Kinds name the formatter ("conscious.goal", "subconscious.goal"), so both
+layers share one cache without mixing their renderings.
+
+The cache holds about MAX_ENTRIES lines and blocks in two generations per
+kind: when the current one fills up, it becomes the old one and the
+previous old one is dropped; a hit in the old generation moves the entry
+forward. That bounds memory like an LRU, without a lock or per-hit
+bookkeeping (entries are immutable strings and dict operations are atomic,
+so concurrent layers at worst render a line twice).
+configure(ENABLED=False) renders everything from scratch (for benchmarks
+and debugging).
+"""
+from typing import Any, Callable, Dict, Hashable, List, Sequence, Tuple
+
+ENABLED = True
+MAX_ENTRIES = 4096
+
+_generations: Dict[str, Tuple[Dict[Hashable, str], Dict[Hashable, str]]] = {}  # kind -> (current, old)
+_stats: Dict[str, int] = {"line_hits": 0, "line_misses": 0, "block_hits": 0, "block_misses": 0, "rotations": 0}
+
+
+def configure(**settings: Any) -> None:
+    """Override module settings (clears the cache), e.g. configure(MAX_ENTRIES=16384)."""
+    for name, value in settings.items():
+        if name not in globals() or not name.isupper():
+            raise AttributeError(f"Unknown prompt_cache setting: {name}")
+        globals()[name] = value
+    clear()
+
+
+def clear() -> None:
+    _generations.clear()
+
+
+def _lookup(kind: str, key: Hashable) -> str | None:
+    current, old = _generations.get(kind) or _new_generation(kind)
+    text = current.get(key)
+    if text is None:
+        text = old.get(key)
+        if text is not None:
+            _store(kind, key, text)
+    return text
+
+
+def _new_generation(kind: str) -> Tuple[Dict[Hashable, str], Dict[Hashable, str]]:
+    return _generations.setdefault(kind, ({}, {}))
+
+
+def _store(kind: str, key: Hashable, text: str) -> None:
+    current, old = _generations.get(kind) or _new_generation(kind)
+    # Each kind gets an equal share of the budget; the old generation doubles it at most
+    if len(current) >= max(16, MAX_ENTRIES // (2 * max(1, len(_generations)))):
+        current, old = {}, current
+        _generations[kind] = (current, old)
+        _stats["rotations"] += 1
+    current[key] = text
+
+
+def cached(kind: str, key: Hashable, render: Callable[[Any], str], item: Any) -> str:
+    """`render(item)`, reused while `key` is unchanged."""
+    if not ENABLED:
+        return render(item)
+    text = _lookup(kind, key)
+    if text is None:
+        text = render(item)
+        _store(kind, key, text)
+        _stats["line_misses"] += 1
+    else:
+        _stats["line_hits"] += 1
+    return text
+
+
+def lines(kind: str, items: Sequence[Any], key: Callable[[Any], Hashable], render: Callable[[Any], str]) -> List[str]:
+    """One rendered line per item."""
+    if not ENABLED:
+        return [render(item) for item in items]
+    current = (_generations.get(kind) or _new_generation(kind))[0]
+    out = []
+    misses = 0
+    for item in items:
+        k = key(item)
+        text = current.get(k)
+        if text is None:
+            text = _lookup(kind, k)
+            if text is None:
+                text = render(item)
+                _store(kind, k, text)
+                misses += 1
+            current = _generations[kind][0]  # _store may have started a new generation
+        out.append(text)
+    _stats["line_misses"] += misses
+    _stats["line_hits"] += len(items) - misses
+    return out
+
+
+def block(
+    kind: str, items: Sequence[Any], key: Callable[[Any], Hashable], render: Callable[[Any], str], empty: str
+) -> str:
+    """The items' lines joined by newlines (`empty` if there are none)."""
+    if not items:
+        return empty
+    if not ENABLED:
+        return "\n".join(render(item) for item in items)
+    keys = tuple(map(key, items))
+    text = _lookup(kind + "[]", keys)
+    if text is None:
+        text = "\n".join(lines(kind, items, key, render))
+        _store(kind + "[]", keys, text)
+        _stats["block_misses"] += 1
+    else:
+        _stats["block_hits"] += 1
+    return text
+
+
+def get_stats() -> Dict[str, Any]:
+    lookups = _stats["line_hits"] + _stats["line_misses"] + _stats["block_hits"] + _stats["block_misses"]
+    hits = _stats["line_hits"] + _stats["block_hits"]
+    entries = sum(len(current) + len(old) for current, old in _generations.values())
+    return dict(_stats, entries=entries, hit_rate=round(hits / lookups, 3) if lookups else 0.0)
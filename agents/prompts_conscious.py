@@ -1,5 +1,9 @@
 from typing import Any, Dict
 
+from actions.tools import MAX_TOOL_CALLS_PER_TICK, list_tools
+from agents import prompt_cache
+from agents.context_threads import Section, section
+
 
 def build_conscious_prompt(context: Dict[str, Any]) -> str:
     """
@@ -23,6 +27,7 @@ def build_conscious_prompt(context: Dict[str, Any]) -> str:
           "delete": []
         },
         "goal_updates": [],
+        "tool_calls": [],
         "notes": "short justification for your choice"
       }
     }
@@ -135,6 +140,16 @@ IMPORTANT:
   - update goals,
   - adjust subconscious guidance.
 
+TOOLS:
+
+- You may start up to {MAX_TOOL_CALLS_PER_TICK} tool calls per tick via internal.tool_calls.
+- Tools run in the background. Their results arrive on a later tick as
+  percepts with source "tool", tagged with the tool name and ok/error/timeout.
+- Do not call the same tool with the same arguments again while waiting.
+
+Available tools:
+{_fmt_tools()}
+
 STRICT JSON REQUIREMENT:
 - Respond with ONLY a JSON object.
 - No extra text, no markdown, no commentary.
@@ -193,7 +208,14 @@ Now respond ONLY with a JSON object in this shape:
       {{
         "goal_id": "goal-id",
         "status": "active or paused or done or dropped",
-        "priority": 0.0
+        "priority": 0.0,
+        "progress": 0.0
+      }}
+    ],
+    "tool_calls": [
+      {{
+        "tool": "tool-name",
+        "args": {{}}
       }}
     ],
     "notes": "brief justification for why you chose to SPEAK or STAY_SILENT this tick"
@@ -202,51 +224,111 @@ Now respond ONLY with a JSON object in this shape:
 """
 
 
+def conscious_sections(context: Dict[str, Any]) -> Dict[str, Section]:
+    """The prompt's context as sections, for delta-context mode (agents/context_threads.py)."""
+    percepts = context["recent_percepts"]
+    memory = context["memory_candidates"]
+    thoughts = context["subconscious_output"].get("thoughts", [])
+    return {
+        "tools": section("Available tools", "static", [_fmt_tools()]),
+        "speech_state": section("Speech state", "replace", [_fmt_speech_state(context.get("speech_state", {}))]),
+        "goals": section("Active goals", "replace", [_fmt_goals(context["active_goals"])]),
+        "percepts": section("Recent percepts", "stream", _percept_lines(percepts), [p.id for p in percepts]),
+        "memory": section(
+            "Recent memory candidates", "stream", _memory_lines(memory), [f"{m.id}|{m.content}" for m in memory]
+        ),
+        "thoughts": section("Subconscious output", "stream", _thought_lines(thoughts), [t.id for t in thoughts]),
+    }
+
+
+# Line formats and their cache keys (the fields each line shows); see agents/prompt_cache.py
+
+
+def _goal_line(g):
+    sub = f" subgoals={len(g.subgoals)}" if g.subgoals else ""
+    return f"- [{g.id}] status={g.status} prio={g.priority:.2f} progress={g.progress:.0%}{sub} :: {g.description}"
+
+
+def _goal_key(g):
+    return (g.id, g.status, g.priority, g.progress, len(g.subgoals), g.description)
+
+
+def _percept_line(p):
+    return f"- ({p.source}) {p.content[:120]}"
+
+
+def _percept_key(p):
+    return (p.source, p.content)
+
+
+def _memory_line(m):
+    return f"- [{m.type}] {m.content[:120]}"
+
+
+def _memory_key(m):
+    return (m.type, m.content)
+
+
+def _thought_line(t):
+    return f"- ({t.id}) {t.content[:140]}"
+
+
+def _thought_key(t):
+    return (t.id, t.content)
+
+
+def _percept_lines(percepts):
+    return prompt_cache.lines("conscious.percept", percepts, _percept_key, _percept_line)
+
+
+def _memory_lines(mem_items):
+    return prompt_cache.lines("conscious.memory", mem_items, _memory_key, _memory_line)
+
+
+def _thought_lines(thoughts):
+    return prompt_cache.lines("conscious.thought", thoughts, _thought_key, _thought_line)
+
+
 def _fmt_goals(goals):
-    if not goals:
-        return "  (none)"
-    lines = []
-    for g in goals:
-        lines.append(
-            f'- [{g.get("id")}] status={g.get("status")} '
-            f'prio={g.get("priority", 0):.2f} :: {g.get("description")}'
-        )
-    return "\n".join(lines)
+    return prompt_cache.block("conscious.goal", goals, _goal_key, _goal_line, "  (none)")
 
 
 def _fmt_percepts(percepts):
-    if not percepts:
-        return "  (none)"
-    lines = []
-    for p in percepts:
-        src = p.get("source")
-        content = p.get("content", "")[:120]
-        lines.append(f'- ({src}) {content}')
-    return "\n".join(lines)
+    return prompt_cache.block("conscious.percept", percepts, _percept_key, _percept_line, "  (none)")
 
 
 def _fmt_memory(mem_items):
-    if not mem_items:
-        return "  (none)"
-    lines = []
-    for m in mem_items:
-        lines.append(f'- [{m.get("type")}] {m.get("content")[:120]}')
-    return "\n".join(lines)
+    return prompt_cache.block("conscious.memory", mem_items, _memory_key, _memory_line, "  (none)")
 
 
 def _fmt_sub_output(sub):
     thoughts = sub.get("thoughts", [])
-    if not thoughts:
-        return "  (no thoughts this tick)"
+    return prompt_cache.block("conscious.thought", thoughts, _thought_key, _thought_line, "  (no thoughts this tick)")
+
+
+def _fmt_tools():
     lines = []
-    for t in thoughts:
-        lines.append(f'- ({t.get("id")}) {t.get("content")[:140]}')
-    return "\n".join(lines)
+    for t in list_tools():
+        props = t.schema.get("properties", {})
+        required = set(t.schema.get("required", []))
+        params = ", ".join(
+            f"{name}: {p.get('type', 'any')}{'' if name in required else '?'}" for name, p in props.items()
+        )
+        lines.append(f"- {t.name}({params}) :: {t.description}")
+    return "\n".join(lines) or "  (none)"
 
 
 def _fmt_speech_state(speech_state):
     if not speech_state:
         return "  (none)"
+    key = tuple(speech_state.get(k) for k in _SPEECH_FIELDS)
+    return prompt_cache.cached("conscious.speech_state", key, _speech_state_text, speech_state)
+
+
+_SPEECH_FIELDS = ("mode", "last_user_tick", "last_speak_tick", "unsolicited_speak_count", "silence_until_tick")
+
+
+def _speech_state_text(speech_state):
     mode = speech_state.get("mode", "cohost")
     last_user = speech_state.get("last_user_tick", 0)
     last_speak = speech_state.get("last_speak_tick", 0)
@@ -1,10 +1,14 @@
 from typing import Any, Dict
 
+from agents import prompt_cache
+from agents.context_threads import Section, section
+
 
 def build_subconscious_prompt(context: Dict[str, Any]) -> str:
     """
     Build the system+user-style prompt string for the subconscious LLM.
-    Output must be valid JSON with keys: thoughts, raw_stream, metrics.
+    Output must be valid JSON with keys: thoughts, raw_stream, metrics
+    (or ticks, raw_stream, metrics when context["batch_ticks"] > 1).
     """
 
     focus_tags = ", ".join(context["guidance"].get("focus_tags", [])) or "none"
@@ -30,8 +34,65 @@ Context:
 - Recent thoughts:
 {_fmt_thoughts(context["recent_thoughts"])}
 
-Now:
-1. Generate between 1 and {context["guidance"]["max_ideas"]} short "thoughts".
+{_fmt_instructions(context)}
+"""
+
+
+def subconscious_sections(context: Dict[str, Any]) -> Dict[str, Section]:
+    """The prompt's context as sections, for delta-context mode (agents/context_threads.py)."""
+    percepts = context["recent_percepts"]
+    thoughts = context["recent_thoughts"][-5:]
+    return {
+        "instructions": section("Instructions", "replace", [_fmt_instructions(context)]),
+        "focus_tags": section(
+            "Focus tags", "replace", [", ".join(context["guidance"].get("focus_tags", [])) or "none"]
+        ),
+        "seed_words": section(
+            "Random seed words to perturb your thinking",
+            "replace",
+            [", ".join(context.get("random_seed_words", [])) or "none"],
+        ),
+        "goals": section("Active goals (summaries)", "replace", [_fmt_goals(context["active_goals"])]),
+        "percepts": section(
+            "Recent percepts (latest events from outside world)",
+            "stream",
+            prompt_cache.lines("subconscious.percept", percepts, _percept_key, _percept_line),
+            [p.id for p in percepts],
+        ),
+        "thoughts": section(
+            "Recent thoughts",
+            "stream",
+            prompt_cache.lines("subconscious.thought", thoughts, _thought_key, _thought_line),
+            [t.id for t in thoughts],
+        ),
+    }
+
+
+_THOUGHT_SHAPE = """{
+      "id": "string, unique thought id (you can make it up)",
+      "timestamp": "int or string tick index",
+      "content": "short idea text",
+      "tags": ["tag1", "tag2"],
+      "confidence": 0.0,
+      "novelty": 0.0,
+      "related_goals": ["goal-id-1", "goal-id-2"]
+    }"""
+
+
+def _fmt_instructions(context):
+    max_ideas = context["guidance"]["max_ideas"]
+    batch = context.get("batch_ticks", 1)
+    # Only a batch's instructions mention the tick
+    key = (max_ideas, batch, context["tick"] if batch > 1 else None)
+    return prompt_cache.cached("subconscious.instructions", key, _instructions_text, context)
+
+
+def _instructions_text(context):
+    max_ideas = context["guidance"]["max_ideas"]
+    batch = context.get("batch_ticks", 1)
+    if batch <= 1:
+        return f"""Now:
+1. Generate between 1 and {max_ideas} short "thoughts".
 2. Each thought should:
    - Be 1–3 sentences.
    - Include a few tags.
@@ -42,14 +103,34 @@ Respond ONLY in this JSON format:
 
 {{
   "thoughts": [
+    {_THOUGHT_SHAPE}
+  ],
+  "raw_stream": "optional free-form internal monologue",
+  "metrics": {{
+    "mean_novelty": 0.0,
+    "mean_confidence": 0.0
+  }}
+}}"""
+
+    first = context["tick"]
+    return f"""Now think ahead: this is a BATCH OF {batch} TICKS (ticks {first} to {first + batch - 1}).
+1. For each tick, in order, generate between 1 and {max_ideas} short "thoughts".
+   Later ticks should build on or drift away from the earlier ones, as a
+   train of thought would; do not repeat an idea.
+2. Each thought should:
+   - Be 1–3 sentences.
+   - Include a few tags.
+   - Include a rough confidence [0–1] and novelty [0–1].
+3. After the list, give a short free-form "raw_stream" monologue if you like.
+
+Respond ONLY in this JSON format, with exactly {batch} entries in "ticks":
+
+{{
+  "ticks": [
     {{
-      "id": "string, unique thought id (you can make it up)",
-      "timestamp": "int or string tick index",
-      "content": "short idea text",
-      "tags": ["tag1", "tag2"],
-      "confidence": 0.0,
-      "novelty": 0.0,
-      "related_goals": ["goal-id-1", "goal-id-2"]
+      "thoughts": [
+        {_THOUGHT_SHAPE.replace(chr(10), chr(10) + "    ")}
+      ]
     }}
   ],
   "raw_stream": "optional free-form internal monologue",
@@ -57,32 +138,43 @@ Respond ONLY in this JSON format:
     "mean_novelty": 0.0,
     "mean_confidence": 0.0
   }}
-}}
-"""
+}}"""
+
+
+# Line formats and their cache keys (the fields each line shows); see agents/prompt_cache.py
+
+
+def _goal_line(g):
+    return f"- [{g.id}] (prio={g.priority:.2f}) {g.description}"
+
+
+def _goal_key(g):
+    return (g.id, g.priority, g.description)
+
+
+def _percept_line(p):
+    return f"- [{p.source}] {p.content[:120]}"
+
+
+def _percept_key(p):
+    return (p.source, p.content)
+
+
+def _thought_line(t):
+    return f"- {t.content[:120]}"
+
+
+def _thought_key(t):
+    return t.content
 
 
 def _fmt_goals(goals):
-    if not goals:
-        return "  (none)"
-    lines = []
-    for g in goals:
-        lines.append(f'- [{g.get("id")}] (prio={g.get("priority", 0):.2f}) {g.get("description")}')
-    return "\n".join(lines)
+    return prompt_cache.block("subconscious.goal", goals, _goal_key, _goal_line, "  (none)")
 
 
 def _fmt_percepts(percepts):
-    if not percepts:
-        return "  (none)"
-    lines = []
-    for p in percepts:
-        lines.append(f'- [{p.get("source")}] {p.get("content")[:120]}')
-    return "\n".join(lines)
+    return prompt_cache.block("subconscious.percept", percepts, _percept_key, _percept_line, "  (none)")
 
 
 def _fmt_thoughts(thoughts):
-    if not thoughts:
-        return "  (none)"
-    lines = []
-    for t in thoughts[-5:]:
-        lines.append(f'- {t.get("content")[:120]}')
-    return "\n".join(lines)
+    return prompt_cache.block("subconscious.thought", thoughts[-5:], _thought_key, _thought_line, "  (none)")
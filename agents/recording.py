@@ -0,0 +1,291 @@
+"""
+Record model traffic from a live session so it can be replayed offline.
+
+Record mode (CONSCIO_RECORD=1 when starting main.py, or start_recording())
+writes a session directory under data/recordings/<session>/:
+
+  initial/          copy of the stores as they were when recording started,
+                    including the percept log and its index up to that point
+  calls.jsonl       tick markers, the subconscious seed words and every
+                    prompt/response pair, in order
+  percepts.jsonl    percepts that arrived while recording
+  final_state.json  state at the end of the session
+
+`ReplayClient` answers `responses.create` from calls.jsonl, tick by tick
+and layer by layer (agents.llm binds each call to its layer through
+`for_layer`), and notes every call that has no recorded counterpart or
+whose prompt differs from the recorded one; tools/replay.py drives
+main.tick with it and reports them. Seed words are random, so replay
+serves the recorded ones through `set_seed_word_source`.
+"""
+import os
+import shutil
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from agents.fake_client import make_response
+from core.goals import backup_goals
+from core.percept_index import INDEX_FILE
+from core.percepts import PERCEPTS_FILE
+from utils import clock
+from utils.paths import DATA_DIR
+from utils.persistence import load_json, save_json
+from utils.randomness import sample_random_seed_words
+from utils.serialization import decode_line, encode_line
+
+RECORDINGS_DIR = os.path.join(DATA_DIR, "recordings")
+SNAPSHOT_FILES = (
+    "state.json",
+    "subconscious_guidance.json",
+    "memory.json",
+    "random_words.txt",
+    "thoughts.idx",
+    "thoughts.heap",
+    "template.json",
+)  # plus percepts.jsonl and percepts.index.jsonl, cut at the recording's start by _snapshot_percepts
+
+_lock = threading.Lock()
+_session: Dict[str, Any] | None = None
+_seed_word_source: Callable[[int], List[str]] | None = None  # set on replay to serve the recorded words
+
+
+def is_recording() -> bool:
+    return _session is not None
+
+
+def start_recording(session: str | None = None) -> str:
+    """Snapshot the stores and start capturing calls. Returns the session directory."""
+    global _session
+    name = session or time.strftime("%Y%m%d-%H%M%S")
+    session_dir = os.path.join(RECORDINGS_DIR, name)
+    initial_dir = os.path.join(session_dir, "initial")
+    os.makedirs(initial_dir, exist_ok=True)
+    for filename in SNAPSHOT_FILES:
+        src = os.path.join(DATA_DIR, filename)
+        if os.path.exists(src):
+            shutil.copy2(src, os.path.join(initial_dir, filename))
+    # SQLite (WAL) can't be copied file by file while open; use its backup API.
+    backup_goals(os.path.join(initial_dir, "goals.sqlite3"))
+    percept_offset = _snapshot_percepts(initial_dir)
+
+    with _lock:
+        _session = {
+            "dir": session_dir,
+            "calls": open(os.path.join(session_dir, "calls.jsonl"), "a", encoding="utf-8"),
+            "percept_offset": percept_offset,
+            "tick": 0,
+        }
+    return session_dir
+
+
+def _snapshot_percepts(initial_dir: str) -> int:
+    """
+    Copy the percept log and its index as of now. Percepts appended later
+    belong to the session's percepts.jsonl, so the copies stop at the log
+    size taken first. Returns that size.
+    """
+    offset = os.path.getsize(PERCEPTS_FILE) if os.path.exists(PERCEPTS_FILE) else 0
+    if not offset:
+        return 0
+    with open(PERCEPTS_FILE, "rb") as src, open(os.path.join(initial_dir, "percepts.jsonl"), "wb") as dst:
+        dst.write(src.read(offset))
+    if os.path.exists(INDEX_FILE):
+        with open(INDEX_FILE, "rb") as src, open(os.path.join(initial_dir, "percepts.index.jsonl"), "wb") as dst:
+            for line in src:
+                if line.endswith(b"\n") and sum(decode_line(line)[:2]) <= offset:
+                    dst.write(line)
+    return offset
+
+
+def _write(entry: Dict[str, Any]) -> None:
+    with _lock:
+        if _session is None:
+            return
+        _session["calls"].write(encode_line(entry) + "\n")
+        _session["calls"].flush()
+
+
+def record_tick(tick: int) -> None:
+    if _session is None:
+        return
+    _session["tick"] = tick
+    _write({"kind": "tick", "tick": tick, "wall_time": clock.now()})
+
+
+def record_call(layer: str, request: Dict[str, Any], response: Any, started: float, latency: float) -> None:
+    if _session is None:
+        return
+    usage = getattr(response, "usage", None)
+    _write(
+        {
+            "kind": "call",
+            "tick": _session["tick"],
+            "layer": layer,
+            "model": request.get("model"),
+            "prompt": request.get("input"),
+            "response": response.output[0].content[0].text,
+            "usage": {
+                "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+                "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+            },
+            "started": started,
+            "latency": latency,
+        }
+    )
+
+
+def set_seed_word_source(source: Callable[[int], List[str]] | None) -> None:
+    """Make sample_seed_words() return source(n) instead of sampling (None restores sampling)."""
+    global _seed_word_source
+    _seed_word_source = source
+
+
+def sample_seed_words(n: int = 3) -> List[str]:
+    """The subconscious prompt's seed words, recorded when a session is being recorded."""
+    words = _seed_word_source(n) if _seed_word_source is not None else sample_random_seed_words(n)
+    if _session is not None:
+        _write({"kind": "seed_words", "tick": _session["tick"], "words": words})
+    return words
+
+
+def stop_recording(state: Dict[str, Any]) -> str | None:
+    """Write the final state and the session's percepts, then close the session."""
+    global _session
+    with _lock:
+        session, _session = _session, None
+    if session is None:
+        return None
+    session["calls"].close()
+    save_json(os.path.join(session["dir"], "final_state.json"), state)
+    if os.path.exists(PERCEPTS_FILE):
+        with open(PERCEPTS_FILE, "rb") as src, open(os.path.join(session["dir"], "percepts.jsonl"), "wb") as dst:
+            src.seek(session["percept_offset"])
+            shutil.copyfileobj(src, dst)
+    return session["dir"]
+
+
+def load_session(session_dir: str) -> Dict[str, Any]:
+    """Read a recorded session: ticks (with their calls), percepts and final state."""
+    ticks: List[Dict[str, Any]] = []
+    with open(os.path.join(session_dir, "calls.jsonl"), "r", encoding="utf-8") as f:
+        for line in f:
+            entry = decode_line(line)
+            if entry["kind"] == "tick":
+                ticks.append({"tick": entry["tick"], "wall_time": entry["wall_time"], "calls": [], "seed_words": []})
+            elif entry["kind"] == "call" and ticks:
+                ticks[-1]["calls"].append(entry)
+            elif entry["kind"] == "seed_words" and ticks:
+                ticks[-1]["seed_words"].append(entry["words"])
+
+    percepts: List[Dict[str, Any]] = []
+    percepts_path = os.path.join(session_dir, "percepts.jsonl")
+    if os.path.exists(percepts_path):
+        with open(percepts_path, "r", encoding="utf-8") as f:
+            percepts = [decode_line(line) for line in f if line.strip()]
+
+    return {
+        "ticks": ticks,
+        "percepts": percepts,
+        "final_state": load_json(os.path.join(session_dir, "final_state.json"), None),
+    }
+
+
+class _ReplayResponses:
+    def __init__(self, owner: "ReplayClient", layer: str | None):
+        self._owner = owner
+        self._layer = layer
+
+    def create(self, **request: Any) -> Any:
+        return self._owner._next(self._layer, request)
+
+
+class _LayerClient:
+    """The replay client as seen by one layer's calls."""
+
+    def __init__(self, owner: "ReplayClient", layer: str):
+        self.responses = _ReplayResponses(owner, layer)
+
+    def with_options(self, **_: Any) -> "_LayerClient":
+        return self
+
+
+def _prompt_difference(recorded: Any, replayed: Any) -> str | None:
+    """Where a replayed prompt first departs from the recorded one, or None if they match."""
+    replayed = decode_line(encode_line(replayed))  # same shape as the recorded copy (tuples -> lists)
+    if recorded == replayed:
+        return None
+    recorded, replayed = encode_line(recorded), encode_line(replayed)
+    at = next((i for i, (a, b) in enumerate(zip(recorded, replayed)) if a != b), min(len(recorded), len(replayed)))
+    return f"prompt differs at char {at}: {recorded[at : at + 40]!r} -> {replayed[at : at + 40]!r}"
+
+
+class ReplayClient:
+    """
+    Answers each tick's model calls with that tick's recorded responses, in
+    order per layer, and `seed_words` with that tick's recorded seed words.
+    Calls without a recorded answer, answers left unused and prompts that
+    differ from the recorded ones are listed in `mismatches`.
+    """
+
+    def __init__(self, session: Dict[str, Any]):
+        self._by_tick = {t["tick"]: list(t["calls"]) for t in session["ticks"]}
+        self._seed_words_by_tick = {t["tick"]: list(t.get("seed_words", ())) for t in session["ticks"]}
+        self._tick: int | None = None
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._seed_words: List[List[str]] = []
+        self.responses = _ReplayResponses(self, None)
+        self.misses = 0
+        self.mismatches: List[str] = []
+
+    def with_options(self, **_: Any) -> "ReplayClient":
+        return self
+
+    def for_layer(self, layer: str) -> _LayerClient:
+        return _LayerClient(self, layer)
+
+    def begin_tick(self, tick: int) -> None:
+        self._note_unused()
+        self._tick = tick
+        self._pending = {}
+        self._seed_words = list(self._seed_words_by_tick.get(tick, ()))
+        for call in self._by_tick.get(tick, ()):
+            self._pending.setdefault(call.get("layer", ""), []).append(call)
+
+    def seed_words(self, n: int) -> List[str]:
+        """This tick's next recorded seed words; sampled (and noted) if none were recorded."""
+        if self._seed_words:
+            return self._seed_words.pop(0)
+        self.mismatches.append(f"tick {self._tick}: no recorded seed words")
+        return sample_random_seed_words(n)
+
+    def finish(self) -> None:
+        """Report answers the last tick never asked for."""
+        self._note_unused()
+        self._pending = {}
+
+    def _note_unused(self) -> None:
+        for layer, calls in self._pending.items():
+            if calls:
+                self.mismatches.append(f"tick {self._tick}: {len(calls)} recorded {layer} call(s) not replayed")
+
+    def _next(self, layer: str | None, request: Dict[str, Any]) -> Any:
+        if layer is None:  # a caller that did not say which layer it is: take the oldest pending call
+            waiting = [calls for calls in self._pending.values() if calls]
+            queue = min(waiting, key=lambda calls: calls[0].get("started", 0)) if waiting else []
+        else:
+            queue = self._pending.get(layer, [])
+        if not queue:
+            self.misses += 1
+            others = sorted(other for other, calls in self._pending.items() if calls)
+            self.mismatches.append(
+                f"tick {self._tick}: unexpected {layer} call"
+                + (f" (recorded calls left for: {', '.join(others)})" if others else "")
+            )
+            raise ConnectionError(f"no recorded {layer or 'model'} response left for this tick")
+        call = queue.pop(0)
+        difference = _prompt_difference(call.get("prompt"), request.get("input"))
+        if difference:
+            self.mismatches.append(f"tick {self._tick}: {call.get('layer')} {difference}")
+        usage = call.get("usage", {})
+        return make_response(call["response"], usage.get("input_tokens", 0), usage.get("output_tokens", 0))
@@ -0,0 +1,169 @@
+"""
+Model routing: which model answers each layer's call.
+
+Each layer has a policy in POLICIES:
+  - "mini" / "full": always that route
+  - "adaptive": score cheap local features and use the full model only
+    when the score reaches FULL_THRESHOLD. Features (weights in
+    ADAPTIVE_WEIGHTS):
+      fresh_user      a user percept not seen by an earlier call
+      fresh_tool      a tool result not seen by an earlier call
+      novelty         a subconscious thought with novelty >= NOVELTY_THRESHOLD
+      working         the last decision updated goals/memory or started tools
+      escalations     the mini model recently had to be escalated
+With "escalate": True, output from the mini model that fails validation
+(unparseable, truncated, or needing schema fixes) is retried on the full
+model within the same deadline.
+
+Per-route calls, latency, tokens and estimated cost are in `get_stats()`.
+"""
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List
+
+from utils.logging_utils import log_internal
+
+MODELS = {"mini": "gpt-4.1-mini", "full": "gpt-4.1"}
+# USD per million tokens (input, output), for the cost estimate only.
+PRICES = {"mini": (0.40, 1.60), "full": (2.00, 8.00)}
+
+POLICIES: Dict[str, Dict[str, Any]] = {
+    "conscious": {"mode": "adaptive", "escalate": True},
+    "subconscious": {"mode": "mini", "escalate": False},
+}
+ADAPTIVE_WEIGHTS = {
+    "fresh_user": 1.0,
+    "fresh_tool": 0.5,
+    "novelty": 0.5,
+    "working": 0.3,
+    "escalations": 0.6,
+}
+FULL_THRESHOLD = 0.5
+NOVELTY_THRESHOLD = 0.85
+ESCALATION_WINDOW_CALLS = 20  # recent calls considered for the escalations feature
+LATENCY_WINDOW = 200
+
+_lock = threading.Lock()
+_seen_percepts: Deque[str] = deque(maxlen=256)
+_last_decision_active = False
+_recent_escalations: Deque[bool] = deque(maxlen=ESCALATION_WINDOW_CALLS)
+_route_stats: Dict[str, Dict[str, Any]] = {}
+
+
+def configure(**settings: Any) -> None:
+    """Override module settings, e.g. configure(POLICIES={...}, FULL_THRESHOLD=0.8)."""
+    for name, value in settings.items():
+        if name not in globals() or not name.isupper():
+            raise AttributeError(f"Unknown router setting: {name}")
+        globals()[name] = value
+
+
+def model_for(route: str) -> str:
+    return MODELS[route]
+
+
+def can_escalate(layer: str, route: str) -> bool:
+    return route == "mini" and bool(POLICIES.get(layer, {}).get("escalate"))
+
+
+def features(context: Dict[str, Any]) -> Dict[str, bool]:
+    """The adaptive policy's inputs for one conscious context. Marks its percepts as seen."""
+    with _lock:
+        fresh = [p for p in context.get("recent_percepts", ()) if p.id not in _seen_percepts]
+        _seen_percepts.extend(p.id for p in fresh)
+        recent_escalations = sum(_recent_escalations)
+        working = _last_decision_active
+    thoughts = (context.get("subconscious_output") or {}).get("thoughts", ())
+    return {
+        "fresh_user": any(p.source == "user" for p in fresh),
+        "fresh_tool": any(p.source == "tool" for p in fresh),
+        "novelty": any(t.novelty >= NOVELTY_THRESHOLD for t in thoughts),
+        "working": working,
+        "escalations": recent_escalations >= 2,
+    }
+
+
+def choose_route(layer: str, context: Dict[str, Any]) -> str:
+    mode = POLICIES.get(layer, {}).get("mode", "full")
+    if mode != "adaptive":
+        return mode
+    score = sum(ADAPTIVE_WEIGHTS.get(name, 0.0) for name, on in features(context).items() if on)
+    return "full" if score >= FULL_THRESHOLD else "mini"
+
+
+def note_decision(decision: Dict[str, Any]) -> None:
+    """Remember whether the conscious layer is mid-task (feeds the 'working' feature)."""
+    global _last_decision_active
+    mem = decision.get("memory_updates") or {}
+    _last_decision_active = bool(
+        decision.get("goal_updates")
+        or any(mem.get(k) for k in ("add", "update", "delete"))
+        or any(a.get("type") == "call_tool" for a in decision.get("actions", []))
+    )
+
+
+def record_call(layer: str, route: str, response: Any, latency: float) -> None:
+    usage = getattr(response, "usage", None)
+    input_tokens = getattr(usage, "input_tokens", 0) or 0
+    output_tokens = getattr(usage, "output_tokens", 0) or 0
+    price_in, price_out = PRICES.get(route, (0.0, 0.0))
+    with _lock:
+        stats = _route_stats.setdefault(
+            f"{layer}:{route}",
+            {
+                "calls": 0,
+                "escalated_from": 0,
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "cost_usd": 0.0,
+                "latencies": deque(maxlen=LATENCY_WINDOW),
+            },
+        )
+        stats["calls"] += 1
+        stats["input_tokens"] += input_tokens
+        stats["output_tokens"] += output_tokens
+        stats["cost_usd"] += (input_tokens * price_in + output_tokens * price_out) / 1e6
+        stats["latencies"].append(latency)
+        if POLICIES.get(layer, {}).get("escalate"):
+            # Every call of an escalating layer counts, so the window drains while on full
+            _recent_escalations.append(False)  # flipped by record_escalation if rejected
+
+
+def record_escalation(layer: str, reason: str) -> None:
+    """The mini route's output for `layer` was rejected and is being retried on full."""
+    with _lock:
+        stats = _route_stats.get(f"{layer}:mini")
+        if stats is not None:
+            stats["escalated_from"] += 1
+        if _recent_escalations:
+            _recent_escalations[-1] = True
+    log_internal(f"[router] {layer}: escalating mini -> full ({reason})")
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def get_stats() -> Dict[str, Dict[str, Any]]:
+    """Per layer:route — calls, escalations, tokens, cost and latency percentiles (ms)."""
+    with _lock:
+        out = {}
+        for key, stats in _route_stats.items():
+            latencies = list(stats["latencies"])
+            out[key] = {
+                "calls": stats["calls"],
+                "escalated_from": stats["escalated_from"],
+                "input_tokens": stats["input_tokens"],
+                "output_tokens": stats["output_tokens"],
+                "cost_usd": round(stats["cost_usd"], 6),
+                "latency_p50_ms": round(_percentile(latencies, 0.5) * 1e3, 1),
+                "latency_p95_ms": round(_percentile(latencies, 0.95) * 1e3, 1),
+            }
+        return out
+
+
+def reset_stats() -> None:
+    with _lock:
+        _route_stats.clear()
+        _recent_escalations.clear()
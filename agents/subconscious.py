@@ -1,18 +1,71 @@
-import json
-from typing import Any, Dict, List
+"""
+Subconscious layer: free-associating thoughts, one model call per tick.
 
-from openai import OpenAI
-from agents.prompts_subconscious import build_subconscious_prompt
-from utils.randomness import sample_random_seed_words
+With BATCH_TICKS > 1 one call plans thoughts for that many ticks; the
+extra ticks are queued and served one per tick without a call. The queue
+is dropped as soon as its inputs go stale: a new percept, a change in
+the active goals, or new guidance from the conscious layer.
+"""
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
 
-client = OpenAI()
+from agents import context_threads, recording, router
+from agents.client import get_client
+from agents.llm import LLMUnavailable, create_response
+from agents.output_parser import SUBCONSCIOUS_BATCH_SCHEMA, SUBCONSCIOUS_SCHEMA, ModelOutputError, parse_model_json
+from agents.prompts_subconscious import build_subconscious_prompt, subconscious_sections
+from core.records import Goal, Percept, Thought
+from utils import clock
+from utils.logging_utils import log_internal
+
+BATCH_TICKS = 1  # ticks of thoughts generated per call; 1 = a call every tick
+MAX_OUTPUT_TOKENS = 400  # per tick planned; batched calls get BATCH_TICKS times this, capped
+BATCH_MAX_OUTPUT_TOKENS = 1600
+
+_planned: Deque[List[Dict[str, Any]]] = deque()  # raw thought dicts for upcoming ticks
+_planned_key: Tuple[Any, ...] | None = None
+_stats: Dict[str, int] = {
+    "ticks": 0,
+    "calls": 0,
+    "thoughts": 0,
+    "input_tokens": 0,
+    "output_tokens": 0,
+    "served_from_queue": 0,
+    "invalidations": 0,
+    "discarded_ticks": 0,
+}
+
+
+def configure(**settings: Any) -> None:
+    """Override module settings, e.g. configure(BATCH_TICKS=5). Clears planned thoughts."""
+    global _planned_key
+    for name, value in settings.items():
+        if name not in globals() or not name.isupper():
+            raise AttributeError(f"Unknown subconscious setting: {name}")
+        globals()[name] = value
+    _planned.clear()
+    _planned_key = None
+
+
+def get_stats() -> Dict[str, Any]:
+    """Counters plus calls per tick and tokens per thought, to compare batch sizes."""
+    stats: Dict[str, Any] = dict(_stats)
+    stats["calls_per_tick"] = round(_stats["calls"] / max(1, _stats["ticks"]), 4)
+    tokens = _stats["input_tokens"] + _stats["output_tokens"]
+    stats["tokens_per_thought"] = round(tokens / max(1, _stats["thoughts"]), 1)
+    return stats
+
+
+def reset_stats() -> None:
+    for key in _stats:
+        _stats[key] = 0
 
 
 def build_subconscious_context(
     tick: int,
-    recent_percepts: List[Dict[str, Any]],
-    active_goals: List[Dict[str, Any]],
-    recent_thoughts: List[Dict[str, Any]],
+    recent_percepts: List[Percept],
+    active_goals: List[Goal],
+    recent_thoughts: List[Thought],
     guidance: Dict[str, Any],
 ) -> Dict[str, Any]:
     return {
@@ -26,26 +79,86 @@ def build_subconscious_context(
             "max_ideas": guidance.get("max_ideas", 5),
             "temperature": guidance.get("temperature", 0.9),
         },
-        "random_seed_words": sample_random_seed_words(3),
+        "random_seed_words": recording.sample_seed_words(3),
     }
 
 
-def call_subconscious_llm(context: Dict[str, Any]) -> Dict[str, Any]:
-    prompt = build_subconscious_prompt(context)
+def _inputs_key(context: Dict[str, Any]) -> Tuple[Any, ...]:
+    """What planned thoughts depend on; seed words are left out on purpose."""
+    guidance = context["guidance"]
+    return (
+        tuple(p.id for p in context["recent_percepts"]),
+        tuple((g.id, g.priority) for g in context["active_goals"]),
+        tuple(guidance.get("focus_tags", [])),
+        guidance.get("style"),
+        guidance.get("max_ideas"),
+        round(float(guidance.get("temperature", 0.9)), 3),
+    )
+
+
+def _served(thoughts: List[Dict[str, Any]], tick: int) -> List[Thought]:
+    # Planned thoughts belong to the tick that consumes them.
+    out = [Thought.from_dict(dict(t, timestamp=tick), tick) for t in thoughts]
+    _stats["thoughts"] += len(out)
+    return out
+
 
-    response = client.responses.create(
-        model="gpt-4.1-mini",
-        input=prompt,
-        temperature=context["guidance"].get("temperature", 0.9),
-        max_output_tokens=400,
-        response_format={"type": "json_object"},
+def call_subconscious_llm(context: Dict[str, Any], deadline: float | None = None) -> Dict[str, Any]:
+    global _planned_key
+    _stats["ticks"] += 1
+    if BATCH_TICKS > 1:
+        key = _inputs_key(context)
+        if _planned and key == _planned_key:
+            _stats["served_from_queue"] += 1
+            return {"thoughts": _served(_planned.popleft(), context["tick"]), "raw_stream": "", "metrics": {}}
+        if _planned:
+            _stats["invalidations"] += 1
+            _stats["discarded_ticks"] += len(_planned)
+            _planned.clear()
+        _planned_key = key
+
+    batch = max(1, BATCH_TICKS)
+    prompt_context = dict(context, batch_ticks=batch)
+    prompt = context_threads.build_request(
+        "subconscious",
+        context["tick"],
+        lambda: subconscious_sections(prompt_context),
+        lambda: build_subconscious_prompt(prompt_context),
     )
+    output_tokens = MAX_OUTPUT_TOKENS if batch == 1 else min(MAX_OUTPUT_TOKENS * batch, BATCH_MAX_OUTPUT_TOKENS)
+
+    route = router.choose_route("subconscious", context)
+    try:
+        started = clock.now()
+        response = create_response(
+            get_client(),
+            "subconscious",
+            deadline=deadline,
+            model=router.model_for(route),
+            temperature=context["guidance"].get("temperature", 0.9),
+            max_output_tokens=output_tokens,
+            response_format={"type": "json_object"},
+            **prompt,
+        )
+    except LLMUnavailable as exc:
+        # No thoughts this tick; the loop keeps its cadence.
+        context_threads.invalidate("subconscious", str(exc))
+        log_internal(f"[subconscious] {exc}")
+        return {"thoughts": [], "raw_stream": "", "metrics": {}}
+
+    router.record_call("subconscious", route, response, clock.now() - started)
+    _stats["calls"] += 1
+    usage = getattr(response, "usage", None)
+    _stats["input_tokens"] += getattr(usage, "input_tokens", 0) or 0
+    _stats["output_tokens"] += getattr(usage, "output_tokens", 0) or 0
 
     text = response.output[0].content[0].text  # type: ignore[attr-defined]
     try:
-        data = json.loads(text)
-    except json.JSONDecodeError:
-        # Fallback: wrap raw text in a single "thought"
+        data = parse_model_json("subconscious", text, SUBCONSCIOUS_BATCH_SCHEMA if batch > 1 else SUBCONSCIOUS_SCHEMA)
+        context_threads.commit("subconscious", response)
+    except ModelOutputError:
+        # Not JSON at all: keep the raw text as a single "thought"
+        context_threads.invalidate("subconscious", "unparseable reply")
         data = {
             "thoughts": [
                 {
@@ -65,8 +178,10 @@ def call_subconscious_llm(context: Dict[str, Any]) -> Dict[str, Any]:
             },
         }
 
-    # Minimal normalization
-    data.setdefault("thoughts", [])
-    data.setdefault("raw_stream", "")
-    data.setdefault("metrics", {})
+    if batch > 1:
+        # A model that ignored the batch format still gave us this tick's thoughts.
+        per_tick = [t["thoughts"] for t in data.pop("ticks", [])] or [data.get("thoughts", [])]
+        _planned.extend(per_tick[1:batch])
+        data["thoughts"] = per_tick[0]
+    data["thoughts"] = _served(data["thoughts"], context["tick"])
     return data
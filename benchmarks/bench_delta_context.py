@@ -0,0 +1,106 @@
+"""
+Delta-context mode: input tokens sent and billed per call, and call
+latency, for full-context prompts against delta threads
+(agents/context_threads.py) chained server-side (previous_response_id)
+or emulated locally (message list). Runs on a virtual clock against the
+fake backend, which keeps stored responses like the Responses API and
+adds --token-latency seconds per uncached input token. A user message
+arrives every --user-every ticks.
+
+Billed tokens include the chained thread, which the API re-bills as
+cached input; the fake does not model prefix caching of the local
+message list, so local mode is a worst case.
+
+    python -m benchmarks.bench_delta_context [--ticks 300] [--user-every 37] [--rebase-every 8]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+REPO_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--user-every", type=int, default=37)
+    parser.add_argument("--rebase-every", type=int, default=8)
+    parser.add_argument("--token-latency", type=float, default=0.0002)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="conscio-bench-delta-")
+    words = os.path.join(REPO_DATA_DIR, "random_words.txt")
+    if os.path.exists(words):
+        shutil.copy2(words, workdir)
+    os.environ["CONSCIO_DATA_DIR"] = workdir
+
+    import main as mind
+    from agents import context_threads, router
+    from agents.client import set_client
+    from agents.fake_client import FakeClient
+    from core.percepts import record_percept
+    from core.state import load_state
+    from utils import clock
+
+    sim_clock = clock.SimulatedClock(start=1_700_000_000.0)
+    clock.set_clock(sim_clock)
+    # Fixed routes, so the model name tells the layers apart
+    router.configure(POLICIES={"conscious": {"mode": "full"}, "subconscious": {"mode": "mini"}})
+    layer_of = {router.MODELS["full"]: "conscious", router.MODELS["mini"]: "subconscious"}
+
+    class MeasuringClient(FakeClient):
+        def _create(self, request: dict):
+            prompt = request.get("input", "")
+            sent = len(prompt if isinstance(prompt, str) else json.dumps(prompt)) // 4
+            started = clock.now()
+            response = super()._create(request)
+            calls = self.measured.setdefault(layer_of[request["model"]], [])
+            usage = response.usage
+            calls.append((sent, usage.input_tokens, usage.input_tokens_details.cached_tokens, clock.now() - started))
+            return response
+
+    def before_tick(state: dict) -> None:
+        if state["tick"] % args.user_every == 0:
+            record_percept(source="user", content=f"message at tick {state['tick']}", tags=["bench"])
+            state["speech_state"]["last_user_wall_time"] = clock.now()
+
+    modes = {
+        "full": {"DELTA_LAYERS": set()},
+        "delta server": {"DELTA_LAYERS": {"conscious", "subconscious"}, "THREAD_MODE": "server"},
+        "delta local": {"DELTA_LAYERS": {"conscious", "subconscious"}, "THREAD_MODE": "local"},
+    }
+    print(f"{args.ticks} ticks, rebase every {args.rebase_every} turns")
+    print(
+        f"  {'mode':<14}{'layer':<14}{'sent tok':>10}{'billed tok':>12}{'cached':>8}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'cpu ms/tick':>13}"
+    )
+    for name, settings in modes.items():
+        context_threads.configure(REBASE_EVERY_TURNS=args.rebase_every, **settings)
+        fake = MeasuringClient(sleep=sim_clock.sleep, latency=lambda: 0.3, token_latency=args.token_latency)
+        fake.measured = {}
+        set_client(fake)
+        state = load_state()
+        state["speech_state"]["last_user_wall_time"] = clock.now()
+        cpu_started = time.process_time()
+        mind.run(state, max_ticks=args.ticks, before_tick=before_tick)
+        cpu_ms = (time.process_time() - cpu_started) / args.ticks * 1e3
+        for layer, calls in sorted(fake.measured.items()):
+            latencies = sorted(c[3] for c in calls)
+            print(
+                f"  {name:<14}{layer:<14}{statistics.mean(c[0] for c in calls):>10.0f}"
+                f"{statistics.mean(c[1] for c in calls):>12.0f}{statistics.mean(c[2] for c in calls):>8.0f}"
+                f"{latencies[len(latencies) // 2] * 1e3:>9.0f}"
+                f"{latencies[int(0.95 * (len(latencies) - 1))] * 1e3:>9.0f}{cpu_ms:>13.2f}"
+            )
+        if settings["DELTA_LAYERS"]:
+            for layer, s in context_threads.get_stats().items():
+                print(f"  {'':<14}{layer:<14}rebases {s['rebases']}, invalidated {s['invalidated']}")
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Goal store: per-tick top-k reads and single-goal updates with the SQLite
+store in core/goals.py, against the old approach of loading goals.json,
+filtering and sorting it on every read and rewriting it on every update.
+Runs in a scratch data directory.
+
+    python -m benchmarks.bench_goals [--goals 5000] [--ops 2000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--goals", type=int, default=5000)
+    parser.add_argument("--ops", type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ["CONSCIO_DATA_DIR"] = tempfile.mkdtemp(prefix="conscio-bench-goals-")
+    from core import goals
+    from utils.persistence import load_json, save_json
+
+    rng = random.Random(0)
+    statuses = ["active", "active", "paused", "done"]
+    seed = [
+        {
+            "id": f"goal-{i}",
+            "description": f"goal number {i}",
+            "status": rng.choice(statuses),
+            "priority": rng.random(),
+            "created_at": float(i),
+            "updated_at": float(i),
+            "parent_id": f"goal-{rng.randrange(i)}" if i and rng.random() < 0.5 else None,
+        }
+        for i in range(args.goals)
+    ]
+    legacy_path = os.path.join(os.environ["CONSCIO_DATA_DIR"], "legacy_goals.json")
+    save_json(legacy_path, seed)
+    goals.save_goals(seed)
+    ids = [g["id"] for g in seed]
+
+    def legacy_top(limit: int = 3):
+        active = [g for g in load_json(legacy_path, []) if g.get("status") == "active"]
+        return sorted(active, key=lambda g: g.get("priority", 0), reverse=True)[:limit]
+
+    def legacy_update(goal_id: str, **patch):
+        data = load_json(legacy_path, [])
+        for g in data:
+            if g["id"] == goal_id:
+                g.update(patch)
+                break
+        save_json(legacy_path, data)
+
+    def timed(fn, n: int) -> float:
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        return (time.perf_counter() - start) / n * 1e6
+
+    assert [g["id"] for g in legacy_top()] == [g.id for g in goals.get_active_goals(3)]
+
+    print(f"{args.goals:,} goals, {args.ops:,} ops each (µs/op)")
+    legacy_us = timed(legacy_top, args.ops)
+    store_us = timed(lambda: goals.get_active_goals(3), args.ops)
+    print(f"  top-3 read      json {legacy_us:>10,.1f}   store {store_us:>10,.1f}")
+    legacy_us = timed(lambda: legacy_update(rng.choice(ids), priority=rng.random()), args.ops)
+    store_us = timed(lambda: goals.update_goal(rng.choice(ids), priority=rng.random()), args.ops)
+    print(f"  update priority json {legacy_us:>10,.1f}   store {store_us:>10,.1f}")
+    mixed_us = timed(
+        lambda: (goals.update_goal(rng.choice(ids), progress=rng.random()), goals.get_active_goals(3)), args.ops
+    )
+    print(f"  update+top-3    store {mixed_us:>10,.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Observer API under polling load: tick latency of the live loop while a
+separate process polls it with --readers threads at --hz each, either
+  files     reading state.json, memory.json and tick_log.txt (the old way)
+  http      GET /snapshot with If-None-Match, server inside the mind's process
+  snapshot  observer.FileSnapshots on data/observer/snapshot.json (what
+            tools/observe.py uses; no reader code runs in the mind's process)
+against no readers at all. Also reports the readers' request rate, how
+often a file reader saw state from two different ticks (torn), and the
+in-process cost of observer.latest().
+
+    python -m benchmarks.bench_observer [--ticks 300] [--readers 8] [--hz 50]
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+REPO_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def _poll_files(data_dir: str, hz: float, stop, counts) -> None:
+    import json
+    import re
+
+    from utils.persistence import load_json
+
+    period = 1.0 / hz
+    while not stop.is_set():
+        state = load_json(os.path.join(data_dir, "state.json"), {})
+        load_json(os.path.join(data_dir, "memory.json"), [])
+        try:
+            with open(os.path.join(data_dir, "tick_log.txt"), "rb") as f:
+                f.seek(max(0, os.fstat(f.fileno()).st_size - 4096))
+                ticks = re.findall(rb"\[tick (\d+)\]", f.read())
+        except OSError:
+            ticks = []
+        with counts.get_lock():
+            counts[0] += 1
+            # The log and state.json are written at different points of a tick
+            if ticks and state and int(ticks[-1]) != state.get("tick"):
+                counts[1] += 1
+        json.dumps(state)
+        time.sleep(period)
+
+
+def _poll_observer(port: int, hz: float, stop, counts) -> None:
+    import http.client
+
+    period = 1.0 / hz
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    etag = ""
+    while not stop.is_set():
+        conn.request("GET", "/snapshot", headers={"If-None-Match": etag} if etag else {})
+        response = conn.getresponse()
+        response.read()
+        etag = response.getheader("ETag") or etag
+        with counts.get_lock():
+            counts[0] += 1
+        time.sleep(period)
+
+
+def _poll_snapshot_file(path: str, hz: float, stop, counts) -> None:
+    from core.observer import FileSnapshots
+
+    period = 1.0 / hz
+    source = FileSnapshots(path)
+    while not stop.is_set():
+        snapshot = source.latest()
+        with counts.get_lock():
+            counts[0] += 1
+            if snapshot is not None and snapshot.data()["state"]["tick"] != snapshot.tick:
+                counts[1] += 1
+        time.sleep(period)
+
+
+def _readers(kind: str, target, readers: int, hz: float, stop, counts) -> None:
+    import threading
+
+    fn = {"files": _poll_files, "http": _poll_observer, "snapshot": _poll_snapshot_file}[kind]
+    threads = [threading.Thread(target=fn, args=(target, hz, stop, counts)) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=300)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--hz", type=float, default=50.0)
+    parser.add_argument("--port", type=int, default=7463)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="conscio-bench-observer-")
+    words = os.path.join(REPO_DATA_DIR, "random_words.txt")
+    if os.path.exists(words):
+        shutil.copy2(words, workdir)
+    os.environ["CONSCIO_DATA_DIR"] = workdir
+
+    import main as mind
+    from agents.client import set_client
+    from agents.fake_client import FakeClient
+    from core import observer
+    from core.state import load_state
+    from utils import clock
+
+    set_client(FakeClient())
+    stop_server = observer.start_server(args.port)
+    ctx = multiprocessing.get_context("spawn")
+
+    print(f"{args.ticks} ticks; {args.readers} reader threads at {args.hz:g} Hz each, in another process")
+    print(f"  {'readers':<10}{'tick p50 ms':>12}{'p95 ms':>9}{'reads/s':>9}{'torn':>6}")
+    targets = {"files": workdir, "http": args.port, "snapshot": observer.SNAPSHOT_FILE}
+    for kind in ("none", "files", "http", "snapshot"):
+        stop, counts = ctx.Event(), ctx.Array("l", 2)
+        proc = None
+        if kind != "none":
+            proc = ctx.Process(target=_readers, args=(kind, targets[kind], args.readers, args.hz, stop, counts))
+            proc.start()
+            time.sleep(1.0)  # let the spawned interpreter import and start polling
+        state = load_state()
+        latencies = []
+        started = time.perf_counter()
+        reads_before = counts[0]
+        for _ in range(args.ticks):
+            state["speech_state"]["last_user_wall_time"] = clock.now()
+            t0 = time.perf_counter()
+            state = mind.tick(state)
+            mind.save_state(state)
+            latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - started
+        reads = counts[0] - reads_before
+        stop.set()
+        if proc is not None:
+            proc.join()
+        latencies.sort()
+        print(
+            f"  {kind:<10}{statistics.median(latencies) * 1e3:>12.2f}"
+            f"{latencies[int(0.95 * (len(latencies) - 1))] * 1e3:>9.2f}{reads / elapsed:>9.0f}{counts[1]:>6}"
+        )
+
+    n = 100_000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        observer.latest()
+    print(f"\nin-process observer.latest(): {(time.perf_counter() - t0) / n * 1e9:.0f} ns")
+    stats = observer.get_stats()
+    print(f"publish cost per tick: {stats['publish_ms']} ms, snapshot {stats['bytes']} bytes")
+    stop_server.set()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
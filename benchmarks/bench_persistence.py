@@ -0,0 +1,104 @@
+"""
+Persistence under multi-process contention. --procs writer processes each
+increment a counter document --ops times while one reader process loads
+it in a loop. Modes:
+
+  unlocked     load_json + save_json (the old per-process lock only)
+  update_json  locked read-modify-write (per-file flock)
+  own file     update_json, but every writer on its own file
+
+Reports lost updates, writer throughput, reader latency, and reads that
+did not decode (torn snapshots; should always be 0).
+
+    python -m benchmarks.bench_persistence [--procs 4] [--ops 300]
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from typing import List
+
+
+def _bump(doc: dict) -> None:
+    doc["n"] = doc.get("n", 0) + 1
+    doc["pad"] = "x" * 2048  # a realistic document size, so writes take a moment
+
+
+def _writer(mode: str, path: str, ops: int, start: multiprocessing.Event) -> None:
+    from utils.persistence import load_json, save_json, update_json
+
+    start.wait()
+    for _ in range(ops):
+        if mode == "unlocked":
+            doc = load_json(path, {})
+            _bump(doc)
+            save_json(path, doc)
+        else:
+            update_json(path, _bump, {})
+
+
+def _reader(path: str, stop: multiprocessing.Event, out: multiprocessing.Queue) -> None:
+    from utils.persistence import load_versioned
+
+    latencies: List[float] = []
+    torn = 0
+    while not stop.is_set():
+        started = time.perf_counter()
+        doc, version = load_versioned(path, None)
+        latencies.append(time.perf_counter() - started)
+        if version is not None and not isinstance(doc, dict):
+            torn += 1
+    out.put((latencies, torn))
+
+
+def _run(mode: str, workdir: str, procs: int, ops: int) -> None:
+    ctx = multiprocessing.get_context("spawn")
+    shared = os.path.join(workdir, f"{mode.replace(' ', '_')}.json")
+    paths = [f"{shared}.{i}" if mode == "own file" else shared for i in range(procs)]
+    start, stop, out = ctx.Event(), ctx.Event(), ctx.Queue()
+    writers = [ctx.Process(target=_writer, args=(mode, p, ops, start)) for p in paths]
+    reader = ctx.Process(target=_reader, args=(paths[0], stop, out))
+    for p in writers + [reader]:
+        p.start()
+    time.sleep(0.5)  # let the spawned interpreters import
+    began = time.perf_counter()
+    start.set()
+    for p in writers:
+        p.join()
+    elapsed = time.perf_counter() - began
+    stop.set()
+    latencies, torn = out.get()
+    reader.join()
+
+    from utils.persistence import load_json
+
+    done = sum(load_json(p, {}).get("n", 0) for p in set(paths))
+    lost = procs * ops - done
+    latencies.sort()
+    p99 = latencies[int(0.99 * (len(latencies) - 1))] if latencies else 0.0
+    median = statistics.median(latencies) if latencies else 0.0
+    print(
+        f"  {mode:<12}{lost:>7}{procs * ops / elapsed:>10.0f}{len(latencies):>9}"
+        f"{median * 1e6:>10.0f}{p99 * 1e6:>10.0f}{torn:>7}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--procs", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=300)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="conscio-bench-persist-")
+    print(f"{args.procs} writers x {args.ops} increments, 1 lock-free reader")
+    print(f"  {'mode':<12}{'lost':>7}{'writes/s':>10}{'reads':>9}{'read p50':>10}{'p99 µs':>10}{'torn':>7}")
+    for mode in ("unlocked", "update_json", "own file"):
+        _run(mode, workdir, args.procs, args.ops)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Prompt build cost per tick with the shared rendering cache
+(agents/prompt_cache.py) against rendering every section from scratch.
+
+Each tick rebuilds both layers' prompts, as full prompts (the default)
+and as sections (delta-context mode), from a context of --goals active
+goals, --memory memory candidates and --percepts percepts, recreated as
+fresh records every tick the way the stores return them. Per tick one
+percept arrives, the subconscious produces 3 new thoughts, every memory
+candidate's access counters change, and every 10th tick one goal's
+priority changes. Reports the median build time and the peak of
+transient allocations per tick (tracemalloc).
+
+    python -m benchmarks.bench_prompts [--ticks 500] [--goals 200] [--memory 200] [--percepts 50]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--goals", type=int, default=200)
+    parser.add_argument("--memory", type=int, default=200)
+    parser.add_argument("--percepts", type=int, default=50)
+    args = parser.parse_args()
+
+    os.environ["CONSCIO_DATA_DIR"] = tempfile.mkdtemp(prefix="conscio-bench-prompts-")
+    from agents import prompt_cache
+    from agents.prompts_conscious import build_conscious_prompt, conscious_sections
+    from agents.prompts_subconscious import build_subconscious_prompt, subconscious_sections
+    from core.records import Goal, MemoryItem, Percept, Thought
+
+    text = "a fairly ordinary sentence about the garden, the river and the lantern by the harbor"
+    goal_rows = [
+        {"id": f"goal-{i}", "description": f"goal {i}: {text}", "priority": (i % 10) / 10} for i in range(args.goals)
+    ]
+    memory_rows = [
+        {"id": f"mem-{i}", "type": "fact", "content": f"memory {i}: {text}", "access_count": 0}
+        for i in range(args.memory)
+    ]
+
+    def _thought(n: int, tick: int) -> Thought:
+        return Thought(id=f"t-{n}", timestamp=tick, content=f"thought {n}: {text}")
+
+    def contexts(tick: int):
+        if tick % 10 == 0:
+            goal_rows[tick // 10 % len(goal_rows)]["priority"] = (tick % 7) / 7
+        for m in memory_rows:
+            m["access_count"] += 1
+            m["last_accessed"] = float(tick)
+        goals = [Goal.from_dict(g) for g in goal_rows]
+        memory = [MemoryItem.from_dict(m) for m in memory_rows]
+        percepts = [
+            Percept(id=f"p-{t}", source="user", timestamp=float(t), content=f"message {t}: {text}")
+            for t in range(max(0, tick - args.percepts), tick + 1)
+        ]
+        recent = [_thought(t, tick) for t in range(tick * 3 - 5, tick * 3)]
+        new = [_thought(t, tick) for t in range(tick * 3, tick * 3 + 3)]
+        speech_state = {"mode": "cohost", "last_user_tick": tick, "last_speak_tick": tick // 4}
+        sub_ctx = {
+            "tick": tick,
+            "recent_percepts": percepts,
+            "active_goals": goals,
+            "recent_thoughts": recent,
+            "guidance": {"focus_tags": ["garden"], "max_ideas": 3, "temperature": 0.9},
+            "random_seed_words": ["river", "lantern", "orbit"],
+            "batch_ticks": 1,
+        }
+        cons_ctx = {
+            "tick": tick,
+            "subconscious_output": {"thoughts": new},
+            "recent_percepts": percepts,
+            "active_goals": goals,
+            "memory_candidates": memory,
+            "speech_state": speech_state,
+        }
+        return sub_ctx, cons_ctx
+
+    builds = {
+        "full prompts": lambda sub, cons: (build_subconscious_prompt(sub), build_conscious_prompt(cons)),
+        "sections": lambda sub, cons: (subconscious_sections(sub), conscious_sections(cons)),
+    }
+
+    print(f"{args.ticks} ticks; {args.goals} goals, {args.memory} memory items, {args.percepts} percepts per prompt")
+    print(f"  {'build':<14}{'cache':<7}{'median us':>10}{'p95 us':>9}{'peak alloc KiB':>16}")
+    for name, build in builds.items():
+        for enabled in (False, True):
+            prompt_cache.configure(ENABLED=enabled)
+            peaks = []
+            tracemalloc.start()
+            for tick in range(1, args.ticks + 1):
+                sub_ctx, cons_ctx = contexts(tick)
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                build(sub_ctx, cons_ctx)
+                peaks.append(tracemalloc.get_traced_memory()[1] - base)
+            tracemalloc.stop()
+            # Timed in a second pass without tracemalloc, from a cold cache again
+            prompt_cache.clear()
+            times = []
+            for tick in range(1, args.ticks + 1):
+                sub_ctx, cons_ctx = contexts(tick)
+                t0 = time.perf_counter()
+                build(sub_ctx, cons_ctx)
+                times.append(time.perf_counter() - t0)
+            times.sort()
+            print(
+                f"  {name:<14}{'on' if enabled else 'off':<7}{statistics.median(times) * 1e6:>10.0f}"
+                f"{times[int(0.95 * (len(times) - 1))] * 1e6:>9.0f}{statistics.median(peaks) / 1024:>16.1f}"
+            )
+    print(f"\ncache: {prompt_cache.get_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+tracemalloc comparison of free-form dicts vs the typed records in
+core/records.py: retained bytes per object, and bytes allocated per tick
+for the read-side context (5 percepts, 3 goals, 10 memory items,
+20 recent thoughts) plus prompt section formatting.
+
+    python -m benchmarks.bench_records [--objects 10000] [--ticks 1000]
+"""
+import argparse
+import gc
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from core.records import Goal, MemoryItem, Percept, Thought
+
+SAMPLES: Dict[str, Dict[str, Any]] = {
+    "percept": {
+        "id": "percept-1766765273135",
+        "source": "user",
+        "timestamp": 1766765273.1359708,
+        "content": "Hello. Let's think about what kinds of AI tools might be useful to school districts.",
+        "tags": ["cli"],
+    },
+    "thought": {
+        "id": "t51-1",
+        "timestamp": 51,
+        "content": "Title I compliance could be seen as a chrysalis moment for school districts.",
+        "tags": ["Title I", "compliance"],
+        "confidence": 0.8,
+        "novelty": 0.6,
+        "related_goals": [],
+    },
+    "memory": {
+        "type": "semantic",
+        "content": "A horizon can represent both a limit and an invitation to explore.",
+        "importance": 0.7,
+        "id": "mem-1766765289341",
+        "created_at": 1766765289.3419788,
+        "last_accessed": 1766765289.3419788,
+        "access_count": 0,
+    },
+    "goal": {
+        "id": "goal-1766765289341",
+        "description": "Help the user brainstorm AI tools for school districts",
+        "status": "active",
+        "priority": 0.8,
+        "created_at": 1766765289.3,
+        "updated_at": 1766765289.3,
+        "subgoals": [],
+    },
+}
+RECORD_TYPES = {"percept": Percept, "thought": Thought, "memory": MemoryItem, "goal": Goal}
+TICK_SHAPE = {"percept": 5, "goal": 3, "memory": 10, "thought": 20}
+
+
+def _measure(build: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keep = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del keep
+    return after - before
+
+
+def _fresh(sample: Dict[str, Any], i: int) -> Dict[str, Any]:
+    # New string objects per item, as if each came from json decoding.
+    d = dict(sample)
+    d["id"] = f"{sample['id']}-{i}"
+    d["content"] = f"{sample.get('content', sample.get('description'))} #{i}"
+    return d
+
+
+def _fmt_dicts(ctx: Dict[str, List[Dict[str, Any]]]) -> str:
+    parts = [f'- [{g.get("id")}] (prio={g.get("priority", 0):.2f}) {g.get("description")}' for g in ctx["goal"]]
+    parts += [f'- [{p.get("source")}] {p.get("content")[:120]}' for p in ctx["percept"]]
+    parts += [f'- [{m.get("type")}] {m.get("content")[:120]}' for m in ctx["memory"]]
+    parts += [f'- {t.get("content")[:120]}' for t in ctx["thought"][-5:]]
+    return "\n".join(parts)
+
+
+def _fmt_records(ctx: Dict[str, list]) -> str:
+    parts = [f"- [{g.id}] (prio={g.priority:.2f}) {g.description}" for g in ctx["goal"]]
+    parts += [f"- [{p.source}] {p.content[:120]}" for p in ctx["percept"]]
+    parts += [f"- [{m.type}] {m.content[:120]}" for m in ctx["memory"]]
+    parts += [f"- {t.content[:120]}" for t in ctx["thought"][-5:]]
+    return "\n".join(parts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=1000)
+    args = parser.parse_args()
+    n = args.objects
+
+    print(f"Retained bytes per object ({n} objects each)")
+    print(f"  {'type':<10}{'dict':>10}{'record':>10}{'saved':>8}")
+    for name, sample in SAMPLES.items():
+        dicts = [_fresh(sample, i) for i in range(n)]
+        as_dicts = _measure(lambda: [dict(d) for d in dicts])
+        as_records = _measure(lambda: [RECORD_TYPES[name].from_dict(d) for d in dicts])
+        print(f"  {name:<10}{as_dicts / n:>10.0f}{as_records / n:>10.0f}{1 - as_records / as_dicts:>8.0%}")
+
+    raw = {name: [_fresh(SAMPLES[name], i) for i in range(count)] for name, count in TICK_SHAPE.items()}
+    dict_ctx = {name: [dict(d) for d in items] for name, items in raw.items()}
+    record_ctx = {name: [RECORD_TYPES[name].from_dict(d) for d in items] for name, items in raw.items()}
+
+    ticks = args.ticks
+    held_dicts = _measure(lambda: [{k: [dict(d) for d in v] for k, v in raw.items()} for _ in range(ticks)])
+    held_records = _measure(
+        lambda: [{k: [RECORD_TYPES[k].from_dict(d) for d in v] for k, v in raw.items()} for _ in range(ticks)]
+    )
+    fmt_dicts = _measure(lambda: [_fmt_dicts(dict_ctx) for _ in range(ticks)])
+    fmt_records = _measure(lambda: [_fmt_records(record_ctx) for _ in range(ticks)])
+
+    print(f"\nPer-tick bytes ({ticks} ticks)")
+    print(f"  {'stage':<22}{'dict':>10}{'record':>10}")
+    print(f"  {'context held':<22}{held_dicts / ticks:>10.0f}{held_records / ticks:>10.0f}")
+    print(f"  {'prompt sections':<22}{fmt_dicts / ticks:>10.0f}{fmt_records / ticks:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
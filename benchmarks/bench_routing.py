@@ -0,0 +1,87 @@
+"""
+Model routing: conscious-layer calls, escalations, estimated cost and
+latency per route for a fixed policy (always the full model) against the
+adaptive router in agents/router.py. Runs on a virtual clock against the
+fake backend, with the full model slower than the mini one and the mini
+model returning cut-off JSON --bad-rate of the time. A user message every
+--user-every ticks gives the adaptive policy something worth escalating.
+
+    python -m benchmarks.bench_routing [--ticks 600] [--user-every 37] [--bad-rate 0.05]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+REPO_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--user-every", type=int, default=37)
+    parser.add_argument("--bad-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="conscio-bench-routing-")
+    words = os.path.join(REPO_DATA_DIR, "random_words.txt")
+    if os.path.exists(words):
+        shutil.copy2(words, workdir)
+    os.environ["CONSCIO_DATA_DIR"] = workdir
+
+    import main as mind
+    from agents import router
+    from agents.client import set_client
+    from agents.fake_client import FakeClient, lognormal_latency
+    from core.percepts import record_percept
+    from core.state import load_state
+    from utils import clock
+
+    sim_clock = clock.SimulatedClock(start=1_700_000_000.0)
+    clock.set_clock(sim_clock)
+    set_client(
+        FakeClient(
+            sleep=sim_clock.sleep,
+            model_latency={
+                router.MODELS["mini"]: lognormal_latency(median=0.4, tail_prob=0.0),
+                router.MODELS["full"]: lognormal_latency(median=1.2, tail_prob=0.0),
+            },
+            bad_output_rate={router.MODELS["mini"]: args.bad_rate},
+        )
+    )
+
+    def before_tick(state: dict) -> None:
+        if state["tick"] % args.user_every == 0:
+            record_percept(source="user", content=f"message at tick {state['tick']}", tags=["bench"])
+            state["speech_state"]["last_user_wall_time"] = clock.now()
+
+    policies = {
+        "always full": {"mode": "full", "escalate": False},
+        "adaptive": {"mode": "adaptive", "escalate": True},
+    }
+    print(
+        f"  {'policy':<12}{'route':<6}{'calls':>7}{'escalated':>11}{'cost $':>10}"
+        f"{'p50 ms':>9}{'p95 ms':>9}"
+    )
+    for name, policy in policies.items():
+        router.configure(POLICIES=dict(router.POLICIES, conscious=policy))
+        router.reset_stats()
+        state = load_state()
+        state["speech_state"]["last_user_wall_time"] = clock.now()
+        mind.run(state, max_ticks=args.ticks, before_tick=before_tick)
+        total = 0.0
+        for key, s in sorted(router.get_stats().items()):
+            layer, route = key.split(":")
+            if layer != "conscious":
+                continue
+            total += s["cost_usd"]
+            print(
+                f"  {name:<12}{route:<6}{s['calls']:>7}{s['escalated_from']:>11}{s['cost_usd']:>10.4f}"
+                f"{s['latency_p50_ms']:>9.0f}{s['latency_p95_ms']:>9.0f}"
+            )
+        print(f"  {name:<12}{'all':<6}{'':>18}{total:>10.4f}")
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Compare encode/decode time and on-disk size of each installed serializer
+against the legacy pretty-printed JSON, using the real files in data/.
+
+    python -m benchmarks.bench_serialization [--repeat 200]
+"""
+import argparse
+import glob
+import json
+import os
+import time
+
+from utils.paths import DATA_DIR
+from utils.serialization import available_formats, decode_document, encode_document
+
+
+def _time_per_call(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def bench_file(path: str, repeat: int) -> None:
+    with open(path, "rb") as f:
+        data = decode_document(f.read())
+
+    legacy = json.dumps(data, indent=2).encode("utf-8")
+    rows = [
+        (
+            "legacy(indent=2)",
+            len(legacy),
+            _time_per_call(lambda: json.dumps(data, indent=2).encode("utf-8"), repeat),
+            _time_per_call(lambda: json.loads(legacy), repeat),
+        )
+    ]
+    for fmt in available_formats():
+        raw = encode_document(data, fmt)
+        rows.append(
+            (
+                fmt,
+                len(raw),
+                _time_per_call(lambda: encode_document(data, fmt), repeat),
+                _time_per_call(lambda: decode_document(raw), repeat),
+            )
+        )
+
+    print(f"\n{os.path.basename(path)}")
+    print(f"  {'format':<18}{'bytes':>10}{'ratio':>8}{'encode us':>12}{'decode us':>12}")
+    for name, size, enc, dec in rows:
+        print(f"  {name:<18}{size:>10}{size / len(legacy):>8.2f}{enc * 1e6:>12.1f}{dec * 1e6:>12.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, "*.json"))):
+        bench_file(path, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Cold-start time to the first tick. Each run is a fresh interpreter with
+-X importtime that imports main, loads state from a scratch data directory
+and runs one tick against the fake backend. Reports the median wall time
+(interpreter start to first tick done), its phases, and the slowest
+imports, so regressions in startup cost show up next to their cause.
+
+If the OpenAI SDK is installed, its import time is reported separately:
+that cost now lands in the background prewarm, not before the first tick.
+
+    python -m benchmarks.bench_startup [--runs 5] [--top 10]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_FIRST_TICK = """
+import json, time
+t0 = time.perf_counter()
+import main as mind
+t1 = time.perf_counter()
+from agents.client import set_client
+from agents.fake_client import FakeClient
+set_client(FakeClient())
+state = mind.load_state()
+t2 = time.perf_counter()
+mind.tick(state)
+t3 = time.perf_counter()
+print(json.dumps({"import_main": t1 - t0, "load_state": t2 - t1, "first_tick": t3 - t2}))
+"""
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) per line of -X importtime output."""
+    out = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        out.append((name, int(self_us), int(cumulative_us)))
+    return out
+
+
+def _run_once(data_dir: str) -> Tuple[float, Dict[str, float], List[Tuple[str, int, int]]]:
+    env = dict(os.environ, CONSCIO_DATA_DIR=data_dir)
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _FIRST_TICK],
+        cwd=REPO_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - start
+    phases = json.loads(proc.stdout.strip().splitlines()[-1])
+    return wall, phases, _parse_importtime(proc.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    walls: List[float] = []
+    phases: Dict[str, List[float]] = {}
+    imports: Dict[str, List[Tuple[int, int]]] = {}
+    for _ in range(args.runs):
+        data_dir = tempfile.mkdtemp(prefix="conscio-bench-startup-")
+        words = os.path.join(REPO_DIR, "data", "random_words.txt")
+        if os.path.exists(words):
+            shutil.copy2(words, data_dir)
+        wall, run_phases, run_imports = _run_once(data_dir)
+        shutil.rmtree(data_dir, ignore_errors=True)
+        walls.append(wall)
+        for key, value in run_phases.items():
+            phases.setdefault(key, []).append(value)
+        for name, self_us, cumulative_us in run_imports:
+            imports.setdefault(name, []).append((self_us, cumulative_us))
+
+    print(f"cold start to first tick, median of {args.runs} runs: {statistics.median(walls) * 1e3:.1f} ms")
+    for key, values in phases.items():
+        print(f"  {key:<12}{statistics.median(values) * 1e3:>9.1f} ms")
+
+    medians = {
+        name: (statistics.median(s for s, _ in v), statistics.median(c for _, c in v)) for name, v in imports.items()
+    }
+    print(f"\nslowest imports by cumulative time (ms), top {args.top}:")
+    for name, (self_us, cumulative_us) in sorted(medians.items(), key=lambda kv: -kv[1][1])[: args.top]:
+        print(f"  {name:<36}{cumulative_us / 1e3:>8.1f}  (self {self_us / 1e3:.1f})")
+
+    probe = subprocess.run(
+        [sys.executable, "-c", "import time; t = time.perf_counter(); import openai; print(time.perf_counter() - t)"],
+        capture_output=True,
+        text=True,
+    )
+    if probe.returncode == 0:
+        print(f"\nopenai SDK import (deferred to prewarm): {float(probe.stdout) * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Peak memory of reading and growing large memory stores: streaming
+(utils.persistence.iter_items / iter_lines / append_lines, as core.memory
+uses them) against loading whole documents with load_json.
+
+For each store size in --sizes, a fresh interpreter runs one operation and
+reports its time and how far it raised the process's peak RSS:
+  recent   top-10 most recent items of a hot set of that many items
+           (load + sort, against get_recent_memory's streaming top-k)
+  archive  archive 100 evicted items into an archive of that many items
+           (load + extend + rewrite, against an append to the JSON Lines archive)
+
+    python -m benchmarks.bench_streaming [--sizes 10000,100000,300000]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_SETUP = """
+import random
+from core import memory
+from utils.persistence import append_lines, save_json
+text = "a fairly ordinary sentence about the garden, the river and the lantern by the harbor, " * 3
+items = [
+    {"id": f"mem-{i}", "type": "fact", "content": f"{i}: {text}", "importance": 0.5,
+     "created_at": float(i), "last_accessed": float(random.Random(i).random() * 1e6), "access_count": 0}
+    for i in range(SIZE)
+]
+save_json(memory.MEMORY_FILE, items)
+save_json(memory.LEGACY_ARCHIVE_FILE + ".whole", items)
+append_lines(memory.ARCHIVE_FILE, items)
+"""
+
+_RUN = """
+import json, resource, time
+from core import memory
+from utils.persistence import append_lines, load_json, save_json
+cold = [{"id": f"cold-{i}", "type": "fact", "content": "evicted"} for i in range(100)]
+
+def old_recent():
+    items = load_json(memory.MEMORY_FILE, [])
+    return sorted(items, key=memory.memory_recency, reverse=True)[:10]
+
+def old_archive():
+    data = load_json(memory.LEGACY_ARCHIVE_FILE + ".whole", [])
+    data.extend(cold)
+    save_json(memory.LEGACY_ARCHIVE_FILE + ".whole", data)
+
+ops = {
+    ("recent", "load"): old_recent,
+    ("recent", "stream"): lambda: memory.get_recent_memory(10),
+    ("archive", "load"): old_archive,
+    ("archive", "stream"): lambda: append_lines(memory.ARCHIVE_FILE, cold),
+}
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t0 = time.perf_counter()
+ops[(OP, MODE)]()
+elapsed = time.perf_counter() - t0
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"seconds": elapsed, "peak_mb": (after - before) / 1024}))
+"""
+
+
+def _python(code: str, data_dir: str) -> str:
+    env = dict(os.environ, CONSCIO_DATA_DIR=data_dir)
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, cwd=REPO_DIR, capture_output=True, text=True, check=True
+    )
+    return out.stdout.strip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,300000")
+    args = parser.parse_args()
+
+    print(f"  {'items':>8}  {'op':<9}{'file MiB':>9}{'load ms':>9}{'+peak MiB':>10}{'stream ms':>11}{'+peak MiB':>10}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        data_dir = tempfile.mkdtemp(prefix="conscio-bench-streaming-")
+        _python(_SETUP.replace("SIZE", str(size)), data_dir)
+        file_mb = os.path.getsize(os.path.join(data_dir, "memory.json")) / 2**20
+        for op in ("recent", "archive"):
+            results = {}
+            for mode in ("load", "stream"):
+                code = _RUN.replace("(OP, MODE)", repr((op, mode)))
+                results[mode] = json.loads(_python(code, data_dir).splitlines()[-1])
+            load, stream = results["load"], results["stream"]
+            print(
+                f"  {size:>8}  {op:<9}{file_mb:>9.1f}{load['seconds'] * 1e3:>9.0f}{load['peak_mb']:>10.1f}"
+                f"{stream['seconds'] * 1e3:>11.1f}{stream['peak_mb']:>10.1f}"
+            )
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
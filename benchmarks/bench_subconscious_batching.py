@@ -0,0 +1,69 @@
+"""
+Subconscious batching: model calls per minute and tokens per thought for
+per-tick generation versus planning several ticks per call, on a virtual
+clock against the fake backend. A user message every --user-every ticks
+invalidates whatever is queued, as it would live.
+
+    python -m benchmarks.bench_subconscious_batching [--ticks 600] [--batches 1 3 5 10] [--user-every 37]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+REPO_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 3, 5, 10])
+    parser.add_argument("--user-every", type=int, default=37)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="conscio-bench-batch-")
+    words = os.path.join(REPO_DATA_DIR, "random_words.txt")
+    if os.path.exists(words):
+        shutil.copy2(words, workdir)
+    os.environ["CONSCIO_DATA_DIR"] = workdir
+
+    import main as mind
+    from agents import subconscious
+    from agents.client import set_client
+    from agents.fake_client import FakeClient
+    from core.percepts import record_percept
+    from core.state import load_state
+    from utils import clock
+
+    sim_clock = clock.SimulatedClock(start=1_700_000_000.0)
+    clock.set_clock(sim_clock)
+    set_client(FakeClient(sleep=sim_clock.sleep))
+
+    def before_tick(state: dict) -> None:
+        if state["tick"] % args.user_every == 0:
+            record_percept(source="user", content=f"message at tick {state['tick']}", tags=["bench"])
+            state["speech_state"]["last_user_wall_time"] = clock.now()
+
+    print(
+        f"  {'batch':>5}{'calls/min':>11}{'tokens/thought':>16}{'in tok/tick':>13}"
+        f"{'from queue':>12}{'invalidated':>13}{'discarded':>11}"
+    )
+    for batch in args.batches:
+        subconscious.configure(BATCH_TICKS=batch)
+        subconscious.reset_stats()
+        state = load_state()
+        state["speech_state"]["last_user_wall_time"] = clock.now()
+        started = clock.now()
+        mind.run(state, max_ticks=args.ticks, before_tick=before_tick)
+        minutes = (clock.now() - started) / 60.0
+        s = subconscious.get_stats()
+        print(
+            f"  {batch:>5}{s['calls'] / minutes:>11.1f}{s['tokens_per_thought']:>16.1f}"
+            f"{s['input_tokens'] / s['ticks']:>13.1f}{s['served_from_queue']:>12}"
+            f"{s['invalidations']:>13}{s['discarded_ticks']:>11}"
+        )
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Tick latency percentiles for the two model calls per tick, with and
+without hedging, against the local fake backend (lognormal latency with
+a slow tail).
+
+    python -m benchmarks.bench_tail_latency [--ticks 500] [--median-ms 40]
+"""
+import argparse
+import time
+
+from agents import llm
+from agents.fake_client import FakeClient, lognormal_latency
+
+
+def _percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run(ticks: int, hedging: bool, median: float, tail_prob: float, tail_factor: float) -> dict:
+    llm._latencies.clear()
+    llm._breakers.clear()
+    llm.configure(HEDGING_ENABLED=hedging)
+    client = FakeClient(latency=lognormal_latency(median, 0.3, tail_prob, tail_factor))
+
+    durations = []
+    fallbacks = 0
+    for _ in range(ticks):
+        start = time.time()
+        deadline = start + 5.0
+        for layer in ("subconscious", "conscious"):
+            try:
+                llm.create_response(client, layer, deadline=deadline, input=f"{layer.upper()} layer")
+            except llm.LLMUnavailable:
+                fallbacks += 1
+        durations.append(time.time() - start)
+    return {
+        "p50": _percentile(durations, 0.50),
+        "p95": _percentile(durations, 0.95),
+        "p99": _percentile(durations, 0.99),
+        "requests": client.calls,
+        "fallbacks": fallbacks,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--median-ms", type=float, default=40.0)
+    parser.add_argument("--tail-prob", type=float, default=0.03)
+    parser.add_argument("--tail-factor", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"  {'mode':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'requests':>10}{'fallbacks':>11}")
+    for hedging in (False, True):
+        r = run(args.ticks, hedging, args.median_ms / 1000.0, args.tail_prob, args.tail_factor)
+        print(
+            f"  {'hedged' if hedging else 'plain':<12}{r['p50'] * 1e3:>10.1f}{r['p95'] * 1e3:>10.1f}"
+            f"{r['p99'] * 1e3:>10.1f}{r['requests']:>10}{r['fallbacks']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Spin-up cost of a new mind: forking from a template (core/templates.py)
+against copying a data directory. The source mind has --items memory
+items (500 hot, the rest archived) and --goals goals. For each approach,
+--minds new minds are made and each runs --ticks ticks in a fresh
+interpreter against the fake backend, reporting the time to make the
+mind, the time to its first tick done, its disk footprint and its RSS
+(anonymous and file-backed, from /proc) after the last tick.
+
+    python -m benchmarks.bench_templates [--items 100000] [--goals 200] [--minds 3] [--ticks 5]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_RUN_MIND = """
+import json, os, sys, time
+t0 = time.perf_counter()
+import main as mind
+from agents.client import set_client
+from agents.fake_client import FakeClient
+from core import templates
+set_client(FakeClient())
+state = mind.load_state()
+for i in range({ticks}):
+    state = mind.tick(state)
+    mind.save_state(state)
+    if i == 0:
+        first = time.perf_counter() - t0
+rss = {{}}
+for line in open("/proc/self/status"):
+    if line.startswith(("VmRSS", "RssAnon", "RssFile")):
+        key, value = line.split(":", 1)
+        rss[key] = int(value.split()[0]) / 1024
+print(json.dumps({{"first_tick": first, "rss": rss, "template": templates.get_stats()}}))
+"""
+
+
+def _disk_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def _make_source(items: int, goals: int) -> str:
+    source = tempfile.mkdtemp(prefix="conscio-bench-template-src-")
+    rng = random.Random(0)
+    words = ["garden", "signal", "river", "lantern", "orbit", "paper", "engine", "meadow", "cipher", "harbor"]
+    memory = [
+        {
+            "id": f"mem-{i}",
+            "type": rng.choice(["fact", "insight", "preference"]),
+            "content": " ".join(rng.choice(words) for _ in range(24)),
+            "importance": round(rng.random(), 3),
+            "created_at": 1_700_000_000.0 + i,
+            "last_accessed": 1_700_000_000.0 + i,
+            "access_count": rng.randrange(5),
+        }
+        for i in range(items)
+    ]
+    code = (
+        "import json, sys\n"
+        "from core import goals, memory\n"
+        "from utils.persistence import append_lines, save_json\n"
+        "items = json.load(sys.stdin)\n"
+        "append_lines(memory.ARCHIVE_FILE, items[:-500])\n"
+        "save_json(memory.MEMORY_FILE, items[-500:])\n"
+        f"for i in range({goals}):\n"
+        "    goals.add_goal(f'goal number {i}', priority=(i % 10) / 10)\n"
+    )
+    env = dict(os.environ, CONSCIO_DATA_DIR=source)
+    subprocess.run([sys.executable, "-c", code], input=json.dumps(memory), text=True, env=env, cwd=REPO_DIR, check=True)
+    shutil.copy2(os.path.join(REPO_DIR, "data", "random_words.txt"), source)
+    return source
+
+
+def _run_mind(data_dir: str, ticks: int) -> dict:
+    env = dict(os.environ, CONSCIO_DATA_DIR=data_dir)
+    out = subprocess.run(
+        [sys.executable, "-c", _RUN_MIND.format(ticks=ticks)],
+        env=env,
+        cwd=REPO_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--goals", type=int, default=200)
+    parser.add_argument("--minds", type=int, default=3)
+    parser.add_argument("--ticks", type=int, default=5)
+    args = parser.parse_args()
+
+    source = _make_source(args.items, args.goals)
+    scratch = tempfile.mkdtemp(prefix="conscio-bench-template-")
+    template_dir = os.path.join(scratch, "template")
+    env = dict(os.environ, CONSCIO_DATA_DIR=source)
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-m", "tools.template", "create", template_dir],
+        env=env,
+        cwd=REPO_DIR,
+        check=True,
+        capture_output=True,
+    )
+    print(f"source mind: {args.items} memory items, {args.goals} goals, {_disk_bytes(source) / 2**20:.1f} MiB")
+    built = time.perf_counter() - started
+    print(f"template built once in {built:.2f} s, {_disk_bytes(template_dir) / 2**20:.1f} MiB\n")
+
+    # Imported after the scratch directories exist; the parent never touches a mind's data itself.
+    sys.path.insert(0, REPO_DIR)
+    from core import templates
+
+    print(f"  {'new mind':<10}{'make ms':>9}{'first tick ms':>15}{'disk KiB':>10}{'RSS MiB':>9}{'anon':>7}{'file':>7}")
+    for kind in ("copy", "fork"):
+        rows = []
+        for n in range(args.minds):
+            data_dir = os.path.join(scratch, f"{kind}-{n}")
+            t0 = time.perf_counter()
+            if kind == "copy":
+                shutil.copytree(source, data_dir)
+            else:
+                templates.fork(template_dir, data_dir)
+            made = time.perf_counter() - t0
+            disk = _disk_bytes(data_dir)
+            result = _run_mind(data_dir, args.ticks)
+            rows.append((made, result["first_tick"], disk, result["rss"]))
+        rss = {k: statistics.median(r[3][k] for r in rows) for k in ("VmRSS", "RssAnon", "RssFile")}
+        print(
+            f"  {kind:<10}{statistics.median(r[0] for r in rows) * 1e3:>9.1f}"
+            f"{statistics.median(r[1] for r in rows) * 1e3:>15.0f}{statistics.median(r[2] for r in rows) / 1024:>10.0f}"
+            f"{rss['VmRSS']:>9.1f}{rss['RssAnon']:>7.1f}{rss['RssFile']:>7.1f}"
+        )
+    print(f"\nlast fork after {args.ticks} ticks: {result['template']}")
+
+    shutil.rmtree(source, ignore_errors=True)
+    shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
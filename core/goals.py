@@ -1,58 +1,363 @@
+"""
+Goal store.
+
+Goals are persisted in SQLite (data/goals.sqlite3, WAL journal), one row per
+goal, so adding or updating a goal writes one row instead of the whole set.
+The rows are mirrored in memory with:
+
+  - a max-heap of (priority, goal) per status, so the top-k active goals
+    come out in O(k log n) without a sort; entries left behind by updates
+    are skipped lazily and compacted away when they pile up
+  - a parent -> children index built from each goal's parent_id, so
+    subgoal trees can be walked without scanning
+  - cached progress rollups: a goal with subgoals reports the mean progress
+    of its (non-dropped) subgoals, a done goal reports 1.0
+
+A legacy goals.json is imported the first time the database is created.
+Every read checks SQLite's data_version and rebuilds the mirror when another
+connection (e.g. a tool run in a second process) has committed since.
+"""
+import heapq
 import os
-import time
-from typing import Any, Dict, List
+import sqlite3
+import threading
+from typing import Any, Dict, List, Tuple
+
+from core import templates
+from core.records import Goal
+from utils import clock
+from utils.logging_utils import log_internal
+from utils.paths import DATA_DIR
+from utils.persistence import load_json
 
-from utils.persistence import load_json, save_json
+GOALS_DB = os.path.join(DATA_DIR, "goals.sqlite3")
+LEGACY_GOALS_FILE = os.path.join(DATA_DIR, "goals.json")
 
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
-GOALS_FILE = os.path.join(DATA_DIR, "goals.json")
+_COLUMNS = ("id", "description", "status", "priority", "created_at", "updated_at", "parent_id", "progress")
+_PATCHABLE = {"description", "status", "priority", "progress", "parent_id"}
 
+_lock = threading.RLock()
+_conn: sqlite3.Connection | None = None
+_rows: Dict[str, Dict[str, Any]] = {}
+_children: Dict[str, List[str]] = {}
+_rollup: Dict[str, float] = {}
+_version: Dict[str, int] = {}
+_heaps: Dict[str, List[Tuple[float, float, str, int]]] = {}  # status -> (-priority, created_at, id, version)
+_status_count: Dict[str, int] = {}
+_data_version: int | None = None
 
-def _ensure_data_dir():
+
+def _ensure_loaded() -> sqlite3.Connection:
+    global _conn
+    if _conn is not None:
+        if _conn.execute("PRAGMA data_version").fetchone()[0] != _data_version:
+            _load_rows(_conn)
+        return _conn
     os.makedirs(DATA_DIR, exist_ok=True)
+    is_new = not os.path.exists(GOALS_DB)
+    conn = sqlite3.connect(GOALS_DB, check_same_thread=False)
+    template = templates.active() if is_new else None
+    seed = template.file("goals.sqlite3") if template is not None else None
+    if seed is not None:
+        # A forked mind starts with its own copy of the template's goals
+        source = sqlite3.connect(f"file:{seed}?mode=ro", uri=True)
+        try:
+            source.backup(conn)
+        finally:
+            source.close()
+        is_new = False
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS goals ("
+        " id TEXT PRIMARY KEY, description TEXT NOT NULL, status TEXT NOT NULL,"
+        " priority REAL NOT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL,"
+        " parent_id TEXT, progress REAL NOT NULL DEFAULT 0)"
+    )
+    _conn = conn
+    if is_new:
+        legacy = load_json(LEGACY_GOALS_FILE, [])
+        if legacy:
+            _replace_all(_from_legacy(legacy))
+    _load_rows(conn)
+    return conn
+
+
+def _load_rows(conn: sqlite3.Connection) -> None:
+    """Rebuild the mirror from the database and remember the data_version it reflects."""
+    global _data_version
+    cols = ", ".join(_COLUMNS)
+    # Version first: a commit landing in between only costs one extra reload on the next read
+    _data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+    _index_rows([dict(zip(_COLUMNS, r)) for r in conn.execute(f"SELECT {cols} FROM goals ORDER BY rowid")])
+
+
+def _from_legacy(goals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """goals.json listed children in each goal's `subgoals`; turn that into parent_id."""
+    parent_of = {}
+    for g in goals:
+        for child in g.get("subgoals") or ():
+            parent_of.setdefault(str(child), str(g.get("id")))
+    out = []
+    for g in goals:
+        row = dict(g)
+        row.setdefault("parent_id", parent_of.get(str(g.get("id"))))
+        out.append(row)
+    return out
+
+
+def _normalize(d: Dict[str, Any]) -> Dict[str, Any]:
+    goal = Goal.from_dict(d).to_dict()
+    return {k: goal[k] for k in _COLUMNS}
+
+
+def _index_rows(rows: List[Dict[str, Any]]) -> None:
+    _rows.clear()
+    _children.clear()
+    _rollup.clear()
+    _version.clear()
+    _heaps.clear()
+    _status_count.clear()
+    for row in rows:
+        _rows[row["id"]] = row
+        _status_count[row["status"]] = _status_count.get(row["status"], 0) + 1
+        if row["parent_id"]:
+            _children.setdefault(row["parent_id"], []).append(row["id"])
+    for gid, row in _rows.items():
+        _version[gid] = 0
+        _heaps.setdefault(row["status"], []).append((-row["priority"], row["created_at"], gid, 0))
+    for heap in _heaps.values():
+        heapq.heapify(heap)
+    for gid in _rows:
+        _compute_rollup(gid)
+
+
+def _compute_rollup(goal_id: str) -> float:
+    if goal_id in _rollup:
+        return _rollup[goal_id]
+    row = _rows[goal_id]
+    _rollup[goal_id] = row["progress"]  # placeholder; stops a parent_id cycle from recursing forever
+    live = [c for c in _children.get(goal_id, ()) if _rows[c]["status"] != "dropped"]
+    if row["status"] == "done":
+        value = 1.0
+    elif live:
+        value = sum(_compute_rollup(c) for c in live) / len(live)
+    else:
+        value = row["progress"]
+    _rollup[goal_id] = value
+    return value
+
+
+def _refresh_rollups(goal_id: str | None) -> None:
+    """Recompute the cached rollup of `goal_id` and each of its ancestors."""
+    seen = set()
+    while goal_id and goal_id in _rows and goal_id not in seen:
+        seen.add(goal_id)
+        _rollup.pop(goal_id, None)
+        _compute_rollup(goal_id)
+        goal_id = _rows[goal_id]["parent_id"]
+
+
+def _push(row: Dict[str, Any]) -> None:
+    gid = row["id"]
+    _version[gid] = _version.get(gid, -1) + 1
+    heap = _heaps.setdefault(row["status"], [])
+    heapq.heappush(heap, (-row["priority"], row["created_at"], gid, _version[gid]))
+    if len(heap) > 2 * _status_count.get(row["status"], 0) + 64:
+        _compact(row["status"])
+
+
+def _compact(status: str) -> None:
+    heap = [e for e in _heaps.get(status, ()) if _is_current(e, status)]
+    heapq.heapify(heap)
+    _heaps[status] = heap
+
+
+def _is_current(entry: Tuple[float, float, str, int], status: str) -> bool:
+    row = _rows.get(entry[2])
+    return row is not None and row["status"] == status and _version.get(entry[2]) == entry[3]
+
+
+def _write(row: Dict[str, Any]) -> None:
+    conn = _ensure_loaded()
+    cols = ", ".join(_COLUMNS)
+    marks = ", ".join("?" for _ in _COLUMNS)
+    updates = ", ".join(f"{c}=excluded.{c}" for c in _COLUMNS[1:])
+    with conn:
+        conn.execute(
+            f"INSERT INTO goals ({cols}) VALUES ({marks}) ON CONFLICT(id) DO UPDATE SET {updates}",
+            [row[c] for c in _COLUMNS],
+        )
+
+
+def _replace_all(goals: List[Dict[str, Any]]) -> None:
+    rows = [_normalize(g) for g in goals]
+    conn = _conn
+    cols = ", ".join(_COLUMNS)
+    marks = ", ".join("?" for _ in _COLUMNS)
+    with conn:
+        conn.execute("DELETE FROM goals")
+        conn.executemany(
+            f"INSERT OR REPLACE INTO goals ({cols}) VALUES ({marks})", [[r[c] for c in _COLUMNS] for r in rows]
+        )
+    _index_rows(rows)
+
+
+def _to_goal(goal_id: str) -> Goal:
+    row = _rows[goal_id]
+    return Goal(
+        id=row["id"],
+        description=row["description"],
+        status=row["status"],
+        priority=row["priority"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+        subgoals=tuple(_children.get(goal_id, ())),
+        parent_id=row["parent_id"],
+        progress=_rollup[goal_id],
+    )
+
+
+def _in_subtree(node: str | None, goal_id: str) -> bool:
+    """True if `node` is `goal_id` or one of its descendants."""
+    seen = set()
+    while node and node not in seen:
+        if node == goal_id:
+            return True
+        seen.add(node)
+        node = _rows[node]["parent_id"] if node in _rows else None
+    return False
 
 
 def load_goals() -> List[Dict[str, Any]]:
-    _ensure_data_dir()
-    return load_json(GOALS_FILE, [])
+    """All goals as plain dicts, in creation order."""
+    with _lock:
+        _ensure_loaded()
+        return [_to_goal(gid).to_dict() for gid in _rows]
 
 
 def save_goals(goals: List[Dict[str, Any]]) -> None:
-    _ensure_data_dir()
-    save_json(GOALS_FILE, goals)
-
-
-def add_goal(description: str, priority: float = 0.5) -> Dict[str, Any]:
-    goals = load_goals()
-    now = time.time()
-    new_goal = {
-        "id": f"goal-{int(now * 1000)}",
-        "description": description,
-        "status": "active",
-        "priority": priority,
-        "created_at": now,
-        "updated_at": now,
-        "subgoals": [],
-    }
-    goals.append(new_goal)
-    save_goals(goals)
-    return new_goal
+    """Replace the whole goal set (bulk import; normal updates go through update_goal)."""
+    with _lock:
+        _ensure_loaded()
+        _replace_all(goals)
+
+
+def add_goal(description: str, priority: float = 0.5, parent_id: str | None = None) -> Dict[str, Any]:
+    with _lock:
+        _ensure_loaded()
+        now = clock.now()
+        if parent_id not in _rows:
+            parent_id = None
+        row = _normalize(
+            {
+                "id": clock.new_id("goal"),
+                "description": description,
+                "status": "active",
+                "priority": priority,
+                "created_at": now,
+                "updated_at": now,
+                "parent_id": parent_id,
+            }
+        )
+        _write(row)
+        _rows[row["id"]] = row
+        _status_count["active"] = _status_count.get("active", 0) + 1
+        if parent_id:
+            _children.setdefault(parent_id, []).append(row["id"])
+        _push(row)
+        _refresh_rollups(row["id"])
+        return _to_goal(row["id"]).to_dict()
 
 
 def update_goal(goal_id: str, **patch: Any) -> None:
-    goals = load_goals()
-    updated = False
-    for g in goals:
-        if g.get("id") == goal_id:
-            g.update(patch)
-            g["updated_at"] = time.time()
-            updated = True
-            break
-    if updated:
-        save_goals(goals)
-
-
-def get_active_goals(limit: int = 3) -> List[Dict[str, Any]]:
-    goals = [g for g in load_goals() if g.get("status") == "active"]
-    goals_sorted = sorted(goals, key=lambda x: x.get("priority", 0), reverse=True)
-    return goals_sorted[:limit]
+    """Apply known fields (status, priority, progress, description, parent_id); others are ignored."""
+    with _lock:
+        _ensure_loaded()
+        old = _rows.get(goal_id)
+        if old is None:
+            return
+        fields = {k: v for k, v in patch.items() if k in _PATCHABLE}
+        new_parent = fields.get("parent_id", old["parent_id"]) or None
+        if new_parent != old["parent_id"] and (new_parent not in _rows or _in_subtree(new_parent, goal_id)):
+            log_internal(f"[goals] ignoring parent_id={new_parent!r} for {goal_id}: unknown goal or a cycle")
+            fields.pop("parent_id", None)
+        row = _normalize({**old, **fields, "updated_at": clock.now()})
+        _write(row)
+
+        _rows[goal_id] = row
+        if row["status"] != old["status"]:
+            _status_count[old["status"]] -= 1
+            _status_count[row["status"]] = _status_count.get(row["status"], 0) + 1
+        if row["parent_id"] != old["parent_id"]:
+            if old["parent_id"]:
+                _children[old["parent_id"]].remove(goal_id)
+            if row["parent_id"]:
+                _children.setdefault(row["parent_id"], []).append(goal_id)
+            _refresh_rollups(old["parent_id"])
+        if (row["status"], row["priority"]) != (old["status"], old["priority"]):
+            _push(row)
+        _refresh_rollups(goal_id)
+
+
+def get_goal(goal_id: str) -> Goal | None:
+    with _lock:
+        _ensure_loaded()
+        return _to_goal(goal_id) if goal_id in _rows else None
+
+
+def get_top_goals(status: str = "active", limit: int = 3) -> List[Goal]:
+    """Highest-priority goals with `status`, in O(limit log n)."""
+    with _lock:
+        _ensure_loaded()
+        heap = _heaps.get(status, [])
+        picked: List[Tuple[float, float, str, int]] = []
+        while heap and len(picked) < limit:
+            entry = heapq.heappop(heap)
+            if _is_current(entry, status):
+                picked.append(entry)
+        for entry in picked:
+            heapq.heappush(heap, entry)
+        return [_to_goal(e[2]) for e in picked]
+
+
+def get_active_goals(limit: int = 3) -> List[Goal]:
+    return get_top_goals("active", limit)
+
+
+def get_subgoals(goal_id: str) -> List[Goal]:
+    with _lock:
+        _ensure_loaded()
+        return [_to_goal(c) for c in _children.get(goal_id, ())]
+
+
+def get_goal_tree(goal_id: str) -> List[Tuple[int, Goal]]:
+    """(depth, goal) for `goal_id` and all its descendants, depth-first."""
+    with _lock:
+        _ensure_loaded()
+        if goal_id not in _rows:
+            return []
+        out: List[Tuple[int, Goal]] = []
+        stack = [(0, goal_id)]
+        while stack:
+            depth, gid = stack.pop()
+            out.append((depth, _to_goal(gid)))
+            stack.extend((depth + 1, c) for c in reversed(_children.get(gid, ())))
+        return out
+
+
+def goal_progress(goal_id: str) -> float:
+    with _lock:
+        _ensure_loaded()
+        return _rollup.get(goal_id, 0.0)
+
+
+def backup_goals(dest_path: str) -> None:
+    """Consistent copy of the database (used for recording snapshots)."""
+    with _lock:
+        conn = _ensure_loaded()
+        dest = sqlite3.connect(dest_path)
+        try:
+            conn.backup(dest)
+        finally:
+            dest.close()
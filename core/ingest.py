@@ -0,0 +1,260 @@
+"""
+Percept ingestion service.
+
+Sources (CLI, a local TCP line socket, a local HTTP endpoint, and a watched
+inbox directory) call `submit()`, which only enqueues into a bounded queue.
+A single writer thread drains the queue in batches and appends them to the
+percept log with one write per batch, so neither the sources nor the tick
+loop wait on file I/O.
+
+Under floods the queue applies DROP_POLICY:
+  - "drop_newest": reject the incoming percept (default)
+  - "drop_oldest": evict the oldest queued percept to make room
+  - "block":       wait up to BLOCK_TIMEOUT_SECONDS for room (backpressure)
+SOURCE_RATE_LIMITS caps percepts/second per source with a token bucket.
+"""
+import json
+import os
+import queue
+import threading
+from typing import Any, Dict, List, Tuple
+
+from core import percept_index
+from core.percepts import append_percepts
+from core.records import Percept
+from utils import clock
+from utils.logging_utils import log_internal
+from utils.paths import DATA_DIR
+
+QUEUE_SIZE = 10_000
+BATCH_SIZE = 512
+FLUSH_INTERVAL_SECONDS = 0.05
+DROP_POLICY = "drop_newest"
+BLOCK_TIMEOUT_SECONDS = 0.5
+
+# percepts/second (burst = one second's worth) per source; sources not listed are unlimited
+SOURCE_RATE_LIMITS: Dict[str, float] = {"tcp": 2000.0, "http": 2000.0, "file": 5000.0}
+
+# Network sources are off unless a port is configured. Both bind to localhost only.
+TCP_PORT: int | None = None
+HTTP_PORT: int | None = None
+WATCH_DIR = os.path.join(DATA_DIR, "inbox")
+WATCH_INTERVAL_SECONDS = 0.5
+
+_queue: "queue.Queue[Percept]" = queue.Queue(maxsize=QUEUE_SIZE)
+_stats_lock = threading.Lock()
+_stats: Dict[str, int] = {"accepted": 0, "dropped": 0, "rate_limited": 0, "written": 0, "batches": 0}
+_buckets: Dict[str, List[float]] = {}  # source -> [tokens, last_refill]
+_bucket_lock = threading.Lock()
+_write_lock = threading.Lock()  # the writer thread and flush() may drain concurrently
+_writer_thread: threading.Thread | None = None
+# inbox path -> (byte offset of the first line not fully accepted, items of that line already accepted)
+_inbox_progress: Dict[str, Tuple[int, int]] = {}
+
+
+def configure(**settings: Any) -> None:
+    """Override module settings before start_ingestion(), e.g. configure(HTTP_PORT=7462)."""
+    global _queue
+    for name, value in settings.items():
+        if name not in globals() or not name.isupper():
+            raise AttributeError(f"Unknown ingest setting: {name}")
+        globals()[name] = value
+    if "QUEUE_SIZE" in settings:
+        _queue = queue.Queue(maxsize=QUEUE_SIZE)
+
+
+def _count(key: str, n: int = 1) -> None:
+    with _stats_lock:
+        _stats[key] += n
+
+
+def get_stats() -> Dict[str, int]:
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["queued"] = _queue.qsize()
+    return stats
+
+
+def _allow(source: str) -> bool:
+    rate = SOURCE_RATE_LIMITS.get(source)
+    if rate is None:
+        return True
+    now = clock.now()
+    with _bucket_lock:
+        bucket = _buckets.setdefault(source, [rate, now])
+        bucket[0] = min(rate, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if bucket[0] < 1.0:
+            return False
+        bucket[0] -= 1.0
+        return True
+
+
+def submit(source: str, content: str, tags: List[str] | None = None, rate_key: str | None = None) -> bool:
+    """
+    Queue a percept for the writer. Returns False if it was rate-limited or
+    dropped. `rate_key` selects the rate limit (defaults to `source`); network
+    sources pass their transport so a payload cannot pick its own limit.
+    """
+    if not _allow(rate_key or source):
+        _count("rate_limited")
+        return False
+
+    percept = Percept(
+        id=clock.new_id("percept"),
+        source=source,
+        timestamp=clock.now(),
+        content=content,
+        tags=tuple(tags or ()),
+        tick=percept_index.current_tick(),
+    )
+    try:
+        if DROP_POLICY == "block":
+            _queue.put(percept, timeout=BLOCK_TIMEOUT_SECONDS)
+        else:
+            _queue.put_nowait(percept)
+    except queue.Full:
+        if DROP_POLICY != "drop_oldest":
+            _count("dropped")
+            return False
+        try:
+            _queue.get_nowait()
+            _count("dropped")
+        except queue.Empty:
+            pass
+        try:
+            _queue.put_nowait(percept)
+        except queue.Full:
+            _count("dropped")
+            return False
+    _count("accepted")
+    return True
+
+
+def _drain(first: Percept | None = None) -> int:
+    batch: List[Percept] = [first] if first is not None else []
+    while len(batch) < BATCH_SIZE:
+        try:
+            batch.append(_queue.get_nowait())
+        except queue.Empty:
+            break
+    if batch:
+        with _write_lock:
+            append_percepts(batch)
+        _count("written", len(batch))
+        _count("batches")
+    return len(batch)
+
+
+def is_running() -> bool:
+    """True while a batch writer is draining the queue (main.py starts one; simulate and replay do not)."""
+    return _writer_thread is not None and _writer_thread.is_alive()
+
+
+def flush() -> None:
+    """Write everything currently queued (used on shutdown)."""
+    while _drain():
+        pass
+
+
+def _writer(stop: threading.Event) -> None:
+    while not stop.is_set():
+        try:
+            first = _queue.get(timeout=FLUSH_INTERVAL_SECONDS)
+        except queue.Empty:
+            continue
+        _drain(first)
+    flush()
+
+
+def parse_payload(raw: Any, default_source: str) -> List[Dict[str, Any]]:
+    """Accept a JSON object, a JSON list of objects, or plain text."""
+    if isinstance(raw, (bytes, str)):
+        text = raw.decode("utf-8", "replace") if isinstance(raw, bytes) else raw
+        text = text.strip()
+        if not text:
+            return []
+        try:
+            raw = json.loads(text)
+        except json.JSONDecodeError:
+            return [{"source": default_source, "content": text}]
+    items = raw if isinstance(raw, list) else [raw]
+    out = []
+    for item in items:
+        if isinstance(item, dict) and item.get("content"):
+            out.append(item)
+        elif isinstance(item, str) and item:
+            out.append({"source": default_source, "content": item})
+    return out
+
+
+def _submit_item(item: Dict[str, Any], default_source: str) -> bool:
+    tags = item.get("tags") or [default_source]
+    return submit(str(item.get("source") or default_source), str(item["content"]), list(tags), default_source)
+
+
+def submit_payload(raw: Any, default_source: str) -> int:
+    """Submit every percept in a raw payload; returns how many were accepted."""
+    return sum(_submit_item(item, default_source) for item in parse_payload(raw, default_source))
+
+
+def _ingest_file(path: str) -> bool:
+    """
+    Submit an inbox file's percepts, resuming where the last pass stopped.
+    Returns True once all of them were accepted; on the first rejection
+    (rate limit or full queue) it records its place and returns False.
+    """
+    offset, done = _inbox_progress.get(path, (0, 0))
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            for item in parse_payload(line, "file")[done:]:
+                if not _submit_item(item, "file"):
+                    _inbox_progress[path] = (offset, done)
+                    return False
+                done += 1
+            offset += len(line)
+            done = 0
+    _inbox_progress.pop(path, None)
+    return True
+
+
+def _watch_inbox(stop: threading.Event) -> None:
+    """
+    Ingest *.txt / *.jsonl files in WATCH_DIR, deleting each once every
+    line was accepted. Writers must create the file under another name
+    (e.g. *.tmp) and rename it into place, so no file is read half-written.
+    """
+    os.makedirs(WATCH_DIR, exist_ok=True)
+    while not stop.wait(WATCH_INTERVAL_SECONDS):
+        for name in sorted(os.listdir(WATCH_DIR)):
+            if name.startswith(".") or not name.endswith((".txt", ".jsonl")):
+                continue
+            path = os.path.join(WATCH_DIR, name)
+            try:
+                if not _ingest_file(path):
+                    break  # backpressure: pick up from here on the next pass, keeping file order
+                os.remove(path)
+            except OSError as exc:
+                _inbox_progress.pop(path, None)
+                log_internal(f"[ingest] could not read {path}: {exc}")
+
+
+def start_ingestion(watch_inbox: bool = True) -> threading.Event:
+    """
+    Start the batch writer plus any configured sources. Set the returned
+    event to stop them; the writer flushes what is queued before exiting.
+    """
+    global _writer_thread
+    stop = threading.Event()
+    _writer_thread = threading.Thread(target=_writer, args=(stop,), name="ingest-writer", daemon=True)
+    _writer_thread.start()
+
+    if watch_inbox:
+        threading.Thread(target=_watch_inbox, args=(stop,), name="ingest-inbox", daemon=True).start()
+    if TCP_PORT is not None or HTTP_PORT is not None:
+        # Imported only when needed: http.server drags in email, ssl and http.client.
+        from core import ingest_servers
+
+        ingest_servers.start_servers(TCP_PORT, HTTP_PORT, stop)
+    return stop
@@ -0,0 +1,68 @@
+"""
+Local TCP and HTTP sources for core.ingest, kept apart so the servers'
+imports are only paid for when a port is configured.
+"""
+import http.server
+import json
+import socketserver
+import threading
+from typing import Any
+
+from core import ingest
+
+
+class _TCPHandler(socketserver.StreamRequestHandler):
+    """
+    One percept per line: plain text or a JSON object. A line with rejected
+    percepts is answered with {"line": n, "accepted": a, "rejected": r}.
+    """
+
+    def handle(self) -> None:
+        for n, line in enumerate(self.rfile, 1):
+            items = ingest.parse_payload(line, "tcp")
+            accepted = ingest.submit_payload(items, "tcp")
+            if accepted < len(items):
+                reply = {"line": n, "accepted": accepted, "rejected": len(items) - accepted}
+                self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+
+class _HTTPHandler(http.server.BaseHTTPRequestHandler):
+    """POST /percepts with a JSON object or list; 202 if all accepted, 429 otherwise."""
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") != "/percepts":
+            self.send_error(404)
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+        items = ingest.parse_payload(body, "http")
+        accepted = ingest.submit_payload(items, "http")
+        payload = json.dumps({"accepted": accepted, "rejected": len(items) - accepted}).encode("utf-8")
+        self.send_response(202 if accepted == len(items) else 429)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:  # keep the console quiet
+        pass
+
+
+def _serve(server: socketserver.BaseServer, stop: threading.Event) -> None:
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stop.wait()
+    server.shutdown()
+    server.server_close()
+
+
+def start_servers(tcp_port: int | None, http_port: int | None, stop: threading.Event) -> None:
+    """Serve the configured ports on localhost until `stop` is set."""
+    if tcp_port is not None:
+        tcp = _TCPServer(("127.0.0.1", tcp_port), _TCPHandler)
+        threading.Thread(target=_serve, args=(tcp, stop), name="ingest-tcp", daemon=True).start()
+    if http_port is not None:
+        httpd = http.server.ThreadingHTTPServer(("127.0.0.1", http_port), _HTTPHandler)
+        threading.Thread(target=_serve, args=(httpd, stop), name="ingest-http", daemon=True).start()
@@ -1,11 +1,44 @@
+import heapq
+import math
 import os
-import time
-from typing import Any, Dict, List
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List
 
-from utils.persistence import load_json, save_json
+from core import templates
+from core.records import MemoryItem
+from utils import clock
+from utils.paths import DATA_DIR
+from utils.persistence import append_lines, file_lock, iter_items, iter_lines, load_json, save_json
+from utils.serialization import encode_line
 
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 MEMORY_FILE = os.path.join(DATA_DIR, "memory.json")
+# Cold items are appended to a JSON Lines archive, never loaded to be rewritten
+ARCHIVE_FILE = os.path.join(DATA_DIR, "memory_archive.jsonl")
+LEGACY_ARCHIVE_FILE = os.path.join(DATA_DIR, "memory_archive.json")  # still read, no longer written
+
+# Hot-set budget: whichever limit is hit first triggers eviction to the archive.
+MAX_HOT_ITEMS = 500
+MAX_HOT_BYTES = 512 * 1024
+
+# Scoring knobs for recency / frequency / importance.
+RECENCY_HALF_LIFE_SECONDS = 6 * 3600.0
+ACCESS_COUNT_SATURATION = 20
+SCORE_WEIGHTS = {"recency": 0.4, "frequency": 0.3, "importance": 0.3}
+
+# Consolidation: items of the same type whose word sets overlap this much are merged.
+SIMILARITY_THRESHOLD = 0.8
+CONSOLIDATION_INTERVAL_SECONDS = 60.0
+
+# Serializes read-modify-write cycles between the tick thread and the consolidation worker;
+# the file lock taken inside it does the same across processes.
+_memory_lock = threading.RLock()
+
+# Access stats from touch_memory_items, held here and written on the consolidation interval:
+# id -> [last_accessed, access count since the last flush]
+_access_lock = threading.Lock()
+_pending_access: Dict[str, List[float]] = {}
+_last_access_flush: float | None = None  # set by the first touch, so a swapped-in clock is respected
 
 
 def _ensure_data_dir():
@@ -22,17 +55,262 @@ def save_memory(items: List[Dict[str, Any]]) -> None:
     save_json(MEMORY_FILE, items)
 
 
+def iter_memory() -> Iterator[Dict[str, Any]]:
+    """Stream the hot set without loading it as a whole."""
+    return iter_items(MEMORY_FILE)
+
+
+def iter_archive() -> Iterator[Dict[str, Any]]:
+    """Stream the archive, oldest evictions first."""
+    yield from iter_items(LEGACY_ARCHIVE_FILE)
+    yield from iter_lines(ARCHIVE_FILE)
+
+
+def load_archive() -> List[Dict[str, Any]]:
+    return list(iter_archive())
+
+
+def update_memory(fn: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]] | None]) -> List[Dict[str, Any]]:
+    """
+    Load the hot set, let `fn` mutate it (or return a replacement list),
+    enforce the hot-set budget, and save. Runs under the store lock and the
+    memory file's cross-process lock.
+    """
+    with _memory_lock, file_lock(MEMORY_FILE):
+        items = load_memory()
+        result = fn(items)
+        if result is not None:
+            items = result
+        items = _enforce_budget(items)
+        save_memory(items)
+        return items
+
+
+def adopt_template_items(ids: Iterable[str]) -> None:
+    """
+    Copy-on-write for forked minds: copy these items from the template's
+    base into the mind's own memory (before they are updated or deleted)
+    and hide the base copies.
+    """
+    template = templates.active()
+    if template is None:
+        return
+    found = template.memory_items(i for i in ids if i and not templates.is_hidden(i))
+    if not found:
+        return
+
+    def _adopt(items: List[Dict[str, Any]]) -> None:
+        have = {m.get("id") for m in items}
+        items.extend(m for m in found if m.get("id") not in have)
+
+    update_memory(_adopt)
+    templates.hide(m.get("id") for m in found)
+
+
 def add_memory_item(item: Dict[str, Any]) -> None:
-    items = load_memory()
-    now = time.time()
-    item.setdefault("id", f"mem-{int(now * 1000)}")
+    now = clock.now()
+    item.setdefault("id", clock.new_id("mem"))
     item.setdefault("created_at", now)
     item.setdefault("last_accessed", now)
-    items.append(item)
-    save_memory(items)
+    item.setdefault("access_count", 0)
+    update_memory(lambda items: items.append(item))
+
+
+def touch_memory_items(ids: Iterable[str]) -> None:
+    """
+    Record that these items were surfaced to the conscious layer. The
+    stats are kept in memory and written to memory.json at most once per
+    CONSOLIDATION_INTERVAL_SECONDS (by the consolidation pass, or here if
+    none ran), not on every tick.
+    """
+    global _last_access_flush
+    now = clock.now()
+    with _access_lock:
+        for item_id in ids:
+            if item_id:
+                pending = _pending_access.setdefault(item_id, [now, 0])
+                pending[0] = now
+                pending[1] += 1
+        if _last_access_flush is None:
+            _last_access_flush = now
+        due = now - _last_access_flush >= CONSOLIDATION_INTERVAL_SECONDS
+    if due:
+        flush_access_stats()
+
+
+def _take_access_stats() -> Dict[str, List[float]]:
+    global _pending_access, _last_access_flush
+    with _access_lock:
+        pending, _pending_access = _pending_access, {}
+        _last_access_flush = clock.now()
+    return pending
+
+
+def index_by_id(items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Map ids to items, including the ids consolidation merged into each item."""
+    by_id: Dict[str, Dict[str, Any]] = {}
+    for m in items:
+        for merged_id in m.get("merged_ids", ()):
+            by_id.setdefault(merged_id, m)
+    for m in items:
+        by_id[m.get("id")] = m
+    return by_id
+
+
+def _apply_access_stats(items: List[Dict[str, Any]], pending: Dict[str, List[float]]) -> Dict[str, List[float]]:
+    """Add the stats to the items they belong to; returns the stats of ids not found (e.g. template items)."""
+    by_id = index_by_id(items)
+    unmatched: Dict[str, List[float]] = {}
+    for item_id, stats in pending.items():
+        m = by_id.get(item_id)
+        if m is None:
+            unmatched[item_id] = stats
+            continue
+        m["last_accessed"] = max(m.get("last_accessed", 0), stats[0])
+        m["access_count"] = m.get("access_count", 0) + int(stats[1])
+    return unmatched
+
+
+def _write_access_stats(items: List[Dict[str, Any]], pending: Dict[str, List[float]]) -> None:
+    # Template items keep theirs in template.json; stats of evicted or deleted items are dropped with them
+    unmatched = _apply_access_stats(items, pending)
+    if unmatched:
+        templates.record_access(unmatched)
+
+
+def flush_access_stats() -> None:
+    """Write pending access stats to memory.json now (e.g. at shutdown)."""
+    pending = _take_access_stats()
+    if pending:
+        update_memory(lambda items: _write_access_stats(items, pending))
+
+
+def memory_recency(item: Dict[str, Any]) -> float:
+    """
+    When the item was made. Retrieval ranks by this rather than by
+    last_accessed, which retrieval itself updates: ranking by it would keep
+    surfacing the same items.
+    """
+    return item.get("created_at", 0)
+
+
+def get_recent_memory(limit: int = 10) -> List[MemoryItem]:
+    """Top `limit` most recently made, streamed: only the current top items are held, not the hot set."""
+    template = templates.active()
+    own_ids: set = set()
+
+    def _own() -> Iterator[Dict[str, Any]]:
+        for m in iter_memory():
+            own_ids.add(m.get("id"))
+            yield m
+
+    items_sorted = heapq.nlargest(limit, _own() if template is not None else iter_memory(), key=memory_recency)
+    if template is not None:
+        # The base is stored most recent first, so only its first few visible items can compete
+        base_items = template.recent_memory(limit, skip=own_ids)
+        items_sorted = heapq.nlargest(limit, items_sorted + base_items, key=memory_recency)
+    return [MemoryItem.from_dict(m) for m in items_sorted]
+
+
+def _importance(item: Dict[str, Any]) -> float:
+    try:
+        return max(0.0, min(1.0, float(item.get("importance", 0.5))))
+    except (TypeError, ValueError):
+        return 0.5
+
+
+def score_memory_item(item: Dict[str, Any], now: float | None = None) -> float:
+    """Blend recency, access frequency and importance into a [0, 1] retention score."""
+    now = clock.now() if now is None else now
+    last = item.get("last_accessed", item.get("created_at", now))
+    recency = 0.5 ** (max(0.0, now - last) / RECENCY_HALF_LIFE_SECONDS)
+    frequency = min(1.0, math.log1p(item.get("access_count", 0)) / math.log1p(ACCESS_COUNT_SATURATION))
+    importance = _importance(item)
+    return (
+        SCORE_WEIGHTS["recency"] * recency
+        + SCORE_WEIGHTS["frequency"] * frequency
+        + SCORE_WEIGHTS["importance"] * importance
+    )
+
+
+def _enforce_budget(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep the best-scoring items within MAX_HOT_ITEMS / MAX_HOT_BYTES; archive the rest."""
+    sizes = [len(encode_line(m)) for m in items]
+    if len(items) <= MAX_HOT_ITEMS and sum(sizes) <= MAX_HOT_BYTES:
+        return items
+
+    now = clock.now()
+    ranked = sorted(range(len(items)), key=lambda i: score_memory_item(items[i], now), reverse=True)
+    keep: set = set()
+    used = 0
+    for i in ranked:
+        if len(keep) >= MAX_HOT_ITEMS:
+            break
+        if used + sizes[i] > MAX_HOT_BYTES:
+            continue  # a smaller, lower-ranked item may still fit
+        keep.add(i)
+        used += sizes[i]
+
+    cold = [m for i, m in enumerate(items) if i not in keep]
+    for m in cold:
+        m["archived_at"] = now
+    append_lines(ARCHIVE_FILE, cold)
+    return [m for i, m in enumerate(items) if i in keep]
+
+
+def _word_set(text: str) -> frozenset:
+    return frozenset(re.findall(r"[a-z0-9']+", text.lower()))
+
+
+def _merge_into(target: Dict[str, Any], other: Dict[str, Any]) -> None:
+    target["importance"] = max(_importance(target), _importance(other))
+    target["access_count"] = target.get("access_count", 0) + other.get("access_count", 0)
+    target["created_at"] = min(target.get("created_at", 0), other.get("created_at", 0))
+    target["last_accessed"] = max(target.get("last_accessed", 0), other.get("last_accessed", 0))
+    target.setdefault("merged_ids", []).append(other.get("id"))
+
+
+def consolidate_memory() -> int:
+    """
+    Merge near-duplicate items of the same type, in the same rewrite that
+    writes the pending access stats. Returns how many items were merged away.
+    """
+    merged = 0
+    pending = _take_access_stats()
+
+    def _consolidate(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        nonlocal merged
+        _write_access_stats(items, pending)
+        kept: List[Dict[str, Any]] = []
+        kept_words: List[frozenset] = []
+        for item in sorted(items, key=_importance, reverse=True):
+            words = _word_set(str(item.get("content", "")))
+            for other, other_words in zip(kept, kept_words):
+                if other.get("type") != item.get("type") or not words or not other_words:
+                    continue
+                if len(words & other_words) / len(words | other_words) >= SIMILARITY_THRESHOLD:
+                    _merge_into(other, item)
+                    merged += 1
+                    break
+            else:
+                kept.append(item)
+                kept_words.append(words)
+        return kept
+
+    update_memory(_consolidate)
+    return merged
+
+
+def start_consolidation_worker(interval_seconds: float = CONSOLIDATION_INTERVAL_SECONDS) -> threading.Event:
+    """
+    Run consolidation + budget enforcement in a daemon thread every
+    `interval_seconds`. Set the returned event to stop the worker.
+    """
+    stop = threading.Event()
 
+    def _worker() -> None:
+        while not stop.wait(interval_seconds):
+            consolidate_memory()
 
-def get_recent_memory(limit: int = 10) -> List[Dict[str, Any]]:
-    items = load_memory()
-    items_sorted = sorted(items, key=lambda x: x.get("last_accessed", x.get("created_at", 0)), reverse=True)
-    return items_sorted[:limit]
+    threading.Thread(target=_worker, name="memory-consolidation", daemon=True).start()
+    return stop
@@ -0,0 +1,259 @@
+"""
+Read-only observer API for dashboards and operators.
+
+At the end of every tick the loop publishes one immutable snapshot (tick,
+state, the decision, this tick's thoughts, active goals, recent percepts
+and the registered metrics). Publishing is copy-on-publish: the snapshot
+is serialized to JSON bytes once, then swapped in with a single reference
+assignment, so readers never lock, never see a half-updated tick, and cost
+the tick loop nothing however often they poll. Every reader that decodes
+gets its own copy.
+
+Versions are the process's boot time in microseconds plus a count of the
+snapshots it published, so they keep increasing across restarts and a
+client waiting for "after N" is not stranded by one.
+
+In-process:  latest(), get(version), since(version), wait_for(version, timeout)
+Other processes: the same bytes are also written to SNAPSHOT_FILE with an
+atomic rename, by a background thread that only writes the latest snapshot
+(the tick just signals it). FileSnapshots reads it with the same interface,
+and `python -m tools.observe serve` puts it behind HTTP without running any
+reader code in the mind's process (preferred for high-frequency polling).
+HTTP (localhost; in-process when HTTP_PORT is set, see start_server()):
+  GET /snapshot                     latest; ETag is the version, 304 on If-None-Match
+  GET /snapshot?version=N           one of the last HISTORY snapshots
+  GET /snapshots?since=N            the retained snapshots newer than N
+  GET /wait?after=N&timeout=S       long poll for a snapshot newer than N
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List
+
+from utils import clock
+from utils.logging_utils import log_internal
+from utils.paths import DATA_DIR
+from utils.persistence import file_version, write_bytes
+
+HISTORY = 120  # snapshots retained for get()/since()
+PUBLISH_EVERY = 1  # publish on every Nth tick only (simulations thin snapshots out)
+SNAPSHOT_FILE: str | None = os.path.join(DATA_DIR, "observer", "snapshot.json")  # None: in-process only
+FILE_POLL_SECONDS = 0.05
+HTTP_PORT: int | None = None
+MAX_WAIT_SECONDS = 30.0
+
+_metric_sources: Dict[str, Callable[[], Any]] = {}
+_latest: "Snapshot | None" = None
+_history: Deque["Snapshot"] = deque(maxlen=HISTORY)
+_published = threading.Condition()
+_stats: Dict[str, Any] = {"published": 0, "publish_seconds": 0.0, "bytes": 0, "file_writes": 0}
+_EPOCH = time.time_ns() // 1000  # first version of this process, above any earlier boot's
+_file_wanted = threading.Event()
+_file_writer: threading.Thread | None = None
+_file_writer_lock = threading.Lock()
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    version: int
+    tick: int
+    published_at: float
+    payload: bytes  # JSON of the whole snapshot
+
+    def data(self) -> Dict[str, Any]:
+        """A private decoded copy; mutating it cannot affect other readers."""
+        return json.loads(self.payload)
+
+
+def configure(**settings: Any) -> None:
+    """Override module settings, e.g. configure(HTTP_PORT=7463, HISTORY=600)."""
+    global _history
+    for name, value in settings.items():
+        if name not in globals() or not name.isupper():
+            raise AttributeError(f"Unknown observer setting: {name}")
+        globals()[name] = value
+    if "HISTORY" in settings:
+        _history = deque(_history, maxlen=HISTORY)
+
+
+def register_metrics(name: str, fn: Callable[[], Any]) -> None:
+    """Include `fn()` under metrics[name] in every snapshot (e.g. a module's get_stats)."""
+    _metric_sources[name] = fn
+
+
+def _jsonable(value: Any) -> Any:
+    to_dict = getattr(value, "to_dict", None)
+    if to_dict is not None:
+        return to_dict()
+    if isinstance(value, (set, frozenset, deque)):
+        return list(value)
+    return repr(value)
+
+
+def publish(state: Dict[str, Any], tick_seconds: float, **sections: Any) -> Snapshot | None:
+    """
+    Freeze this tick's view (state plus keyword sections) as the latest
+    snapshot. On ticks skipped by PUBLISH_EVERY nothing is built and the
+    current latest snapshot is returned.
+    """
+    global _latest
+    if PUBLISH_EVERY > 1 and state.get("tick", 0) % PUBLISH_EVERY:
+        return _latest
+    started = time.perf_counter()
+    published_at = clock.now()
+    metrics: Dict[str, Any] = {}
+    for name, fn in list(_metric_sources.items()):
+        try:
+            metrics[name] = fn()
+        except Exception as exc:  # a broken metric must not break the tick
+            metrics[name] = {"error": repr(exc)}
+    previous = _latest
+    version = previous.version + 1 if previous is not None else _EPOCH + 1
+    body = {
+        "version": version,
+        "tick": state.get("tick", 0),
+        "published_at": published_at,
+        "tick_seconds": tick_seconds,
+        "state": state,
+        "metrics": metrics,
+    }
+    body.update(sections)
+    payload = json.dumps(body, default=_jsonable, separators=(",", ":")).encode("utf-8")
+    snapshot = Snapshot(version, body["tick"], published_at, payload)
+    _history.append(snapshot)
+    _latest = snapshot  # the swap readers see; everything before it is private
+    with _published:
+        _published.notify_all()
+    if SNAPSHOT_FILE:
+        _mirror_to_file()
+    _stats["published"] += 1
+    _stats["publish_seconds"] += time.perf_counter() - started
+    _stats["bytes"] = len(payload)
+    return snapshot
+
+
+def _mirror_to_file() -> None:
+    """Have the file writer thread (started on first use) write the latest snapshot to SNAPSHOT_FILE."""
+    global _file_writer
+    if _file_writer is None:
+        with _file_writer_lock:
+            if _file_writer is None:
+                _file_writer = threading.Thread(target=_write_files, name="observer-file", daemon=True)
+                _file_writer.start()
+    _file_wanted.set()
+
+
+def _write_files() -> None:
+    written: Snapshot | None = None
+    while True:
+        _file_wanted.wait()
+        _file_wanted.clear()
+        snapshot, path = _latest, SNAPSHOT_FILE
+        if snapshot is None or snapshot is written or not path:
+            continue
+        try:
+            write_bytes(path, snapshot.payload)
+        except OSError as exc:
+            log_internal(f"[observer] could not write {path}: {exc}")
+        written = snapshot
+        _stats["file_writes"] += 1
+
+
+def latest() -> Snapshot | None:
+    return _latest
+
+
+def drop_history() -> None:
+    """Forget every retained snapshot but the latest (to give memory back)."""
+    _history.clear()
+    if _latest is not None:
+        _history.append(_latest)
+
+
+def get(version: int) -> Snapshot | None:
+    for snapshot in reversed(_history):
+        if snapshot.version == version:
+            return snapshot
+    return None
+
+
+def since(version: int) -> List[Snapshot]:
+    """Retained snapshots newer than `version`, oldest first."""
+    return [s for s in list(_history) if s.version > version]
+
+
+def wait_for(after: int, timeout: float) -> Snapshot | None:
+    """Block until a snapshot newer than `after` is published (or timeout); returns the latest."""
+    with _published:
+        _published.wait_for(lambda: _latest is not None and _latest.version > after, timeout)
+    snapshot = _latest
+    return snapshot if snapshot is not None and snapshot.version > after else None
+
+
+class FileSnapshots:
+    """The latest()/get()/since()/wait_for() interface over SNAPSHOT_FILE, for other processes."""
+
+    def __init__(self, path: str | None = None):
+        self.path = path or SNAPSHOT_FILE
+        self._file_version: Any = None
+        self._snapshot: Snapshot | None = None
+        self._lock = threading.Lock()
+
+    def latest(self) -> Snapshot | None:
+        with self._lock:
+            current = file_version(self.path)
+            if current is not None and current != self._file_version:
+                try:
+                    with open(self.path, "rb") as f:
+                        payload = f.read()
+                    head = json.loads(payload)
+                    self._snapshot = Snapshot(head["version"], head["tick"], head["published_at"], payload)
+                    self._file_version = current
+                except (OSError, ValueError, KeyError):
+                    pass  # replaced between stat and open; the next call picks it up
+            return self._snapshot
+
+    def get(self, version: int) -> Snapshot | None:
+        snapshot = self.latest()
+        return snapshot if snapshot is not None and snapshot.version == version else None
+
+    def since(self, version: int) -> List[Snapshot]:
+        snapshot = self.latest()
+        return [snapshot] if snapshot is not None and snapshot.version > version else []
+
+    def wait_for(self, after: int, timeout: float) -> Snapshot | None:
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self.latest()
+            if snapshot is not None and snapshot.version > after:
+                return snapshot
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(FILE_POLL_SECONDS)
+
+
+def get_stats() -> Dict[str, Any]:
+    published = _stats["published"] or 1
+    return dict(_stats, publish_ms=round(_stats["publish_seconds"] / published * 1e3, 3))
+
+
+def start_server(port: int | None = None, source: Any = None) -> threading.Event | None:
+    """
+    Serve the HTTP endpoints on localhost until the returned event is set.
+    `source` defaults to this process's snapshots; pass a FileSnapshots to
+    serve another process's.
+    """
+    port = port if port is not None else HTTP_PORT
+    if port is None:
+        return None
+    # Imported only when needed: http.server drags in email, ssl and http.client.
+    from core import observer_server
+
+    stop = threading.Event()
+    observer_server.start(port, stop, source if source is not None else sys.modules[__name__])
+    log_internal(f"[observer] serving snapshots on http://127.0.0.1:{port}/snapshot")
+    return stop
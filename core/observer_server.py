@@ -0,0 +1,72 @@
+"""
+HTTP endpoints for core.observer, kept apart so http.server is only
+imported when an observer port is configured. Handlers serve the
+snapshots' pre-serialized bytes; nothing is re-encoded per request.
+The snapshot source is core.observer itself or an observer.FileSnapshots.
+"""
+import http.server
+import threading
+from typing import Any, List
+from urllib.parse import parse_qs, urlsplit
+
+from core import observer
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        source = self.server.source  # type: ignore[attr-defined]
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            if url.path == "/snapshot":
+                snapshot = source.get(int(query["version"])) if "version" in query else source.latest()
+                if snapshot is None:
+                    self._send(404, b'{"error":"no such snapshot"}')
+                elif self.headers.get("If-None-Match") == f'"{snapshot.version}"':
+                    self._send(304, b"", snapshot.version)
+                else:
+                    self._send(200, snapshot.payload, snapshot.version)
+            elif url.path == "/snapshots":
+                self._send_list(source.since(int(query.get("since", 0))))
+            elif url.path == "/wait":
+                timeout = min(float(query.get("timeout", 10)), observer.MAX_WAIT_SECONDS)
+                snapshot = source.wait_for(int(query.get("after", 0)), timeout)
+                if snapshot is None:
+                    self._send(304, b"")
+                else:
+                    self._send(200, snapshot.payload, snapshot.version)
+            else:
+                self._send(404, b'{"error":"unknown path"}')
+        except ValueError:
+            self._send(400, b'{"error":"bad query"}')
+
+    def _send_list(self, snapshots: List[observer.Snapshot]) -> None:
+        body = b"[" + b",".join(s.payload for s in snapshots) + b"]"
+        self._send(200, body, snapshots[-1].version if snapshots else None)
+
+    def _send(self, status: int, body: bytes, version: int | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        if version is not None:
+            self.send_header("ETag", f'"{version}"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # keep the console quiet
+        pass
+
+
+def _serve(server: http.server.ThreadingHTTPServer, stop: threading.Event) -> None:
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stop.wait()
+    server.shutdown()
+    server.server_close()
+
+
+def start(port: int, stop: threading.Event, source: Any) -> None:
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    server.daemon_threads = True
+    server.source = source  # type: ignore[attr-defined]
+    threading.Thread(target=_serve, args=(server, stop), name="observer-http", daemon=True).start()
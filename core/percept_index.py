@@ -0,0 +1,228 @@
+"""
+Query index over percepts.jsonl: by source, tag, time range and tick.
+
+Every row of the log gets an index row (byte offset, length, timestamp,
+tick, source, tags); the tick is the one stored in the percept, stamped
+from current_tick() when it arrived, so a rebuild recovers it. The index
+lives in memory as columns plus posting lists per source and per tag, and
+is persisted as an append-only sidecar (percepts.index.jsonl) so restarts
+don't rescan the log. Appends made through core.percepts update it
+incrementally; anything appended behind its back (another process, older
+versions) is picked up by scanning only the unindexed tail.
+
+Rows are in append order, which is time order up to the clock skew
+between concurrent submitters. Range lookups bisect a running-max time
+key and then check the exact timestamp, so a query costs O(log n) plus
+the rows it returns.
+"""
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Sequence, Tuple
+
+from core.records import Percept
+from utils.paths import DATA_DIR
+from utils.serialization import decode_line, encode_line
+
+INDEX_FILE = os.path.join(DATA_DIR, "percepts.index.jsonl")
+
+_lock = threading.RLock()
+_loaded = False
+_current_tick = 0
+_indexed_bytes = 0
+
+_offset = array("Q")
+_length = array("I")
+_timestamp = array("d")
+_time_key = array("d")  # running max of _timestamp, so it is sorted
+_tick_key = array("q")  # running max of the tick each row was recorded at
+_source: List[str] = []
+_tags: List[Tuple[str, ...]] = []
+_by_source: Dict[str, array] = {}
+_by_tag: Dict[str, array] = {}
+
+
+def note_tick(tick: int) -> None:
+    """Called by the tick loop so new percepts remember which tick they arrived in."""
+    global _current_tick
+    _current_tick = tick
+
+
+def current_tick() -> int:
+    return _current_tick
+
+
+def _reset() -> None:
+    global _indexed_bytes
+    _indexed_bytes = 0
+    for col in (_offset, _length, _timestamp, _time_key, _tick_key):
+        del col[:]
+    _source.clear()
+    _tags.clear()
+    _by_source.clear()
+    _by_tag.clear()
+
+
+def _add_row(offset: int, length: int, timestamp: float, tick: int, source: str, tags: Sequence[str]) -> None:
+    global _indexed_bytes
+    row = len(_offset)
+    _offset.append(offset)
+    _length.append(length)
+    _timestamp.append(timestamp)
+    _time_key.append(max(timestamp, _time_key[-1]) if row else timestamp)
+    _tick_key.append(max(tick, _tick_key[-1]) if row else tick)
+    _source.append(source)
+    _tags.append(tuple(tags))
+    _by_source.setdefault(source, array("I")).append(row)
+    for tag in set(tags):
+        _by_tag.setdefault(tag, array("I")).append(row)
+    _indexed_bytes = max(_indexed_bytes, offset + length)
+
+
+def _persist(rows: List[list]) -> None:
+    if not rows:
+        return
+    os.makedirs(DATA_DIR, exist_ok=True)
+    with open(INDEX_FILE, "a", encoding="utf-8") as f:
+        f.write("".join(encode_line(r) + "\n" for r in rows))
+
+
+def _scan_log(log_path: str) -> None:
+    """Index complete lines of the log past `_indexed_bytes`."""
+    if not os.path.exists(log_path) or os.path.getsize(log_path) <= _indexed_bytes:
+        return
+    new_rows = []
+    with open(log_path, "rb") as f:
+        f.seek(_indexed_bytes)
+        offset = _indexed_bytes
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # a batch still being written
+            if line.strip():
+                try:
+                    p = Percept.from_dict(decode_line(line))
+                except ValueError:
+                    offset += len(line)
+                    continue
+                row = [offset, len(line), p.timestamp, p.tick, p.source, list(p.tags)]
+                _add_row(*row)
+                new_rows.append(row)
+            offset += len(line)
+    _persist(new_rows)
+
+
+def _ensure_loaded(log_path: str) -> None:
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+    if os.path.exists(INDEX_FILE):
+        complete = 0
+        with open(INDEX_FILE, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                _add_row(*decode_line(line))
+                complete += len(line)
+        if complete < os.path.getsize(INDEX_FILE):
+            # A row cut short by a crash; the next append would be glued onto it
+            with open(INDEX_FILE, "r+b") as f:
+                f.truncate(complete)
+    log_size = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+    if _indexed_bytes > log_size:
+        # The log was truncated or replaced; the sidecar no longer matches it.
+        _reset()
+        os.remove(INDEX_FILE)
+    _scan_log(log_path)
+
+
+def index_appended(log_path: str, entries: List[Tuple[int, int, Percept]]) -> None:
+    """Register rows just appended to the log as (offset, length, percept)."""
+    with _lock:
+        _ensure_loaded(log_path)
+        if entries and entries[0][0] > _indexed_bytes:
+            _scan_log(log_path)  # someone else appended first; catch up
+        new_rows = []
+        for offset, length, p in entries:
+            if offset < _indexed_bytes:
+                continue  # already picked up by the scan
+            row = [offset, length, p.timestamp, p.tick, p.source, list(p.tags)]
+            _add_row(*row)
+            new_rows.append(row)
+        _persist(new_rows)
+
+
+def rebuild(log_path: str) -> int:
+    """Drop the sidecar and re-index the whole log. Returns the number of rows."""
+    global _loaded
+    with _lock:
+        _reset()
+        if os.path.exists(INDEX_FILE):
+            os.remove(INDEX_FILE)
+        _loaded = True
+        _scan_log(log_path)
+        return len(_offset)
+
+
+def lookup(
+    log_path: str,
+    source: str | None = None,
+    tag: str | None = None,
+    since: float | None = None,
+    until: float | None = None,
+    since_tick: int | None = None,
+    limit: int | None = None,
+    newest_first: bool = True,
+) -> List[Tuple[int, int]]:
+    """(offset, length) of matching log rows, newest first by default."""
+    with _lock:
+        _ensure_loaded(log_path)
+        _scan_log(log_path)
+
+        candidates: Sequence[int] = range(len(_offset))
+        if source is not None:
+            candidates = _by_source.get(source, array("I"))
+        if tag is not None:
+            tagged = _by_tag.get(tag, array("I"))
+            if len(tagged) < len(candidates):
+                candidates = tagged
+
+        lo, hi = 0, len(candidates)
+        if since is not None:
+            lo = max(lo, bisect_left(candidates, since, key=lambda r: _time_key[r]))
+        if since_tick is not None:
+            lo = max(lo, bisect_left(candidates, since_tick, key=lambda r: _tick_key[r]))
+        if until is not None:
+            # Rows whose running max is past `until` can still be slightly
+            # out-of-order older ones; the exact check below sorts them out.
+            hi = bisect_right(candidates, until, key=lambda r: _time_key[r])
+            while hi < len(candidates) and _timestamp[candidates[hi]] <= until:
+                hi += 1
+
+        order = range(hi - 1, lo - 1, -1) if newest_first else range(lo, hi)
+        out: List[Tuple[int, int]] = []
+        for i in order:
+            r = candidates[i]
+            if source is not None and _source[r] != source:
+                continue
+            if tag is not None and tag not in _tags[r]:
+                continue
+            if since is not None and _timestamp[r] < since:
+                continue
+            if until is not None and _timestamp[r] > until:
+                continue
+            out.append((_offset[r], _length[r]))
+            if limit is not None and len(out) >= limit:
+                break
+        return out
+
+
+def stats() -> Dict[str, int]:
+    with _lock:
+        return {
+            "rows": len(_offset),
+            "indexed_bytes": _indexed_bytes,
+            "sources": len(_by_source),
+            "tags": len(_by_tag),
+        }
@@ -1,40 +1,107 @@
 import os
-import json
-import time
-from typing import Any, Dict, List
+import threading
+from typing import List
+
+from core import percept_index
+from core.records import Percept
+from utils import clock
+from utils.paths import DATA_DIR
+from utils.serialization import decode_line, encode_line
 
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 PERCEPTS_FILE = os.path.join(DATA_DIR, "percepts.jsonl")
+_TAIL_BLOCK_BYTES = 8192
+_append_lock = threading.Lock()  # the offset handed to the index must be where this batch landed
 
 
 def _ensure_data_dir():
     os.makedirs(DATA_DIR, exist_ok=True)
 
 
-def record_percept(source: str, content: str, tags: List[str] | None = None) -> Dict[str, Any]:
+def record_percept(source: str, content: str, tags: List[str] | None = None) -> Percept:
     """Append a percept to the log and return it."""
     _ensure_data_dir()
-    now = time.time()
-    percept = {
-        "id": f"percept-{int(now * 1000)}",
-        "source": source,
-        "timestamp": now,
-        "content": content,
-        "tags": tags or [],
-    }
-    with open(PERCEPTS_FILE, "a", encoding="utf-8") as f:
-        f.write(json.dumps(percept) + "\n")
+    now = clock.now()
+    percept = Percept(
+        id=clock.new_id("percept"),
+        source=source,
+        timestamp=now,
+        content=content,
+        tags=tuple(tags or ()),
+        tick=percept_index.current_tick(),
+    )
+    append_percepts([percept])
     return percept
 
 
-def get_recent_percepts(limit: int = 5) -> List[Dict[str, Any]]:
+def append_percepts(percepts: List[Percept]) -> None:
+    """Append percepts in a single write and add them to the query index."""
+    if not percepts:
+        return
+    _ensure_data_dir()
+    lines = [(encode_line(p.to_dict()) + "\n").encode("utf-8") for p in percepts]
+    with _append_lock:
+        with open(PERCEPTS_FILE, "ab") as f:
+            offset = f.tell()
+            f.write(b"".join(lines))
+
+        entries = []
+        for p, line in zip(percepts, lines):
+            entries.append((offset, len(line), p))
+            offset += len(line)
+        percept_index.index_appended(PERCEPTS_FILE, entries)
+
+
+def get_recent_percepts(limit: int = 5) -> List[Percept]:
     """Load up to the last `limit` percepts from the log."""
     _ensure_data_dir()
     if not os.path.exists(PERCEPTS_FILE):
         return []
 
-    with open(PERCEPTS_FILE, "r", encoding="utf-8") as f:
-        lines = f.readlines()
+    if limit <= 0:
+        return []
 
-    recent_lines = lines[-limit:]
-    return [json.loads(line) for line in recent_lines]
+    # Read backwards from the end in blocks, so the cost depends on `limit`,
+    # not on how large the log has grown. A trailing line without "\n" is a
+    # batch still being written by the ingest writer and is skipped.
+    with open(PERCEPTS_FILE, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        tail = b""
+        while pos > 0 and tail.count(b"\n") <= limit:
+            step = min(_TAIL_BLOCK_BYTES, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+
+    lines = tail.split(b"\n")
+    complete = lines[:-1]  # the last element is "" or a partial line
+    if pos > 0:
+        complete = complete[1:]  # the first element may be cut mid-line
+    recent_lines = [line for line in complete if line.strip()][-limit:]
+    return [Percept.from_dict(decode_line(line)) for line in recent_lines]
+
+
+def query_percepts(
+    source: str | None = None,
+    tag: str | None = None,
+    since: float | None = None,
+    until: float | None = None,
+    since_tick: int | None = None,
+    limit: int | None = None,
+    newest_first: bool = True,
+) -> List[Percept]:
+    """
+    Percepts matching every given filter, via the index (see core.percept_index).
+    e.g. user messages in the last 5 minutes:
+        query_percepts(source="user", since=clock.now() - 300)
+    """
+    _ensure_data_dir()
+    rows = percept_index.lookup(PERCEPTS_FILE, source, tag, since, until, since_tick, limit, newest_first)
+    if not rows:
+        return []
+    out = []
+    with open(PERCEPTS_FILE, "rb") as f:
+        for offset, length in rows:
+            f.seek(offset)
+            out.append(Percept.from_dict(decode_line(f.read(length))))
+    return out
@@ -0,0 +1,186 @@
+"""
+Compact, immutable record types for the read-side hot path.
+
+Stores on disk stay plain JSON dicts; these records are what the tick loop,
+context builders and prompt formatters pass around. `from_dict` tolerates
+the loose shapes the models (and older data files) produce, coercing types
+and filling defaults in one place instead of `.get()` calls everywhere.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+
+def _str(value: Any, default: str = "") -> str:
+    if value is None:
+        return default
+    return value if isinstance(value, str) else str(value)
+
+
+def _float(value: Any, default: float = 0.0, lo: float | None = None, hi: float | None = None) -> float:
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        return default
+    if lo is not None and result < lo:
+        result = lo
+    if hi is not None and result > hi:
+        result = hi
+    return result
+
+
+def _int(value: Any, default: int = 0) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _str_tuple(value: Any) -> Tuple[str, ...]:
+    if not value:
+        return ()
+    if isinstance(value, str):
+        return (value,)
+    try:
+        return tuple(_str(v) for v in value)
+    except TypeError:
+        return ()
+
+
+@dataclass(frozen=True, slots=True)
+class Percept:
+    id: str
+    source: str
+    timestamp: float
+    content: str
+    tags: Tuple[str, ...] = ()
+    tick: int = 0  # the tick it arrived in; 0 in records written before ticks were kept
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Percept":
+        return cls(
+            id=_str(d.get("id")),
+            source=_str(d.get("source"), "unknown"),
+            timestamp=_float(d.get("timestamp")),
+            content=_str(d.get("content")),
+            tags=_str_tuple(d.get("tags")),
+            tick=_int(d.get("tick")),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "source": self.source,
+            "timestamp": self.timestamp,
+            "content": self.content,
+            "tags": list(self.tags),
+            "tick": self.tick,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class Thought:
+    id: str
+    timestamp: int
+    content: str
+    tags: Tuple[str, ...] = ()
+    confidence: float = 0.5
+    novelty: float = 0.5
+    related_goals: Tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any], default_tick: int = 0) -> "Thought":
+        return cls(
+            id=_str(d.get("id"), f"thought-{default_tick}"),
+            timestamp=_int(d.get("timestamp"), default_tick),
+            content=_str(d.get("content")),
+            tags=_str_tuple(d.get("tags")),
+            confidence=_float(d.get("confidence"), 0.5, 0.0, 1.0),
+            novelty=_float(d.get("novelty"), 0.5, 0.0, 1.0),
+            related_goals=_str_tuple(d.get("related_goals")),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "timestamp": self.timestamp,
+            "content": self.content,
+            "tags": list(self.tags),
+            "confidence": self.confidence,
+            "novelty": self.novelty,
+            "related_goals": list(self.related_goals),
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class MemoryItem:
+    id: str
+    type: str
+    content: str
+    importance: float = 0.5
+    created_at: float = 0.0
+    last_accessed: float = 0.0
+    access_count: int = 0
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "MemoryItem":
+        created_at = _float(d.get("created_at"))
+        return cls(
+            id=_str(d.get("id")),
+            type=_str(d.get("type"), "semantic"),
+            content=_str(d.get("content")),
+            importance=_float(d.get("importance"), 0.5, 0.0, 1.0),
+            created_at=created_at,
+            last_accessed=_float(d.get("last_accessed"), created_at),
+            access_count=_int(d.get("access_count")),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": self.type,
+            "content": self.content,
+            "importance": self.importance,
+            "created_at": self.created_at,
+            "last_accessed": self.last_accessed,
+            "access_count": self.access_count,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class Goal:
+    id: str
+    description: str
+    status: str = "active"
+    priority: float = 0.5
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    subgoals: Tuple[str, ...] = ()
+    parent_id: str | None = None
+    progress: float = 0.0  # own progress for leaves; rolled up from subgoals otherwise
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "Goal":
+        return cls(
+            id=_str(d.get("id")),
+            description=_str(d.get("description")),
+            status=_str(d.get("status"), "active"),
+            priority=_float(d.get("priority"), 0.0),
+            created_at=_float(d.get("created_at")),
+            updated_at=_float(d.get("updated_at")),
+            subgoals=_str_tuple(d.get("subgoals")),
+            parent_id=_str(d.get("parent_id")) or None,
+            progress=_float(d.get("progress"), 0.0, 0.0, 1.0),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "description": self.description,
+            "status": self.status,
+            "priority": self.priority,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "subgoals": list(self.subgoals),
+            "parent_id": self.parent_id,
+            "progress": self.progress,
+        }
@@ -1,9 +1,12 @@
 import os
 from typing import Any, Dict
 
+from core import templates
+from core.records import Thought
+from core.thoughts import seed_window
+from utils.paths import DATA_DIR
 from utils.persistence import load_json, save_json
 
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 STATE_FILE = os.path.join(DATA_DIR, "state.json")
 GUIDANCE_FILE = os.path.join(DATA_DIR, "subconscious_guidance.json")
 
@@ -35,7 +38,6 @@ def _default_speech_state() -> Dict[str, Any]:
 def default_state() -> Dict[str, Any]:
     return {
         "tick": 0,
-        "recent_thoughts": [],
         "subconscious_guidance": {
             "focus_tags": [],
             "temperature": 0.9,
@@ -46,7 +48,11 @@ def default_state() -> Dict[str, Any]:
 
 def load_state() -> Dict[str, Any]:
     _ensure_data_dir()
-    state = load_json(STATE_FILE, default_state())
+    state = load_json(STATE_FILE, None)
+    if state is None:
+        # A forked mind starts from its template's state
+        template = templates.active()
+        state = (template.state() if template is not None else None) or default_state()
 
     # Ensure required keys exist even if file is older
     base = default_state()
@@ -60,6 +66,11 @@ def load_state() -> Dict[str, Any]:
         else:
             state.setdefault(k, v)
 
+    # Older state files carried the thought window inline; it now lives in core.thoughts.
+    legacy_thoughts = state.pop("recent_thoughts", None)
+    if legacy_thoughts:
+        seed_window([Thought.from_dict(t) for t in legacy_thoughts if isinstance(t, dict)], int(state.get("tick", 0)))
+
     # Load guidance if stored separately
     guidance = load_json(GUIDANCE_FILE, state.get("subconscious_guidance", {}))
     state["subconscious_guidance"] = guidance
@@ -0,0 +1,272 @@
+"""
+Mind templates: fork new minds from a shared, read-only base.
+
+A template is a directory made once from an existing mind:
+
+  manifest.json      name, source and sizes
+  memory.base        the mind's memory (hot set and archive), one JSON line
+                     per item, most recently made (created_at) first
+  goals.sqlite3      the goal store
+  state.json         the state with its tick counters reset
+  random_words.txt   the word pool
+
+Forking writes one small file, template.json, into an empty data directory;
+nothing is copied. The forked mind then reads through to the template:
+
+  - memory.base is memory-mapped, so every mind forked from a template
+    shares its pages in the OS page cache. Only the lines a mind actually
+    reaches are decoded, so a fork's RSS does not grow with the template.
+    The mind's own memory.json is the overlay: a base item is copied into
+    it the first time it is updated or deleted, and its id is recorded in
+    template.json (`hidden`) so the base copy is never shown again. Merely
+    surfacing a base item copies nothing: its access stats are kept in
+    template.json (`access`) and carried over if it is copied later.
+  - state.json and the word pool are read from the template until the
+    mind writes its own.
+  - goals.sqlite3 is copied into the mind's goal store when that store is
+    first opened; goal sets are small and the store keeps them in memory.
+
+    python -m tools.template create DEST          # from the mind in CONSCIO_DATA_DIR
+    python -m tools.template fork TEMPLATE DATA_DIR
+"""
+import mmap
+import os
+import shutil
+import sqlite3
+import stat
+import threading
+from typing import Any, Dict, Iterable, List, Set
+
+from utils import clock
+from utils.paths import DATA_DIR
+from utils.persistence import load_json, save_json, update_json
+from utils.serialization import decode_line, encode_document, encode_line
+
+LINK_NAME = "template.json"
+LINK_FILE = os.path.join(DATA_DIR, LINK_NAME)
+MANIFEST_NAME = "manifest.json"
+MEMORY_BASE_NAME = "memory.base"
+
+_lock = threading.RLock()
+_active: "Template | None" = None
+_active_loaded = False
+_hidden: Set[str] = set()
+_access: Dict[str, List[float]] = {}  # base item id -> [last_accessed, access_count]
+_stats: Dict[str, Any] = {"base_lines_scanned": 0, "base_items_decoded": 0}
+
+
+class Template:
+    """A template directory. Its memory base is mapped read-only and scanned lazily."""
+
+    def __init__(self, path: str):
+        self.path = os.path.abspath(path)
+        manifest = load_json(os.path.join(self.path, MANIFEST_NAME), None)
+        if manifest is None:
+            raise FileNotFoundError(f"Not a mind template: {self.path}")
+        self.manifest: Dict[str, Any] = manifest
+        self._map: mmap.mmap | bytes | None = None
+        self._scan_pos = 0
+        # Scanned prefix of memory.base: line offsets and ids, not the items
+        self._offsets: List[int] = []
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def file(self, name: str) -> str | None:
+        path = os.path.join(self.path, name)
+        return path if os.path.exists(path) else None
+
+    def state(self) -> Dict[str, Any] | None:
+        path = self.file("state.json")
+        return load_json(path, None) if path else None
+
+    def _memory_map(self) -> mmap.mmap | bytes:
+        if self._map is None:
+            with open(os.path.join(self.path, MEMORY_BASE_NAME), "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        return self._map
+
+    def _scan_line(self) -> bool:
+        """Index the next line of memory.base; False at the end."""
+        data = self._memory_map()
+        start = self._scan_pos
+        if start >= len(data):
+            return False
+        end = data.find(b"\n", start)
+        if end < 0:
+            end = len(data)
+        self._scan_pos = end + 1
+        item_id = str(decode_line(data[start:end]).get("id", ""))
+        self._index.setdefault(item_id, len(self._ids))
+        self._offsets.append(start)
+        self._ids.append(item_id)
+        _stats["base_lines_scanned"] += 1
+        return True
+
+    def _item(self, row: int) -> Dict[str, Any]:
+        data = self._memory_map()
+        start = self._offsets[row]
+        end = data.find(b"\n", start)
+        _stats["base_items_decoded"] += 1
+        item = decode_line(data[start : end if end >= 0 else len(data)])
+        access = _access.get(self._ids[row])
+        if access is not None:
+            item["last_accessed"] = max(item.get("last_accessed", 0), access[0])
+            item["access_count"] = item.get("access_count", 0) + int(access[1])
+        return item
+
+    def recent_memory(self, limit: int, skip: Set[str]) -> List[Dict[str, Any]]:
+        """The `limit` most recent base items that are not hidden and not in `skip`."""
+        out: List[Dict[str, Any]] = []
+        with _lock:
+            row = 0
+            while len(out) < limit:
+                if row >= len(self._ids) and not self._scan_line():
+                    break
+                item_id = self._ids[row]
+                if item_id not in skip and item_id not in _hidden:
+                    out.append(self._item(row))
+                row += 1
+        return out
+
+    def memory_items(self, ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        Base items with these ids. Only the part of the base recent_memory()
+        has already reached is searched: every base item a mind can refer to
+        was surfaced through it, and other ids must not cost a full scan.
+        """
+        with _lock:
+            rows = {self._index[i] for i in ids if i in self._index}
+            return [self._item(row) for row in sorted(rows)]
+
+
+def active() -> Template | None:
+    """The template this mind was forked from, or None."""
+    global _active, _active_loaded
+    if _active_loaded:
+        return _active
+    with _lock:
+        if not _active_loaded:
+            link = load_json(LINK_FILE, None)
+            if link is not None:
+                _active = Template(link["template"])
+                _hidden.update(link.get("hidden", ()))
+                _access.update(link.get("access", {}))
+            _active_loaded = True
+    return _active
+
+
+def is_hidden(item_id: str) -> bool:
+    return item_id in _hidden
+
+
+def hide(ids: Iterable[str]) -> None:
+    """Never show these base items again (the mind now has its own copies, or deleted them)."""
+    new = {i for i in ids if i and i not in _hidden}
+    if not new:
+        return
+
+    def _add(link: Dict[str, Any]) -> None:
+        link["hidden"] = sorted(set(link.get("hidden", ())) | new)
+        access = link.get("access", {})
+        for item_id in new:
+            access.pop(item_id, None)  # the mind's own copy carries them now
+
+    with _lock:
+        update_json(LINK_FILE, _add, {})
+        _hidden.update(new)
+        for item_id in new:
+            _access.pop(item_id, None)
+
+
+def record_access(stats: Dict[str, List[float]]) -> None:
+    """
+    Add access stats ({id: [last_accessed, count]}) for visible base items
+    to template.json, leaving the items themselves in the base.
+    """
+    template = active()
+    if template is None:
+        return
+    with _lock:
+        stats = {i: s for i, s in stats.items() if i in template._index and i not in _hidden}
+    if not stats:
+        return
+
+    def _add(link: Dict[str, Any]) -> None:
+        access = link.setdefault("access", {})
+        for item_id, (last, count) in stats.items():
+            previous = access.get(item_id, [0, 0])
+            access[item_id] = [max(previous[0], last), previous[1] + int(count)]
+
+    with _lock:
+        link = update_json(LINK_FILE, _add, {})
+        _access.update(link.get("access", {}))
+
+
+def _write_document(path: str, data: Any) -> None:
+    # Template files are written once, before anything can read them: no lock sidecars
+    with open(path, "wb") as f:
+        f.write(encode_document(data))
+
+
+def create_template(dest: str, name: str | None = None) -> Dict[str, Any]:
+    """Build a template at `dest` (which must not exist) from the mind in DATA_DIR."""
+    from core.goals import backup_goals
+    from core.memory import load_archive, load_memory, memory_recency
+    from core.state import default_state, load_state
+    from utils.randomness import WORDS_FILE
+
+    dest = os.path.abspath(dest)
+    os.makedirs(dest)
+    items = [dict(m) for m in load_archive()] + load_memory()
+    for m in items:
+        m.pop("archived_at", None)
+    items.sort(key=memory_recency, reverse=True)
+    with open(os.path.join(dest, MEMORY_BASE_NAME), "w", encoding="utf-8") as f:
+        for m in items:
+            f.write(encode_line(m) + "\n")
+
+    goals_db = os.path.join(dest, "goals.sqlite3")
+    backup_goals(goals_db)
+    conn = sqlite3.connect(goals_db)
+    try:
+        conn.execute("PRAGMA journal_mode=DELETE")  # a read-only WAL database cannot be opened without its -shm
+    finally:
+        conn.close()
+    state = load_state()
+    speech_state = default_state()["speech_state"]
+    speech_state["mode"] = state.get("speech_state", {}).get("mode", speech_state["mode"])
+    state.update(tick=0, speech_state=speech_state)
+    _write_document(os.path.join(dest, "state.json"), state)
+    if os.path.exists(WORDS_FILE):
+        shutil.copy2(WORDS_FILE, os.path.join(dest, "random_words.txt"))
+
+    manifest = {
+        "name": name or os.path.basename(dest),
+        "source": os.path.abspath(DATA_DIR),
+        "created_at": clock.now(),
+        "memory_items": len(items),
+        "memory_bytes": os.path.getsize(os.path.join(dest, MEMORY_BASE_NAME)),
+    }
+    _write_document(os.path.join(dest, MANIFEST_NAME), manifest)
+    # Read-only from here on: forks share these files and must never write them
+    for filename in os.listdir(dest):
+        os.chmod(os.path.join(dest, filename), stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+    return manifest
+
+
+def fork(template_dir: str, data_dir: str) -> str:
+    """Start a new mind in `data_dir` backed by the template. Returns the link file's path."""
+    template = Template(template_dir)
+    os.makedirs(data_dir, exist_ok=True)
+    for name in (LINK_NAME, "state.json", "memory.json", "goals.sqlite3"):
+        if os.path.exists(os.path.join(data_dir, name)):
+            raise FileExistsError(f"{data_dir} already holds a mind ({name})")
+    link = os.path.join(data_dir, LINK_NAME)
+    save_json(link, {"template": template.path, "forked_at": clock.now(), "hidden": []})
+    return link
+
+
+def get_stats() -> Dict[str, Any]:
+    template = active()
+    return dict(_stats, template=template.path if template else None, hidden=len(_hidden), accessed=len(_access))
@@ -0,0 +1,210 @@
+"""
+Thought store: a fixed-capacity ring buffer for the live window plus an
+append-only history for long-term analysis.
+
+History layout (both files append-only):
+
+  thoughts.idx   fixed-width rows, one per thought:
+                 tick (u32), confidence (f32), novelty (f32),
+                 content offset (u64), content length (u32),
+                 tags offset (u64), tags length (u16)
+  thoughts.heap  the thought without its tags as a JSON line (content),
+                 then its tags joined by \\x1f, both referenced by offset
+                 from the index; the tags are stored only there (at most
+                 64 KiB of them, cut on a character boundary)
+
+The heap is written before the index row, so a crash can leave unreferenced
+heap bytes but never an index row pointing past the end of the heap.
+
+Index ticks never decrease, which is what lets read_history_columns bisect
+them: an append for a tick below the last indexed one (e.g. after state.json
+was reset) is stored at the last indexed tick instead.
+"""
+import os
+import struct
+import threading
+from array import array
+from collections import deque
+from typing import BinaryIO, Deque, Dict, Iterator, List
+
+from core.records import Thought
+from utils.logging_utils import log_internal
+from utils.paths import DATA_DIR
+from utils.serialization import decode_line, encode_line
+
+INDEX_FILE = os.path.join(DATA_DIR, "thoughts.idx")
+HEAP_FILE = os.path.join(DATA_DIR, "thoughts.heap")
+
+WINDOW_SIZE = 20
+
+_ROW = struct.Struct("<IffQIQH")
+_TAG_SEP = "\x1f"
+_COLUMNS = (
+    ("tick", "I"),
+    ("confidence", "f"),
+    ("novelty", "f"),
+    ("content_offset", "Q"),
+    ("content_length", "I"),
+    ("tags_offset", "Q"),
+    ("tags_length", "H"),
+)
+
+_window: Deque[Thought] = deque(maxlen=WINDOW_SIZE)
+_window_loaded = False
+_last_tick = 0  # highest tick in the index, read with the window
+_rebasing = False
+_lock = threading.Lock()
+
+
+def _ensure_data_dir():
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+
+def _history_rows() -> int:
+    if not os.path.exists(INDEX_FILE):
+        return 0
+    return os.path.getsize(INDEX_FILE) // _ROW.size
+
+
+def _encode_tags(tags: tuple) -> bytes:
+    # Cut to the u16 length column without splitting a UTF-8 sequence
+    data = _TAG_SEP.join(tags).encode("utf-8")
+    if len(data) > 0xFFFF:
+        data = data[:0xFFFF].decode("utf-8", errors="ignore").encode("utf-8")
+    return data
+
+
+def _read_thought(heap: BinaryIO, tick: int, offset: int, length: int, tags_offset: int, tags_length: int) -> Thought:
+    heap.seek(offset)
+    record = decode_line(heap.read(length))
+    if "tags" not in record:  # older records still carry a copy of their tags; newer ones are read from the index
+        if tags_offset != offset + length:
+            heap.seek(tags_offset)
+        tags = heap.read(tags_length).decode("utf-8", "replace")
+        record["tags"] = tags.split(_TAG_SEP) if tags else []
+    return Thought.from_dict(record, tick)
+
+
+def _ensure_window() -> None:
+    """Fill the ring buffer from the tail of the history on first use."""
+    global _window_loaded, _last_tick
+    if _window_loaded:
+        return
+    _window_loaded = True
+    rows = _history_rows()
+    if not rows:
+        return
+    start = max(0, rows - WINDOW_SIZE)
+    with open(INDEX_FILE, "rb") as idx, open(HEAP_FILE, "rb") as heap:
+        idx.seek(start * _ROW.size)
+        for row in _ROW.iter_unpack(idx.read((rows - start) * _ROW.size)):
+            _window.append(_read_thought(heap, row[0], *row[3:]))
+            _last_tick = row[0]
+
+
+def append_thoughts(tick: int, thoughts: List[Thought]) -> None:
+    """O(1) per thought: push into the live window and append to the history."""
+    global _last_tick, _rebasing
+    if not thoughts:
+        return
+    _ensure_data_dir()
+    with _lock:
+        _ensure_window()
+        if tick < _last_tick:
+            if not _rebasing:
+                log_internal(f"[thoughts] tick {tick} is behind the history (at {_last_tick}); storing it there")
+            _rebasing = True
+            tick = _last_tick
+        else:
+            _rebasing = False
+            _last_tick = tick
+        _window.extend(thoughts)
+
+        index_rows = []
+        with open(HEAP_FILE, "ab") as heap:
+            offset = heap.tell()
+            for t in thoughts:
+                record = t.to_dict()
+                del record["tags"]
+                content = encode_line(record).encode("utf-8")
+                tags = _encode_tags(t.tags)
+                heap.write(content)
+                heap.write(tags)
+                index_rows.append(
+                    _ROW.pack(tick, t.confidence, t.novelty, offset, len(content), offset + len(content), len(tags))
+                )
+                offset += len(content) + len(tags)
+        with open(INDEX_FILE, "ab") as idx:
+            idx.write(b"".join(index_rows))
+
+
+def get_recent_thoughts(limit: int = WINDOW_SIZE) -> List[Thought]:
+    with _lock:
+        _ensure_window()
+        if limit >= len(_window):
+            return list(_window)
+        return list(_window)[-limit:]
+
+
+def seed_window(thoughts: List[Thought], current_tick: int) -> None:
+    """
+    Migrate thoughts from an older state.json, only if there is no history
+    yet. Their own timestamps are whatever the model wrote, so they are
+    given the ticks just before `current_tick`, in order (never below 0).
+    """
+    if not thoughts or _history_rows():
+        return
+    for i, t in enumerate(thoughts):
+        append_thoughts(max(0, current_tick - len(thoughts) + i), [t])
+
+
+def read_history_columns(start_tick: int | None = None, end_tick: int | None = None) -> Dict[str, array]:
+    """
+    Return the history index as typed columns, optionally restricted to
+    start_tick <= tick <= end_tick. Ticks are monotonic, so the range is
+    found by binary search over the fixed-width rows.
+    """
+    columns = {name: array(code) for name, code in _COLUMNS}
+    rows = _history_rows()
+    if not rows:
+        return columns
+
+    with open(INDEX_FILE, "rb") as idx:
+        lo = _bisect_tick(idx, rows, start_tick) if start_tick is not None else 0
+        hi = _bisect_tick(idx, rows, end_tick + 1) if end_tick is not None else rows
+        idx.seek(lo * _ROW.size)
+        data = idx.read(max(0, hi - lo) * _ROW.size)
+
+    for row in _ROW.iter_unpack(data):
+        for (name, _), value in zip(_COLUMNS, row):
+            columns[name].append(value)
+    return columns
+
+
+def _bisect_tick(idx, rows: int, tick: int) -> int:
+    """First row whose tick is >= `tick`."""
+    lo, hi = 0, rows
+    while lo < hi:
+        mid = (lo + hi) // 2
+        idx.seek(mid * _ROW.size)
+        if _ROW.unpack(idx.read(_ROW.size))[0] < tick:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def iter_history(start_tick: int | None = None, end_tick: int | None = None) -> Iterator[Thought]:
+    columns = read_history_columns(start_tick, end_tick)
+    names = ("tick", "content_offset", "content_length", "tags_offset", "tags_length")
+    with open(HEAP_FILE, "rb") as heap:
+        for row in zip(*(columns[name] for name in names)):
+            yield _read_thought(heap, *row)
+
+
+def read_tags(tags_offset: int, tags_length: int) -> List[str]:
+    if not tags_length:
+        return []
+    with open(HEAP_FILE, "rb") as heap:
+        heap.seek(tags_offset)
+        return heap.read(tags_length).decode("utf-8", "replace").split(_TAG_SEP)
@@ -1,21 +1,52 @@
-import time
+import os
 import threading
+from typing import Callable
 
 from core.state import load_state, save_state
-from core.percepts import get_recent_percepts, record_percept
+from core import ingest
+from core import observer
+from core import templates
+from core import percept_index
+from core.percepts import get_recent_percepts
 from core.goals import get_active_goals
-from core.memory import get_recent_memory
+from core.memory import flush_access_stats, get_recent_memory, start_consolidation_worker, touch_memory_items
+from core.thoughts import append_thoughts, get_recent_thoughts
 from agents.subconscious import build_subconscious_context, call_subconscious_llm
 from agents.conscious import build_conscious_context, call_conscious_llm
+from actions import tool_runner
 from actions.executor import execute_actions
+from agents import client, context_threads, governor, output_parser, prompt_cache, recording, router, subconscious
+from utils import clock, persistence, profiling, rss
 from utils.logging_utils import log_thoughts, log_decision
 
 
 TICK_INTERVAL_SECONDS = 1.0
+TICK_BUDGET_SECONDS = 20.0  # deadline for both model calls in one tick
+SUBCONSCIOUS_BUDGET_SHARE = 0.4  # portion of the budget the subconscious may use
 IDLE_TIMEOUT_SECONDS = 30.0  # configurable idle shutoff window
 
 _running = True  # simple flag to stop both loops on Ctrl+C
 
+# Metrics carried by every observer snapshot
+for _name, _fn in (
+    ("governor", governor.get_stats),
+    ("router", router.get_stats),
+    ("subconscious", subconscious.get_stats),
+    ("output_parser", output_parser.get_stats),
+    ("context_threads", context_threads.get_stats),
+    ("prompt_cache", prompt_cache.get_stats),
+    ("tool_runner", tool_runner.get_stats),
+    ("ingest", ingest.get_stats),
+    ("persistence", persistence.get_stats),
+    ("templates", templates.get_stats),
+    ("rss", rss.get_stats),
+):
+    observer.register_metrics(_name, _fn)
+
+# Caches dropped when the process goes over rss.MAX_RSS_MB
+rss.register_shedder("prompt_cache", prompt_cache.clear)
+rss.register_shedder("observer_history", observer.drop_history)
+
 
 def cli_input_worker() -> None:
     """
@@ -36,21 +67,21 @@ def cli_input_worker() -> None:
 
         if text.lower() in {"quit", "exit"}:
             print("[CLI] Received 'quit' command. Use Ctrl+C in main window to stop the loop.")
-        # Record as a percept for the mind to use next ticks
-        record_percept(source="user", content=text, tags=["cli"])
-        print(f"[CLI] Recorded percept from user: {text}")
+        # Queue as a percept for the mind to use next ticks
+        if ingest.submit(source="user", content=text, tags=["cli"]):
+            print(f"[CLI] Recorded percept from user: {text}")
+        else:
+            print("[CLI] Percept queue is full; message dropped.")
 
 
 def _update_speech_state_from_percepts(state: dict, recent_percepts: list) -> None:
     """Update last_user_tick and last_user_wall_time if recent percepts contain user messages."""
-    import time as _time
-
     speech_state = state.get("speech_state", {})
     tick = state.get("tick", 0)
 
-    if any(p.get("source") == "user" for p in recent_percepts):
+    if any(p.source == "user" for p in recent_percepts):
         speech_state["last_user_tick"] = tick
-        speech_state["last_user_wall_time"] = _time.time()
+        speech_state["last_user_wall_time"] = clock.now()
 
     state["speech_state"] = speech_state
 
@@ -75,7 +106,11 @@ def tick(state: dict) -> dict:
     """One heartbeat of the system."""
 
     state["tick"] += 1
+    tick_started = clock.now()
+    recording.record_tick(state["tick"])
+    percept_index.note_tick(state["tick"])
 
+    profiling.stage("inputs")
     recent_percepts = get_recent_percepts(limit=5)
     active_goals = get_active_goals(limit=3)
     recent_memory = get_recent_memory(limit=10)
@@ -84,19 +119,23 @@ def tick(state: dict) -> dict:
     _update_speech_state_from_percepts(state, recent_percepts)
 
     # 1) Subconscious
+    profiling.stage("subconscious")
     sub_ctx = build_subconscious_context(
         tick=state["tick"],
         recent_percepts=recent_percepts,
         active_goals=active_goals,
-        recent_thoughts=state.get("recent_thoughts", []),
+        recent_thoughts=get_recent_thoughts(),
         guidance=state.get("subconscious_guidance", {}),
     )
-    sub_output = call_subconscious_llm(sub_ctx)
-    state["recent_thoughts"] = (state.get("recent_thoughts", []) + sub_output["thoughts"])[-20:]
+    sub_output = call_subconscious_llm(
+        sub_ctx, deadline=tick_started + TICK_BUDGET_SECONDS * SUBCONSCIOUS_BUDGET_SHARE
+    )
+    append_thoughts(state["tick"], sub_output["thoughts"])
 
     log_thoughts(state["tick"], sub_output["thoughts"])
 
     # 2) Conscious (now includes speech governor)
+    profiling.stage("conscious")
     cons_ctx = build_conscious_context(
         tick=state["tick"],
         subconscious_output=sub_output,
@@ -105,13 +144,15 @@ def tick(state: dict) -> dict:
         memory_candidates=recent_memory,
         speech_state=state.get("speech_state", {}),
     )
-    decision = call_conscious_llm(cons_ctx)
+    decision = call_conscious_llm(cons_ctx, deadline=tick_started + TICK_BUDGET_SECONDS)
+    touch_memory_items(m.id for m in recent_memory)
     log_decision(state["tick"], decision)
 
     # Update speech_state based on SPEAK/STAY_SILENT choice
     _update_speech_state_from_decision(state, decision)
 
     # 3) Apply external actions (e.g., SPEAK)
+    profiling.stage("actions")
     execute_actions(decision.get("actions", []), decision, state)
 
     # 4) Update guidance for subconscious next tick
@@ -130,44 +171,117 @@ def tick(state: dict) -> dict:
     guidance["temperature"] = max(0.1, min(1.2, temperature))
     state["subconscious_guidance"] = guidance
 
+    rss.check()
+
+    # Copy-on-publish snapshot for observers (dashboards never touch the live state)
+    observer.publish(
+        state,
+        clock.now() - tick_started,
+        decision=decision,
+        thoughts=sub_output["thoughts"],
+        active_goals=active_goals,
+        recent_percepts=recent_percepts,
+    )
+
+    return state
+
+
+def run(
+    state: dict,
+    max_ticks: int | None = None,
+    before_tick: Callable[[dict], None] | None = None,
+    save_every: int = 1,
+) -> dict:
+    """
+    Tick until the idle timeout, `max_ticks`, or `_running` is cleared.
+    Time and sleeps come from utils.clock, so a SimulatedClock runs this
+    loop as fast as the ticks themselves allow. The state is saved every
+    `save_every` ticks and when the loop ends (simulations save less often
+    than live runs, where a crash should lose at most one tick).
+    """
+    global _running
+
+    ticks = 0
+    while _running and (max_ticks is None or ticks < max_ticks):
+        now = clock.now()
+        speech_state = state.get("speech_state", {})
+        last_user_ts = speech_state.get("last_user_wall_time") or now
+
+        # Idle safety cutoff: shut down if no user input for IDLE_TIMEOUT_SECONDS
+        if now - last_user_ts > IDLE_TIMEOUT_SECONDS:
+            print(f"\n[main] Idle timeout hit ({IDLE_TIMEOUT_SECONDS} seconds with no user input). Shutting down.")
+            _running = False
+            break
+
+        if before_tick is not None:
+            before_tick(state)
+        profiling.tick_started()
+        state = tick(state)
+        ticks += 1
+        profiling.stage("save")
+        if ticks % save_every == 0:
+            save_state(state)
+        profiling.tick_finished()
+        # The governor stretches the interval as token/request budgets fill up
+        clock.sleep(governor.tick_interval(TICK_INTERVAL_SECONDS))
+    if ticks % save_every:
+        save_state(state)
     return state
 
 
 def main():
     global _running
 
+    # Build the model client (SDK import + connection pool) while startup continues
+    client.prewarm()
+
     state = load_state()
 
     # Initialize last_user_wall_time if not present or zero
     speech_state = state.get("speech_state", {})
     if not speech_state.get("last_user_wall_time"):
-        speech_state["last_user_wall_time"] = time.time()
+        speech_state["last_user_wall_time"] = clock.now()
     state["speech_state"] = speech_state
 
+    # CONSCIO_RECORD=1 captures prompts/responses for tools/replay.py
+    if os.environ.get("CONSCIO_RECORD"):
+        print(f"[main] Recording session to {recording.start_recording()}")
+
+    # Keep memory.json bounded: merge near-duplicates and archive cold items
+    stop_consolidation = start_consolidation_worker()
+
+    # Batch writer for percepts from the CLI and any configured ingest sources
+    stop_ingestion = ingest.start_ingestion()
+
+    # Profiling on demand: SIGUSR1/SIGUSR2 or tools/profile.py via the control socket
+    profiling.install_signal_handlers()
+    stop_profiler_control = profiling.start_control_socket()
+
+    # Read-only snapshots over HTTP, if observer.HTTP_PORT is configured
+    stop_observer = observer.start_server()
+
     # Start background thread to read CLI input
     input_thread = threading.Thread(target=cli_input_worker, daemon=True)
     input_thread.start()
 
     try:
-        while True:
-            now = time.time()
-            speech_state = state.get("speech_state", {})
-            last_user_ts = speech_state.get("last_user_wall_time") or now
-
-            # Idle safety cutoff: shut down if no user input for IDLE_TIMEOUT_SECONDS
-            if now - last_user_ts > IDLE_TIMEOUT_SECONDS:
-                print(f"\n[main] Idle timeout hit ({IDLE_TIMEOUT_SECONDS} seconds with no user input). Shutting down.")
-                _running = False
-                save_state(state)
-                break
-
-            state = tick(state)
-            save_state(state)
-            time.sleep(TICK_INTERVAL_SECONDS)
+        state = run(state)
     except KeyboardInterrupt:
         print("\n[main] Stopped by user; saving state one last time...")
-        _running = False
-        save_state(state)
+    _running = False
+    stop_consolidation.set()
+    flush_access_stats()
+    tool_runner.shutdown()
+    profiling.stop_all()
+    if stop_profiler_control is not None:
+        stop_profiler_control.set()
+    if stop_observer is not None:
+        stop_observer.set()
+    stop_ingestion.set()
+    ingest.flush()
+    save_state(state)
+    recording.stop_recording(state)
+    client.close_client()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# Point the stores at a scratch directory before any repo module reads utils.paths.DATA_DIR
+os.environ.setdefault("CONSCIO_DATA_DIR", tempfile.mkdtemp(prefix="conscio-tests-"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,45 @@
+import json
+
+from core import ingest
+from utils import clock
+
+
+def _drain_contents():
+    out = []
+    while not ingest._queue.empty():
+        out.append(ingest._queue.get_nowait().content)
+    return out
+
+
+def test_inbox_file_is_kept_until_every_line_is_accepted(monkeypatch, tmp_path):
+    sim = clock.SimulatedClock(start=1000.0)
+    monkeypatch.setattr(clock, "_clock", sim)
+    monkeypatch.setattr(ingest, "SOURCE_RATE_LIMITS", {"file": 3.0})
+    monkeypatch.setattr(ingest, "_buckets", {})
+    _drain_contents()
+
+    path = tmp_path / "batch.jsonl"
+    lines = ["one", json.dumps([{"content": "two"}, {"content": "three"}]), "four", "five"]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    assert not ingest._ingest_file(str(path))
+    assert _drain_contents() == ["one", "two", "three"]
+    sim.advance(1.0)
+    assert ingest._ingest_file(str(path))
+    assert _drain_contents() == ["four", "five"]
+    assert str(path) not in ingest._inbox_progress
+
+
+def test_a_rejection_inside_a_json_list_resumes_at_that_item(monkeypatch, tmp_path):
+    sim = clock.SimulatedClock(start=1000.0)
+    monkeypatch.setattr(clock, "_clock", sim)
+    monkeypatch.setattr(ingest, "SOURCE_RATE_LIMITS", {"file": 2.0})
+    monkeypatch.setattr(ingest, "_buckets", {})
+    _drain_contents()
+
+    path = tmp_path / "list.jsonl"
+    path.write_text(json.dumps([{"content": c} for c in "abc"]) + "\n", encoding="utf-8")
+    assert not ingest._ingest_file(str(path))
+    sim.advance(1.0)
+    assert ingest._ingest_file(str(path))
+    assert _drain_contents() == ["a", "b", "c"]
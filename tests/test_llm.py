@@ -0,0 +1,66 @@
+import pytest
+
+from agents import governor, llm
+from utils import clock
+
+
+class _Failing:
+    def __init__(self, error):
+        self.error = error
+        self.responses = self
+        self.calls = 0
+
+    def create(self, **_):
+        self.calls += 1
+        raise self.error
+
+
+class _RateLimited(Exception):
+    status_code = 429
+
+
+@pytest.fixture
+def sim(monkeypatch):
+    sim = clock.SimulatedClock(start=1000.0)
+    monkeypatch.setattr(clock, "_clock", sim)
+    monkeypatch.setattr(governor, "_cooldown_until", 0.0)
+    llm._breakers.clear()
+    yield sim
+    llm._breakers.clear()
+
+
+def test_no_backoff_after_the_last_attempt(sim):
+    client = _Failing(ConnectionError("reset"))
+    with pytest.raises(llm.LLMUnavailable):
+        llm.create_response(client, "test", model="m", input="hi")
+    assert client.calls == llm.MAX_RETRIES + 1
+    # Backoffs are capped per retry; none follows the final failure
+    cap = sum(min(llm.BACKOFF_MAX_SECONDS, llm.BACKOFF_BASE_SECONDS * 2**a) for a in range(llm.MAX_RETRIES))
+    assert sim.time() - 1000.0 <= cap
+    assert llm._breakers["test"]["failures"] == 1
+
+
+def test_rate_limit_on_the_last_attempt_leaves_the_breaker_alone(sim):
+    client = _Failing(_RateLimited("slow down"))
+    with pytest.raises(llm.LLMUnavailable):
+        llm.create_response(client, "test", model="m", input="hi")
+    assert llm._breakers.get("test", {}).get("failures", 0) == 0
+
+
+def test_a_spent_deadline_is_not_a_backend_failure(sim):
+    client = _Failing(ConnectionError("unused"))
+    with pytest.raises(llm.LLMUnavailable):
+        llm.create_response(client, "test", deadline=sim.time() - 1, model="m", input="hi")
+    assert client.calls == 0
+    assert llm._breakers.get("test", {}).get("failures", 0) == 0
+
+
+def test_backoff_leaves_the_global_random_stream_alone(sim):
+    import random
+
+    random.seed(7)
+    expected = random.random()
+    random.seed(7)
+    with pytest.raises(llm.LLMUnavailable):
+        llm.create_response(_Failing(ConnectionError("reset")), "test", model="m", input="hi")
+    assert random.random() == expected
@@ -0,0 +1,89 @@
+import os
+
+from core import memory
+from utils import clock
+
+
+def test_access_stats_are_batched_and_do_not_change_retrieval(monkeypatch):
+    sim = clock.SimulatedClock(start=1000.0)
+    monkeypatch.setattr(clock, "_clock", sim)
+    memory.save_memory([])
+    for i in range(4):
+        memory.add_memory_item({"content": f"item {i}", "type": "fact"})
+        sim.sleep(1)
+    recent = [m.id for m in memory.get_recent_memory(2)]
+    stamp = os.stat(memory.MEMORY_FILE).st_mtime_ns
+
+    for _ in range(10):
+        memory.touch_memory_items(recent)
+        sim.sleep(1)
+    assert os.stat(memory.MEMORY_FILE).st_mtime_ns == stamp
+    assert [m.id for m in memory.get_recent_memory(2)] == recent
+
+    memory.flush_access_stats()
+    counts = {m["id"]: m["access_count"] for m in memory.load_memory()}
+    assert [counts[i] for i in recent] == [10, 10]
+    assert sum(counts.values()) == 20
+
+
+def test_oversized_top_item_does_not_evict_the_items_that_fit(monkeypatch):
+    monkeypatch.setattr(memory, "MAX_HOT_BYTES", 1024)
+    now = clock.now()
+    big = {"id": "big", "content": "x" * 2048, "importance": 1.0, "created_at": now, "last_accessed": now}
+    small = [
+        {"id": f"s{i}", "content": f"small {i}", "importance": 0.1, "created_at": now, "last_accessed": now}
+        for i in range(5)
+    ]
+    kept = memory._enforce_budget([big] + small)
+    assert [m["id"] for m in kept] == [m["id"] for m in small]
+
+
+def test_updates_to_merged_ids_reach_the_surviving_item():
+    from agents.conscious import _apply_memory_updates
+
+    memory.save_memory([])
+    memory.add_memory_item({"id": "a", "content": "the kettle is on the stove", "type": "fact", "importance": 0.9})
+    memory.add_memory_item({"id": "b", "content": "the kettle is on the stove", "type": "fact", "importance": 0.2})
+    assert memory.consolidate_memory() == 1
+    assert [m["id"] for m in memory.load_memory()] == ["a"]
+
+    _apply_memory_updates({"update": [{"id": "b", "patch": {"content": "the kettle is off"}}]})
+    assert memory.load_memory()[0]["content"] == "the kettle is off"
+    _apply_memory_updates({"delete": ["b"]})
+    assert memory.load_memory() == []
+
+
+def test_surfacing_template_items_does_not_copy_them(monkeypatch, tmp_path):
+    from core import templates
+    from utils.persistence import load_json, save_json
+    from utils.serialization import encode_line
+
+    base = tmp_path / "template"
+    base.mkdir()
+    save_json(str(base / templates.MANIFEST_NAME), {"name": "t"})
+    base_items = [{"id": f"base-{i}", "content": f"base {i}", "created_at": 10.0 - i} for i in range(3)]
+    (base / templates.MEMORY_BASE_NAME).write_text("".join(encode_line(m) + "\n" for m in base_items))
+    link = tmp_path / "template.json"
+    save_json(str(link), {"template": str(base), "hidden": []})
+    monkeypatch.setattr(templates, "LINK_FILE", str(link))
+    monkeypatch.setattr(templates, "_active", None)
+    monkeypatch.setattr(templates, "_active_loaded", False)
+    monkeypatch.setattr(templates, "_hidden", set())
+    monkeypatch.setattr(templates, "_access", {})
+    memory.save_memory([])
+
+    surfaced = [m.id for m in memory.get_recent_memory(2)]
+    assert surfaced == ["base-0", "base-1"]
+    memory.touch_memory_items(surfaced)
+    memory.touch_memory_items(surfaced)
+    memory.flush_access_stats()
+    assert memory.load_memory() == []
+    assert load_json(str(link), {})["access"]["base-0"][1] == 2
+
+    from agents.conscious import _apply_memory_updates
+
+    _apply_memory_updates({"update": [{"id": "base-0", "patch": {"content": "changed"}}]})
+    [own] = memory.load_memory()
+    assert (own["id"], own["content"], own["access_count"]) == ("base-0", "changed", 2)
+    assert "base-0" not in load_json(str(link), {})["access"]
+    assert [m.id for m in memory.get_recent_memory(3)] == ["base-0", "base-1", "base-2"]
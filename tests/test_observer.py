@@ -0,0 +1,27 @@
+import json
+import time
+
+from core import observer
+
+
+def test_versions_start_above_an_earlier_boot(monkeypatch):
+    monkeypatch.setattr(observer, "_latest", None)
+    monkeypatch.setattr(observer, "SNAPSHOT_FILE", None)
+    before = time.time_ns() // 1000
+    snapshot = observer.publish({"tick": 1}, 0.0)
+    assert snapshot.version > observer._EPOCH
+    assert observer._EPOCH <= before
+    assert observer.publish({"tick": 2}, 0.0).version == snapshot.version + 1
+
+
+def test_the_file_mirror_is_written_off_the_tick_path(monkeypatch, tmp_path):
+    path = tmp_path / "snapshot.json"
+    monkeypatch.setattr(observer, "SNAPSHOT_FILE", str(path))
+    for tick in range(1, 6):
+        last = observer.publish({"tick": tick}, 0.0)
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        if path.exists() and json.loads(path.read_bytes())["version"] == last.version:
+            break
+        time.sleep(0.01)
+    assert observer.FileSnapshots(str(path)).latest().version == last.version
@@ -0,0 +1,75 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from agents import conscious
+from agents.client import set_client
+from agents.fake_client import make_response
+from agents.output_parser import CONSCIOUS_SCHEMA, ModelOutputError, parse_model_json, repair_json
+
+
+@pytest.mark.parametrize(
+    "text, expected, repair",
+    [
+        ('{"a": tru', {}, "truncated"),
+        ('{"a": 1.', {}, "truncated"),
+        ('{"x": 1, "a": tru', {"x": 1}, "truncated"),
+        ('{"x": [1, 2,', {"x": [1, 2]}, "truncated"),
+        ('{"action": "SPEAK"} and then {some note}', {"action": "SPEAK"}, "trailing_text"),
+        ('{"s": "}"} see {"b": 2}', {"s": "}"}, "trailing_text"),
+        ('Sure: {"a": [1, 2,]}', {"a": [1, 2]}, "trailing_comma"),
+    ],
+)
+def test_repair_json(text, expected, repair):
+    value, repairs = repair_json(text)
+    assert value == expected
+    assert repair in repairs
+
+
+def test_unrepairable_output_raises():
+    with pytest.raises(ModelOutputError):
+        repair_json("no object here")
+
+
+def test_truncated_reply_is_reported():
+    problems = []
+    text = '{"action": "SPEAK", "user_message": {"content": "I think we'
+    data = parse_model_json("test", text, CONSCIOUS_SCHEMA, problems)
+    assert "truncated" in problems
+    assert data["user_message"]["content"] == "I think we"
+
+
+class _ScriptedClient:
+    def __init__(self, text):
+        self.text = text
+        self.responses = SimpleNamespace(create=lambda **_: make_response(self.text))
+
+    def with_options(self, **_):
+        return self
+
+
+def _context():
+    speech_state = {"mode": "cohost", "last_user_tick": 0, "last_speak_tick": 0}
+    return conscious.build_conscious_context(1, {"thoughts": []}, [], [], [], speech_state)
+
+
+def test_truncated_speak_falls_back_to_silence():
+    reply = {"action": "SPEAK", "user_message": {"content": "I think we should definitely"}}
+    set_client(_ScriptedClient(json.dumps(reply)[:-12]))
+    try:
+        decision = conscious.call_conscious_llm(_context())
+    finally:
+        set_client(None)
+    assert decision["action"] == "STAY_SILENT"
+    assert not [a for a in decision["actions"] if a["type"] == "respond_to_user"]
+
+
+def test_complete_speak_is_kept():
+    reply = {"action": "SPEAK", "user_message": {"content": "Hello there."}}
+    set_client(_ScriptedClient(json.dumps(reply)))
+    try:
+        decision = conscious.call_conscious_llm(_context())
+    finally:
+        set_client(None)
+    assert decision["actions"][0] == {"type": "respond_to_user", "payload": {"message": "Hello there."}}
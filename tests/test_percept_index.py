@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from core import percept_index, percepts
+
+
+@pytest.fixture(autouse=True)
+def _fresh_log(tmp_path, monkeypatch):
+    monkeypatch.setattr(percepts, "PERCEPTS_FILE", str(tmp_path / "percepts.jsonl"))
+    monkeypatch.setattr(percept_index, "INDEX_FILE", str(tmp_path / "percepts.index.jsonl"))
+    monkeypatch.setattr(percept_index, "_loaded", False)
+    percept_index._reset()
+    yield
+    percept_index.note_tick(0)
+    percept_index._reset()
+
+
+def _record(tick, content):
+    percept_index.note_tick(tick)
+    return percepts.record_percept("user", content)
+
+
+def test_rebuild_keeps_the_arrival_tick():
+    for tick in (3, 7, 12):
+        _record(tick, f"at {tick}")
+    percept_index.note_tick(99)
+    assert percept_index.rebuild(percepts.PERCEPTS_FILE) == 3
+    assert [p.content for p in percepts.query_percepts(since_tick=7, newest_first=False)] == ["at 7", "at 12"]
+
+
+def test_partial_sidecar_row_is_truncated_before_appending(monkeypatch):
+    _record(1, "first")
+    with open(percept_index.INDEX_FILE, "ab") as f:
+        f.write(b'[999,10,0.0,')  # a crash mid-row
+
+    # A restarted process loads the sidecar, then appends
+    monkeypatch.setattr(percept_index, "_loaded", False)
+    percept_index._reset()
+    _record(2, "second")
+    with open(percepts.PERCEPTS_FILE, "rb") as f:
+        first_length = len(f.readline())
+    with open(percept_index.INDEX_FILE, "rb") as f:
+        assert [json.loads(line)[0] for line in f] == [0, first_length]
+
+    monkeypatch.setattr(percept_index, "_loaded", False)
+    percept_index._reset()
+    assert [p.content for p in percepts.query_percepts(newest_first=False)] == ["first", "second"]
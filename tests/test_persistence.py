@@ -0,0 +1,62 @@
+import json
+import os
+
+import pytest
+
+from utils import persistence
+from utils.persistence import iter_items, load_json, save_json
+from utils.serialization import FORMAT_VERSION, HEADER_PREFIX, available_formats
+
+ITEMS = [
+    {
+        "id": f"mem-{i}",
+        "content": "ünïcødé ✓ " * (i % 7) + "x" * i,
+        "score": i / 3,
+        "n": -(i * 1_000_003),
+        "ok": i % 2 == 0,
+    }
+    for i in range(40)
+] + [[1, [2, [3]]], "plain", 2**63 - 1, 1.5e-7, None, True, {}]
+
+
+@pytest.mark.parametrize("fmt", available_formats())
+@pytest.mark.parametrize("chunk", [1, 7, 64, 257, 4096, 1 << 20])
+def test_round_trip_across_formats_and_chunk_sizes(tmp_path, monkeypatch, fmt, chunk):
+    monkeypatch.setattr(persistence, "READ_CHUNK_BYTES", chunk)
+    path = str(tmp_path / "doc.json")
+    save_json(path, ITEMS, fmt)
+    assert list(iter_items(path)) == load_json(path, None) == ITEMS
+
+
+@pytest.mark.parametrize("chunk", [1, 64, 4096])
+def test_legacy_pretty_json(tmp_path, monkeypatch, chunk):
+    monkeypatch.setattr(persistence, "READ_CHUNK_BYTES", chunk)
+    path = tmp_path / "legacy.json"
+    path.write_text(json.dumps(ITEMS, indent=2, ensure_ascii=False), encoding="utf-8")
+    assert list(iter_items(str(path))) == ITEMS
+
+
+def test_newer_version_yields_nothing(tmp_path):
+    path = tmp_path / "future.json"
+    path.write_bytes(HEADER_PREFIX + f"format=json version={FORMAT_VERSION + 1}\n".encode() + b"[1, 2, 3]")
+    assert load_json(str(path), "default") == "default"
+    assert list(iter_items(str(path))) == []
+
+
+def test_truncated_payload_yields_the_complete_prefix(tmp_path):
+    path = str(tmp_path / "cut.json")
+    save_json(path, ITEMS, "json")
+    with open(path, "rb") as f:
+        raw = f.read()
+    with open(path, "wb") as f:
+        f.write(raw[: raw.index(b'"mem-3"') + 2])
+    assert load_json(path, "default") == "default"
+    assert list(iter_items(path)) == ITEMS[:3]
+
+
+def test_locked_writes_leave_no_lock_file_next_to_the_data(tmp_path):
+    path = tmp_path / "session" / "final_state.json"
+    path.parent.mkdir()
+    persistence.update_json(str(path), lambda doc: doc.update(tick=1), {})
+    assert sorted(os.listdir(path.parent)) == ["final_state.json"]
+    assert os.path.exists(persistence.file_lock(str(path)).lock_path)
@@ -0,0 +1,37 @@
+import pytest
+
+from utils import profiling
+
+
+@pytest.fixture(autouse=True)
+def _clean():
+    yield
+    profiling._requests.clear()
+    profiling.stop_all()
+
+
+@pytest.mark.parametrize(
+    "command",
+    ["tracemalloc 2 0", "cprofile nan", "cprofile inf", "cprofile 2.5", "sample 2 -1", "sample 2 0.1", "cprofile 3 4"],
+)
+def test_bad_arguments_are_rejected(command):
+    assert profiling.request(command).startswith("error:")
+    assert not profiling._requests
+
+
+def test_failing_profiler_never_reaches_the_tick_loop():
+    class Broken(profiling._Session):
+        kind = "broken"
+
+        def tick_done(self):
+            raise RuntimeError("boom")
+
+        def finish(self):
+            raise OSError("disk full")
+
+    failed = profiling.get_stats()["failed"]
+    profiling._sessions["broken"] = Broken(3)
+    profiling.tick_started()
+    profiling.tick_finished()
+    assert "broken" not in profiling._sessions
+    assert profiling.get_stats()["failed"] == failed + 2
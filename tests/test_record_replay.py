@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RECORD = textwrap.dedent(
+    """
+    import main as mind
+    from agents import recording
+    from agents.client import set_client
+    from agents.fake_client import FakeClient
+    from core.state import load_state, save_state
+
+    set_client(FakeClient())
+    session_dir = recording.start_recording("round-trip")
+    state = load_state()
+    for _ in range(10):
+        state = mind.tick(state)
+        save_state(state)
+    recording.stop_recording(state)
+    print(session_dir)
+    """
+)
+
+
+def _run(args, data_dir):
+    env = dict(os.environ, CONSCIO_DATA_DIR=str(data_dir))
+    result = subprocess.run(args, cwd=REPO, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_a_recorded_session_replays_without_mismatches(tmp_path):
+    (tmp_path / "live").mkdir()
+    (tmp_path / "live" / "random_words.txt").write_text(", ".join(f"word{i}" for i in range(50)), encoding="utf-8")
+    session_dir = _run([sys.executable, "-c", RECORD], tmp_path / "live").strip().splitlines()[-1]
+
+    out = _run([sys.executable, "-m", "tools.replay", session_dir, "--workdir", str(tmp_path / "replay")], tmp_path)
+    assert "Replayed 10 ticks" in out
+    assert "unmatched model calls: 0" in out
+    assert "mismatches against the recording: 0" in out, out
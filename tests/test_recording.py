@@ -0,0 +1,36 @@
+import pytest
+
+from agents.recording import ReplayClient
+
+
+def _call(layer, prompt, response):
+    return {"kind": "call", "layer": layer, "prompt": prompt, "response": response, "usage": {}}
+
+
+def _client():
+    calls = [_call("subconscious", "sub prompt", "sub answer"), _call("conscious", ["cons", "prompt"], "cons answer")]
+    client = ReplayClient({"ticks": [{"tick": 1, "wall_time": 0.0, "calls": calls}]})
+    client.begin_tick(1)
+    return client
+
+
+def _text(response):
+    return response.output[0].content[0].text
+
+
+def test_calls_are_answered_per_layer():
+    client = _client()
+    assert _text(client.for_layer("conscious").responses.create(input=("cons", "prompt"))) == "cons answer"
+    assert _text(client.for_layer("subconscious").responses.create(input="sub prompt")) == "sub answer"
+    client.finish()
+    assert client.mismatches == []
+
+
+def test_mismatches_are_reported():
+    client = _client()
+    with pytest.raises(ConnectionError):
+        client.for_layer("tools").responses.create(input="x")
+    client.for_layer("subconscious").responses.create(input="a different prompt")
+    client.finish()
+    assert client.misses == 1
+    assert [m.split(":")[1].split()[0] for m in client.mismatches] == ["unexpected", "subconscious", "1"]
@@ -0,0 +1,65 @@
+import pytest
+
+from core import thoughts
+from core.records import Thought
+
+
+@pytest.fixture(autouse=True)
+def _fresh_history(tmp_path, monkeypatch):
+    monkeypatch.setattr(thoughts, "INDEX_FILE", str(tmp_path / "thoughts.idx"))
+    monkeypatch.setattr(thoughts, "HEAP_FILE", str(tmp_path / "thoughts.heap"))
+    monkeypatch.setattr(thoughts, "_window", thoughts.deque(maxlen=thoughts.WINDOW_SIZE))
+    monkeypatch.setattr(thoughts, "_window_loaded", False)
+    monkeypatch.setattr(thoughts, "_last_tick", 0)
+    monkeypatch.setattr(thoughts, "_rebasing", False)
+
+
+def _thought(n, timestamp=0):
+    return Thought(id=f"t-{n}", timestamp=timestamp, content=f"thought {n}")
+
+
+def test_legacy_thoughts_get_ticks_before_the_current_one():
+    # Model-written timestamps are arbitrary (wall clock, zero, out of order)
+    legacy = [_thought(0, 1_700_000_000), _thought(1, 0), _thought(2, 5)]
+    thoughts.seed_window(legacy, current_tick=10)
+    assert list(thoughts.read_history_columns()["tick"]) == [7, 8, 9]
+    assert [t.id for t in thoughts.iter_history(start_tick=8)] == ["t-1", "t-2"]
+
+
+def test_legacy_ticks_are_clamped_at_zero():
+    thoughts.seed_window([_thought(n) for n in range(3)], current_tick=1)
+    assert list(thoughts.read_history_columns()["tick"]) == [0, 0, 0]
+
+
+def test_appends_behind_the_history_are_rebased():
+    thoughts.append_thoughts(5, [_thought(0)])
+    thoughts.append_thoughts(2, [_thought(1)])  # e.g. state.json was reset
+    thoughts.append_thoughts(6, [_thought(2)])
+    assert list(thoughts.read_history_columns()["tick"]) == [5, 5, 6]
+    assert [t.id for t in thoughts.iter_history(start_tick=5, end_tick=5)] == ["t-0", "t-1"]
+
+
+def test_tags_are_stored_once_and_cut_on_a_character_boundary():
+    tags = ("ümlaut",) * 20_000  # well past the u16 tags length
+    thoughts.append_thoughts(1, [Thought(id="t-tags", timestamp=1, content="x", tags=tags)])
+    columns = thoughts.read_history_columns()
+    with open(thoughts.HEAP_FILE, "rb") as heap:
+        record = heap.read(columns["content_length"][0])
+        assert "ümlaut".encode("utf-8") not in record
+        assert len(heap.read()) == columns["tags_length"][0] <= 0xFFFF
+    stored = thoughts.read_tags(columns["tags_offset"][0], columns["tags_length"][0])
+    assert stored[0] == "ümlaut" and "�" not in stored[-1]
+    [thought] = thoughts.iter_history()
+    assert thought.tags == tuple(stored)
+
+
+def test_records_that_still_carry_their_tags_read_back():
+    from utils.serialization import encode_line
+
+    content = encode_line(_thought(0).to_dict() | {"tags": ["old"]}).encode("utf-8")
+    with open(thoughts.HEAP_FILE, "wb") as heap:
+        heap.write(content + b"old")
+    with open(thoughts.INDEX_FILE, "wb") as idx:
+        idx.write(thoughts._ROW.pack(1, 0.5, 0.5, 0, len(content), len(content), 3))
+    assert [t.tags for t in thoughts.iter_history()] == [("old",)]
+    assert [t.tags for t in thoughts.get_recent_thoughts()] == [("old",)]
@@ -0,0 +1,23 @@
+import time
+
+from actions import tool_runner
+from core import ingest
+from core.percepts import query_percepts
+
+
+def _tool_percepts():
+    return [p.content for p in query_percepts(source="tool")]
+
+
+def test_results_are_written_through_without_an_ingest_writer():
+    assert not ingest.is_running()
+    call_id = tool_runner.submit_call("echo", {"text": "hello"})
+    deadline = time.monotonic() + 5
+    while not any(call_id in c for c in _tool_percepts()) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert any(c.startswith(f"[echo {call_id}] ok") for c in _tool_percepts())
+
+
+def test_rejections_are_written_through_too():
+    tool_runner.submit_call("no-such-tool")
+    assert any("unknown tool 'no-such-tool'" in c for c in _tool_percepts())
@@ -0,0 +1,113 @@
+"""
+Load generator for the percept ingestion service. Runs the service in a
+scratch data directory and floods it from several producer threads, either
+in-process (submit()), over the local TCP socket, or over HTTP.
+
+While the flood runs, a stand-in tick thread reads the recent percepts
+every 10 ms and records how long each read takes, to show the tick loop is
+not blocked by ingestion.
+
+    python -m tools.loadgen [--mode inproc|tcp|http] [--seconds 5] [--producers 4]
+"""
+import argparse
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import urllib.request
+
+
+def _percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("inproc", "tcp", "http"), default="inproc")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--producers", type=int, default=4)
+    parser.add_argument("--http-batch", type=int, default=50, help="percepts per HTTP request")
+    parser.add_argument("--policy", default="drop_newest", choices=("drop_newest", "drop_oldest", "block"))
+    parser.add_argument("--port", type=int, default=17461)
+    args = parser.parse_args()
+
+    os.environ["CONSCIO_DATA_DIR"] = tempfile.mkdtemp(prefix="conscio-loadgen-")
+    from core import ingest
+    from core.percepts import get_recent_percepts
+
+    # Measure raw capacity: no per-source limits for this run.
+    ingest.configure(DROP_POLICY=args.policy, SOURCE_RATE_LIMITS={})
+    if args.mode == "tcp":
+        ingest.configure(TCP_PORT=args.port)
+    elif args.mode == "http":
+        ingest.configure(HTTP_PORT=args.port)
+    stop_service = ingest.start_ingestion(watch_inbox=False)
+    time.sleep(0.2)
+
+    stop = threading.Event()
+    sent = [0] * args.producers
+
+    def produce(i: int) -> None:
+        n = 0
+        if args.mode == "inproc":
+            while not stop.is_set():
+                ingest.submit("load", f"producer {i} message {n}", ["load"])
+                n += 1
+        elif args.mode == "tcp":
+            with socket.create_connection(("127.0.0.1", args.port)) as sock:
+                while not stop.is_set():
+                    lines = "".join(f"producer {i} message {n + k}\n" for k in range(100))
+                    sock.sendall(lines.encode("utf-8"))
+                    n += 100
+        else:
+            url = f"http://127.0.0.1:{args.port}/percepts"
+            while not stop.is_set():
+                body = json.dumps([f"producer {i} message {n + k}" for k in range(args.http_batch)]).encode()
+                req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+                try:
+                    urllib.request.urlopen(req).read()
+                except urllib.error.HTTPError:
+                    pass  # 429: some were dropped; still counted as sent
+                n += args.http_batch
+        sent[i] = n
+
+    read_times = []
+
+    def tick_reader() -> None:
+        while not stop.is_set():
+            start = time.perf_counter()
+            get_recent_percepts(limit=5)
+            read_times.append(time.perf_counter() - start)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=produce, args=(i,)) for i in range(args.producers)]
+    threads.append(threading.Thread(target=tick_reader))
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    time.sleep(0.5)  # let TCP handlers finish their buffered lines
+    stop_service.set()
+    ingest.flush()
+    elapsed = time.perf_counter() - started
+
+    stats = ingest.get_stats()
+    print(f"mode={args.mode} policy={args.policy} producers={args.producers} seconds={elapsed:.1f}")
+    print(f"  sent       {sum(sent):>10,}  ({sum(sent) / elapsed:,.0f}/s)")
+    print(f"  accepted   {stats['accepted']:>10,}  ({stats['accepted'] / elapsed:,.0f}/s)")
+    print(f"  written    {stats['written']:>10,}  in {stats['batches']:,} batches")
+    print(f"  dropped    {stats['dropped']:>10,}")
+    print(
+        f"  tick-side read ms: p50={_percentile(read_times, 0.5) * 1e3:.2f} "
+        f"p99={_percentile(read_times, 0.99) * 1e3:.2f} (n={len(read_times)})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Watch a running mind through its observer snapshots (data/observer/snapshot.json),
+without touching its live files or running anything in its process.
+
+    python -m tools.observe show [--json]
+    python -m tools.observe watch
+    python -m tools.observe serve [--port 7463]      # HTTP endpoints, see core/observer.py
+"""
+import argparse
+import json
+import threading
+
+from core import observer
+
+
+def _summary(data: dict) -> str:
+    decision = data.get("decision") or {}
+    actions = [a.get("type") for a in decision.get("actions", [])]
+    return (
+        f"v{data['version']} tick {data['tick']} ({data.get('tick_seconds', 0) * 1e3:.0f} ms) "
+        f"{decision.get('action', '-')} route={decision.get('route', '-')} "
+        f"thoughts={len(data.get('thoughts') or [])} actions={actions}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("show", help="print the latest snapshot")
+    show.add_argument("--json", action="store_true", help="the whole snapshot instead of a summary")
+    sub.add_parser("watch", help="print one line per published tick")
+    serve = sub.add_parser("serve", help="serve the snapshots over HTTP on localhost")
+    serve.add_argument("--port", type=int, default=7463)
+    parser.add_argument("--file", default=observer.SNAPSHOT_FILE)
+    args = parser.parse_args()
+
+    source = observer.FileSnapshots(args.file)
+    if args.command == "show":
+        snapshot = source.latest()
+        if snapshot is None:
+            raise SystemExit(f"No snapshot at {args.file}")
+        print(json.dumps(snapshot.data(), indent=2) if args.json else _summary(snapshot.data()))
+    elif args.command == "watch":
+        version = 0
+        try:
+            while True:
+                snapshot = source.wait_for(version, timeout=60.0)
+                if snapshot is not None:
+                    version = snapshot.version
+                    print(_summary(snapshot.data()), flush=True)
+        except KeyboardInterrupt:
+            pass
+    else:
+        observer.start_server(args.port, source)
+        print(f"Serving {args.file} on http://127.0.0.1:{args.port}/snapshot (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
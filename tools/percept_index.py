@@ -0,0 +1,48 @@
+"""
+Inspect or rebuild the percept query index (data/percepts.index.jsonl).
+
+    python -m tools.percept_index rebuild
+    python -m tools.percept_index query [--source user] [--tag cli] [--last-seconds 300]
+                                        [--since-tick 120] [--limit 20] [--oldest-first]
+"""
+import argparse
+
+from core import percept_index
+from core.percepts import PERCEPTS_FILE, query_percepts
+from utils import clock
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild", help="drop the sidecar and re-index the whole log")
+    q = sub.add_parser("query", help="print matching percepts")
+    q.add_argument("--source")
+    q.add_argument("--tag")
+    q.add_argument("--last-seconds", type=float)
+    q.add_argument("--since-tick", type=int)
+    q.add_argument("--limit", type=int, default=20)
+    q.add_argument("--oldest-first", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        rows = percept_index.rebuild(PERCEPTS_FILE)
+        print(f"Indexed {rows:,} percepts")
+        return
+
+    since = clock.now() - args.last_seconds if args.last_seconds is not None else None
+    percepts = query_percepts(
+        source=args.source,
+        tag=args.tag,
+        since=since,
+        since_tick=args.since_tick,
+        limit=args.limit,
+        newest_first=not args.oldest_first,
+    )
+    for p in percepts:
+        print(f"{p.timestamp:.3f} [{p.source}] {p.content}  tags={list(p.tags)}")
+    print(f"({len(percepts)} shown; index {percept_index.stats()})")
+
+
+if __name__ == "__main__":
+    main()
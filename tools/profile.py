@@ -0,0 +1,35 @@
+"""
+Send a profiling command to a running mind over its control socket
+(data/profiler.sock). Dumps and summaries appear in data/profiles/.
+
+    python -m tools.profile cprofile [ticks]
+    python -m tools.profile tracemalloc [ticks] [frames]
+    python -m tools.profile sample [ticks] [interval_ms]
+    python -m tools.profile status
+"""
+import argparse
+import socket
+import sys
+
+from utils import profiling
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["cprofile", "tracemalloc", "sample", "status"])
+    parser.add_argument("args", nargs="*")
+    parser.add_argument("--socket", default=profiling.CONTROL_SOCKET)
+    args = parser.parse_args()
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(5.0)
+            conn.connect(args.socket)
+            conn.sendall((" ".join([args.command] + args.args) + "\n").encode("utf-8"))
+            print(conn.makefile("r", encoding="utf-8").readline().strip())
+    except OSError as exc:
+        sys.exit(f"No running mind at {args.socket}: {exc}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Replay a recorded session offline: recorded percepts are fed into a scratch
+data directory at the tick they originally arrived, and the recorded model
+responses answer every call. No sleeps, no network.
+
+Prints per-tick timings, the model calls that did not match the
+recording (wrong layer, no recorded answer, a different prompt), and a
+diff between the replayed final state and the one recorded at the end of
+the live session.
+
+    python -m tools.replay data/recordings/<session> [--workdir DIR] [--per-tick]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, List
+
+# Keys that legitimately differ between a live run and its replay.
+DEFAULT_IGNORE = ("speech_state.last_user_wall_time",)
+
+
+def diff_values(expected: Any, actual: Any, path: str = "") -> List[str]:
+    """Flat list of 'path: expected -> actual' differences."""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        out: List[str] = []
+        for key in sorted(set(expected) | set(actual), key=str):
+            sub = f"{path}.{key}" if path else str(key)
+            if key not in actual:
+                out.append(f"{sub}: missing in replay")
+            elif key not in expected:
+                out.append(f"{sub}: only in replay")
+            else:
+                out.extend(diff_values(expected[key], actual[key], sub))
+        return out
+    if expected != actual:
+        return [f"{path}: {expected!r} -> {actual!r}"]
+    return []
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("session", help="recording directory (data/recordings/<session>)")
+    parser.add_argument("--workdir", help="scratch data dir (default: a new temp dir)")
+    parser.add_argument("--per-tick", action="store_true", help="print every tick's timing")
+    parser.add_argument(
+        "--ignore", nargs="*", default=list(DEFAULT_IGNORE), help="state paths to leave out of the diff"
+    )
+    args = parser.parse_args()
+
+    session_dir = os.path.abspath(args.session)
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="conscio-replay-"))
+    initial_dir = os.path.join(session_dir, "initial")
+    if os.path.isdir(initial_dir):
+        shutil.copytree(initial_dir, workdir, dirs_exist_ok=True)
+
+    # Every module resolves its files from CONSCIO_DATA_DIR at import time.
+    os.environ["CONSCIO_DATA_DIR"] = workdir
+    random.seed(0)
+
+    import main as mind
+    from agents import governor, llm
+    from agents.client import set_client
+    from agents.recording import ReplayClient, load_session, set_seed_word_source
+    from core.percepts import append_percepts
+    from core.records import Percept
+    from core.state import load_state, save_state
+
+    session = load_session(session_dir)
+    if not session["ticks"]:
+        sys.exit(f"No ticks recorded in {session_dir}")
+
+    client = ReplayClient(session)
+    set_client(client)
+    set_seed_word_source(client.seed_words)
+    llm.configure(MAX_RETRIES=0, HEDGING_ENABLED=False)
+    governor.configure(TOKENS_PER_MINUTE_LIMIT=10**12, REQUESTS_PER_MINUTE_LIMIT=10**9)
+
+    percepts = sorted(session["percepts"], key=lambda p: p.get("timestamp", 0))
+    next_percept = 0
+
+    state = load_state()
+    state["tick"] = session["ticks"][0]["tick"] - 1
+    timings: List[float] = []
+    replay_started = time.perf_counter()
+    for recorded in session["ticks"]:
+        due = []
+        while next_percept < len(percepts) and percepts[next_percept].get("timestamp", 0) <= recorded["wall_time"]:
+            due.append(Percept.from_dict(percepts[next_percept]))
+            next_percept += 1
+        append_percepts(due)
+
+        client.begin_tick(recorded["tick"])
+        start = time.perf_counter()
+        state = mind.tick(state)
+        save_state(state)
+        timings.append(time.perf_counter() - start)
+        if args.per_tick:
+            print(f"tick {state['tick']:>6}  {timings[-1] * 1e3:8.2f} ms  calls={len(recorded['calls'])}")
+    total = time.perf_counter() - replay_started
+    client.finish()
+
+    print(f"\nReplayed {len(timings)} ticks in {total:.2f}s (workdir {workdir})")
+    print(
+        f"  tick ms: p50={_percentile(timings, 0.5) * 1e3:.2f} "
+        f"p95={_percentile(timings, 0.95) * 1e3:.2f} max={max(timings) * 1e3:.2f}"
+    )
+    print(f"  unmatched model calls: {client.misses}")
+    print(f"  mismatches against the recording: {len(client.mismatches)}")
+    for line in client.mismatches[:20]:
+        print(f"    {line}")
+
+    if session["final_state"] is None:
+        print("  (no final_state.json recorded; skipping diff)")
+        return
+    differences = [
+        d for d in diff_values(session["final_state"], state) if not any(d.startswith(i) for i in args.ignore)
+    ]
+    print(f"  final state differences: {len(differences)}")
+    for line in differences:
+        print(f"    {line}")
+
+
+if __name__ == "__main__":
+    main()
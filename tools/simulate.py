@@ -0,0 +1,76 @@
+"""
+Long-horizon simulation on a virtual clock: runs main.run against the fake
+model backend in a scratch data directory, with a simulated user message
+every --user-every ticks so the idle timeout does not fire.
+
+Per-tick file writes and snapshots dominate a simulated tick, so the state
+is saved every --save-every ticks (and at the end), an observer snapshot is
+published every --publish-every ticks, and snapshots stay in-process unless
+--observer-file asks for data/observer/snapshot.json as well.
+
+    python -m tools.simulate [--ticks 86400] [--user-every 20] [--workdir DIR]
+                             [--save-every 60] [--publish-every 60] [--observer-file]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+REPO_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=86400)
+    parser.add_argument("--user-every", type=int, default=20)
+    parser.add_argument("--workdir", help="scratch data dir (default: a new temp dir)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save-every", type=int, default=60, help="save the state every N ticks (1: like live)")
+    parser.add_argument("--publish-every", type=int, default=60, help="observer snapshot every N ticks")
+    parser.add_argument("--observer-file", action="store_true", help="also write observer snapshots to disk")
+    args = parser.parse_args()
+
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="conscio-sim-"))
+    os.makedirs(workdir, exist_ok=True)
+    words = os.path.join(REPO_DATA_DIR, "random_words.txt")
+    if os.path.exists(words):
+        shutil.copy2(words, workdir)
+    os.environ["CONSCIO_DATA_DIR"] = workdir
+    random.seed(args.seed)
+
+    # Imported after CONSCIO_DATA_DIR is set so every store lands in workdir.
+    import main as mind
+    from agents.client import set_client
+    from core import observer
+    from agents.fake_client import FakeClient
+    from core.percepts import record_percept
+    from core.state import load_state
+    from utils import clock
+
+    sim_clock = clock.SimulatedClock(start=1_700_000_000.0)
+    clock.set_clock(sim_clock)
+    client = FakeClient(sleep=sim_clock.sleep)
+    set_client(client)
+    observer.configure(PUBLISH_EVERY=max(1, args.publish_every))
+    if not args.observer_file:
+        observer.configure(SNAPSHOT_FILE=None)
+
+    def before_tick(state: dict) -> None:
+        if state["tick"] % args.user_every == 0:
+            record_percept(source="user", content=f"simulated message at tick {state['tick']}", tags=["sim"])
+
+    state = load_state()
+    state["speech_state"]["last_user_wall_time"] = clock.now()
+    started = time.perf_counter()
+    state = mind.run(state, max_ticks=args.ticks, before_tick=before_tick, save_every=max(1, args.save_every))
+    elapsed = time.perf_counter() - started
+
+    simulated = clock.now() - 1_700_000_000.0
+    print(f"Simulated {state['tick']} ticks ({simulated / 3600:.1f}h virtual) in {elapsed:.1f}s wall")
+    print(f"  {state['tick'] / elapsed:,.0f} ticks/s, {client.calls} model calls, workdir {workdir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Make mind templates and fork new minds from them (see core/templates.py).
+
+    python -m tools.template create DEST [--name NAME]   # from the mind in CONSCIO_DATA_DIR
+    python -m tools.template fork TEMPLATE DATA_DIR
+    python -m tools.template info TEMPLATE
+
+Run a fork with CONSCIO_DATA_DIR=DATA_DIR python main.py.
+"""
+import argparse
+import json
+import sys
+import time
+
+from core import templates
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    create = sub.add_parser("create", help="build a template from the current mind")
+    create.add_argument("dest")
+    create.add_argument("--name")
+    fork = sub.add_parser("fork", help="start a new mind backed by a template")
+    fork.add_argument("template")
+    fork.add_argument("data_dir")
+    info = sub.add_parser("info", help="print a template's manifest")
+    info.add_argument("template")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "create":
+            manifest = templates.create_template(args.dest, args.name)
+            print(f"Template {manifest['name']} at {args.dest}: {manifest['memory_items']} memory items")
+        elif args.command == "fork":
+            started = time.perf_counter()
+            templates.fork(args.template, args.data_dir)
+            print(f"Forked {args.template} into {args.data_dir} in {(time.perf_counter() - started) * 1e3:.1f} ms")
+        else:
+            print(json.dumps(templates.Template(args.template).manifest, indent=2))
+    except (FileNotFoundError, FileExistsError) as exc:
+        sys.exit(str(exc))
+
+
+if __name__ == "__main__":
+    main()
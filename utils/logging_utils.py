@@ -1,45 +1,60 @@
 import os
 import threading
-from typing import Any, Dict, List
+from typing import Any, Dict, List, TextIO
+
+from core.records import Thought
+from utils.paths import DATA_DIR
 
 # Log file for internal tick logs
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 LOG_FILE = os.path.join(DATA_DIR, "tick_log.txt")
 
 _log_lock = threading.Lock()
+_log_file: TextIO | None = None  # opened on the first write and kept open
 
 
 def _ensure_log_dir() -> None:
     os.makedirs(DATA_DIR, exist_ok=True)
 
 
-def _write_log_line(line: str) -> None:
-    """Thread-safe append to the internal tick log file."""
-    _ensure_log_dir()
+def _write_log_lines(lines: List[str]) -> None:
+    """Thread-safe append to the internal tick log file, one write for all `lines`."""
+    global _log_file
     with _log_lock:
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(line + "\n")
+        if _log_file is None or _log_file.name != LOG_FILE:
+            if _log_file is not None:
+                _log_file.close()
+            _ensure_log_dir()
+            _log_file = open(LOG_FILE, "a", encoding="utf-8")
+        _log_file.write("".join(line + "\n" for line in lines))
+        _log_file.flush()
+
+
+def _write_log_line(line: str) -> None:
+    _write_log_lines([line])
 
 
-def log_thoughts(tick: int, thoughts: List[Dict[str, Any]]) -> None:
+def log_thoughts(tick: int, thoughts: List[Thought]) -> None:
     """Log subconscious thoughts for this tick to a file (no console spam)."""
     if not thoughts:
         return
 
-    _write_log_line(f"[tick {tick}] Subconscious produced {len(thoughts)} thought(s):")
-    for t in thoughts:
-        content = t.get("content", "")
-        tags = t.get("tags", [])
-        _write_log_line(f"  - {content[:200]}  (tags={tags})")
+    lines = [f"[tick {tick}] Subconscious produced {len(thoughts)} thought(s):"]
+    lines.extend(f"  - {t.content[:200]}  (tags={list(t.tags)})" for t in thoughts)
+    _write_log_lines(lines)
 
 
 def log_decision(tick: int, decision: Dict[str, Any]) -> None:
     """Log conscious decisions for this tick to the file."""
     actions = decision.get("actions", [])
     guidance = decision.get("subconscious_guidance_delta", {})
-    _write_log_line(f"[tick {tick}] Conscious decision:")
-    _write_log_line(f"  Actions: {[a.get('type') for a in actions]}")
-    _write_log_line(f"  Guidance delta: {guidance}")
+    route = f" (route: {decision['route']})" if decision.get("route") else ""
+    _write_log_lines(
+        [
+            f"[tick {tick}] Conscious decision{route}:",
+            f"  Actions: {[a.get('type') for a in actions]}",
+            f"  Guidance delta: {guidance}",
+        ]
+    )
 
 
 def log_internal(message: str) -> None:
@@ -0,0 +1,7 @@
+import os
+
+# Root for every file the mind persists. Set CONSCIO_DATA_DIR to point a
+# process at a different directory (replays, simulations, forked minds).
+DATA_DIR = os.environ.get("CONSCIO_DATA_DIR") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data"
+)
@@ -1,27 +1,300 @@
+"""
+Document persistence shared by the stores.
+
+Writers take a per-file lock: a re-entrant thread lock for this process
+plus an fcntl.flock on a lock file for other processes (thread lock only
+where fcntl is unavailable). Unrelated files never contend. Lock files live
+in LOCK_DIR (data/.locks), named by a hash of the locked file's path, so
+none is left next to the data; processes sharing a file must share
+CONSCIO_DATA_DIR.
+
+Readers take no lock. Every write goes to a private temp file that is
+renamed over the target, so a reader sees the previous or the next
+complete snapshot, never a partial one. `load_versioned` returns a version
+stamp with the snapshot it read; `update_json` is the locked
+read-modify-write to use whenever another process may write the same file.
+
+Large stores are read as streams instead of object graphs: `iter_items`
+yields the elements of a stored list one at a time and `iter_lines` the
+records of an append-only JSON Lines file (written with `append_lines`),
+each holding one read chunk and one item in memory however big the file.
+"""
+import codecs
+import hashlib
 import json
 import os
 import threading
-from typing import Any
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Tuple
+
+from utils.paths import DATA_DIR
+from utils.serialization import (
+    FORMAT_VERSION,
+    SerializationError,
+    decode_document,
+    decode_line,
+    encode_document,
+    encode_line,
+    read_header,
+)
+
+try:
+    import fcntl
+except ImportError:  # not POSIX: in-process locking only
+    fcntl = None  # type: ignore[assignment]
+
+Version = Tuple[int, int, int]  # (inode, mtime_ns, size) of one snapshot
+
+READ_CHUNK_BYTES = 64 * 1024
+LOCK_DIR = os.path.join(DATA_DIR, ".locks")
+_TEXT_FORMATS = {"json", "orjson"}  # formats whose payload is JSON text, so it can be streamed
+
+_locks_guard = threading.Lock()
+_locks: Dict[str, "_FileLock"] = {}
+_stats: Dict[str, Any] = {
+    "writes": 0,
+    "updates": 0,
+    "appends": 0,
+    "lock_waits": 0,
+    "lock_wait_seconds": 0.0,
+    "streamed_items": 0,
+    "stream_fallbacks": 0,
+}
+
+
+class _FileLock:
+    """Re-entrant per-file lock; only the outermost holder takes the flock."""
 
+    def __init__(self, path: str):
+        self.lock_path = os.path.join(LOCK_DIR, hashlib.sha1(path.encode("utf-8")).hexdigest() + ".lock")
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd: int | None = None
 
-_file_lock = threading.Lock()
+    def __enter__(self) -> "_FileLock":
+        started = time.perf_counter()
+        self._thread_lock.acquire()
+        if self._depth == 0 and fcntl is not None:
+            try:
+                os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+                fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except BaseException:
+                self._thread_lock.release()
+                raise
+            self._fd = fd
+        self._depth += 1
+        waited = time.perf_counter() - started
+        if waited > 0.001:
+            _stats["lock_waits"] += 1
+            _stats["lock_wait_seconds"] += waited
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._depth -= 1
+        if self._depth == 0 and self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+
+def file_lock(path: str) -> _FileLock:
+    """The writer lock for `path`, shared by every caller in this process."""
+    key = os.path.realpath(path)
+    with _locks_guard:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = _FileLock(key)
+        return lock
+
+
+def file_version(path: str) -> Version | None:
+    """Version stamp of the current snapshot, or None if the file does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def load_versioned(path: str, default: Any) -> Tuple[Any, Version | None]:
+    """Lock-free read: (document, version stamp of the snapshot it came from)."""
+    try:
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            payload = f.read()
+    except FileNotFoundError:
+        return default, None
+    version = (st.st_ino, st.st_mtime_ns, st.st_size)
+    try:
+        return decode_document(payload), version
+    except SerializationError:
+        return default, version
 
 
 def load_json(path: str, default: Any) -> Any:
-    with _file_lock:
-        if not os.path.exists(path):
-            return default
+    """Load a stored document (any registered format, or legacy pretty JSON)."""
+    return load_versioned(path, default)[0]
+
+
+def _write(path: str, payload: bytes) -> None:
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    _stats["writes"] += 1
+
+
+def save_json(path: str, data: Any, fmt: str | None = None) -> None:
+    """Atomically write `data` with the default (or given) serializer."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    payload = encode_document(data, fmt)
+    with file_lock(path):
+        _write(path, payload)
+
+
+def write_bytes(path: str, payload: bytes) -> None:
+    """Atomically replace `path` with already-encoded bytes."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with file_lock(path):
+        _write(path, payload)
+
+
+def update_json(path: str, fn: Callable[[Any], Any], default: Any, fmt: str | None = None) -> Any:
+    """
+    Read-modify-write `path` under its cross-process lock. `fn` mutates the
+    loaded document in place or returns a replacement; the saved document
+    is returned.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with file_lock(path):
+        data = load_json(path, default)
+        result = fn(data)
+        if result is not None:
+            data = result
+        _write(path, encode_document(data, fmt))
+        _stats["updates"] += 1
+        return data
+
+
+def iter_items(path: str) -> Iterator[Any]:
+    """
+    Stream the elements of a stored list document (see load_json) from the
+    snapshot current when the file was opened. JSON payloads are parsed
+    incrementally; binary formats and non-list documents fall back to a
+    full decode. An unreadable header or one newer than FORMAT_VERSION
+    yields nothing, as load_json would return its default. Items are
+    yielded as they are parsed, so a JSON payload that turns out truncated
+    or malformed part-way yields the items before the damage and then
+    ends, where load_json would return its default instead.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        chunk = f.read(max(READ_CHUNK_BYTES, 256))  # enough for the header line
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return default
+            header = read_header(chunk)
+            if header is not None and int(header.get("version", "0") or 0) > FORMAT_VERSION:
+                return
+        except (SerializationError, ValueError):
+            return
+        if header is not None and header.get("format", "json") not in _TEXT_FORMATS:
+            yield from _decoded_items(chunk + f.read())
+            return
+        utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        buf = utf8.decode(chunk[int(header["_offset"]) :] if header is not None else chunk)
+        decoder = json.JSONDecoder()
+        pos, started, eof = 0, False, False
+        item: Any = None
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            end = -1
+            if pos < len(buf):
+                if not started:
+                    if buf[pos] != "[":
+                        # A legacy document that is not a list: decode it whole
+                        yield from _decoded_items(chunk + f.read())
+                        return
+                    started, pos = True, pos + 1
+                    continue
+                if buf[pos] == "]":
+                    return
+                try:
+                    item, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    end = -1
+                if end >= len(buf) and not eof:
+                    end = -1  # a number or literal may continue in the next chunk
+            if end >= 0:
+                _stats["streamed_items"] += 1
+                yield item
+                pos = end
+                continue
+            if eof:
+                return  # truncated or malformed
+            # Refill; reading at least the buffer's size keeps a huge item linear
+            more = f.read(max(READ_CHUNK_BYTES, len(buf) - pos))
+            eof = not more
+            buf = buf[pos:] + utf8.decode(more, final=eof)
+            pos = 0
+
+
+def _decoded_items(raw: bytes) -> Iterator[Any]:
+    _stats["stream_fallbacks"] += 1
+    try:
+        data = decode_document(raw)
+    except SerializationError:
+        return
+    if isinstance(data, list):
+        yield from data
+
 
+def iter_lines(path: str) -> Iterator[Any]:
+    """
+    Stream the records of an append-only JSON Lines file. A trailing line
+    without its newline (an append in progress) and undecodable lines are
+    skipped.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = decode_line(line)
+            except ValueError:
+                continue
+            _stats["streamed_items"] += 1
+            yield record
 
-def save_json(path: str, data: Any) -> None:
+
+def append_lines(path: str, records: Iterable[Any]) -> int:
+    """Append records to a JSON Lines file under its writer lock. Returns how many were written."""
+    payload = "".join(encode_line(r) + "\n" for r in records).encode("utf-8")
+    if not payload:
+        return 0
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    tmp_path = path + ".tmp"
-    with _file_lock:
-        with open(tmp_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-        os.replace(tmp_path, path)
+    with file_lock(path):
+        with open(path, "ab") as f:
+            f.write(payload)
+    _stats["appends"] += 1
+    return payload.count(b"\n")
+
+
+def get_stats() -> Dict[str, Any]:
+    """Writes, locked updates, and waits (> 1 ms) for a file lock in this process."""
+    out = dict(_stats)
+    out["lock_wait_seconds"] = round(out["lock_wait_seconds"], 6)
+    return out
@@ -0,0 +1,420 @@
+"""
+On-demand profiling of the live tick loop.
+
+Nothing runs until a profile is requested, so the always-on cost is a
+stage-name assignment and an empty-dict check per stage. Requests come
+from a signal (SIGUSR1: cProfile, SIGUSR2: sampler, each for
+DEFAULT_TICKS ticks) or from the local control socket
+(data/profiler.sock; see tools/profile.py), one command per line:
+
+  cprofile [ticks]                 deterministic profile, one per tick stage
+  tracemalloc [ticks] [frames]     heap snapshot after every tick, diffed
+  sample [ticks] [interval_ms]     wall-clock stack sampler of the tick thread
+  status                           what is running or queued
+
+Arguments are range-checked when the command arrives (ticks up to
+MAX_TICKS, frames up to MAX_TRACEMALLOC_FRAMES, interval_ms within
+MIN/MAX_SAMPLE_INTERVAL_MS) and bad ones are rejected in the reply. A
+request is picked up at the start of the next tick. When its ticks are
+done, dumps land in data/profiles/ (.prof per stage for pstats/snakeviz,
+.snapshot for tracemalloc, .folded stacks for flamegraph tools), next to a
+.txt summary ranking the hottest functions per tick stage. A profiler that
+fails is logged and dropped; the failure never reaches the tick loop.
+"""
+import abc
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Tuple
+
+from utils.logging_utils import log_internal
+from utils.paths import DATA_DIR
+
+PROFILES_DIR = os.path.join(DATA_DIR, "profiles")
+CONTROL_SOCKET = os.path.join(DATA_DIR, "profiler.sock")
+DEFAULT_TICKS = 10
+MAX_TICKS = 10_000
+SAMPLE_INTERVAL_MS = 5.0
+MIN_SAMPLE_INTERVAL_MS = 1.0
+MAX_SAMPLE_INTERVAL_MS = 1000.0
+TRACEMALLOC_FRAMES = 10
+MAX_TRACEMALLOC_FRAMES = 100
+SUMMARY_TOP = 15
+
+_stage = "idle"
+_requests: Deque[Tuple[str, List[float]]] = deque()  # filled from signal handlers too, so no lock
+_sessions: Dict[str, "_Session"] = {}
+_stats: Dict[str, int] = {"requested": 0, "completed": 0, "rejected": 0, "failed": 0}
+
+
+def configure(**settings: Any) -> None:
+    """Override module settings, e.g. configure(DEFAULT_TICKS=30, SAMPLE_INTERVAL_MS=2)."""
+    for name, value in settings.items():
+        if name not in globals() or not name.isupper():
+            raise AttributeError(f"Unknown profiling setting: {name}")
+        globals()[name] = value
+
+
+def _dump_path(kind: str, suffix: str) -> str:
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(PROFILES_DIR, f"{kind}-{stamp}-{os.getpid()}{suffix}")
+
+
+class _Session(abc.ABC):
+    kind = ""
+
+    def __init__(self, ticks: int):
+        self.ticks_left = ticks
+        self.ticks = 0
+        self.started = time.perf_counter()
+
+    def switch(self, stage: str) -> None:
+        pass
+
+    def tick_done(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    def finish(self) -> List[str]:
+        """Stop and write the dumps; returns the paths written."""
+
+
+class _CProfileSession(_Session):
+    """One cProfile.Profile per stage, enabled only while that stage runs."""
+
+    kind = "cprofile"
+
+    def __init__(self, ticks: int):
+        super().__init__(ticks)
+        import cProfile
+
+        self._factory = cProfile.Profile
+        self._profiles: Dict[str, Any] = {}
+        self._current: Any = None
+        self.switch(_stage)
+
+    def switch(self, stage: str) -> None:
+        if self._current is not None:
+            self._current.disable()
+        self._current = self._profiles.get(stage)
+        if self._current is None:
+            self._current = self._profiles[stage] = self._factory()
+        self._current.enable()
+
+    def finish(self) -> List[str]:
+        import io
+        import pstats
+
+        if self._current is not None:
+            self._current.disable()
+        paths = []
+        summary = io.StringIO()
+        summary.write(f"cProfile over {self.ticks} ticks; per-tick milliseconds, hottest first by own time\n")
+        for stage, profile in self._profiles.items():
+            path = _dump_path(f"cprofile-{stage}", ".prof")
+            profile.dump_stats(path)
+            paths.append(path)
+            stats = pstats.Stats(profile)
+            rows = sorted(stats.stats.items(), key=lambda kv: -kv[1][2])[:SUMMARY_TOP]
+            total = sum(row[2] for row in stats.stats.values())
+            summary.write(f"\n[{stage}] {total / max(1, self.ticks) * 1e3:.2f} ms/tick own time\n")
+            summary.write(f"  {'own ms':>9}{'cum ms':>9}{'calls':>9}  function\n")
+            for (filename, line, name), (_, calls, own, cum, _) in rows:
+                summary.write(
+                    f"  {own / max(1, self.ticks) * 1e3:>9.3f}{cum / max(1, self.ticks) * 1e3:>9.3f}"
+                    f"{calls:>9}  {name} ({os.path.basename(filename)}:{line})\n"
+                )
+        path = _dump_path("cprofile", ".txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(summary.getvalue())
+        return [path] + paths
+
+
+class _TracemallocSession(_Session):
+    """Snapshot after every tick; the summary lists the biggest growth between ticks."""
+
+    kind = "tracemalloc"
+
+    def __init__(self, ticks: int, frames: int):
+        super().__init__(ticks)
+        import tracemalloc
+
+        self._tm = tracemalloc
+        self._owns_tracing = not tracemalloc.is_tracing()
+        if self._owns_tracing:
+            tracemalloc.start(frames)
+        self._first = self._last = self._snapshot()
+        self._lines: List[str] = []
+
+    def _snapshot(self) -> Any:
+        """A snapshot without the allocations made by tracemalloc and this module."""
+        ignore = [self._tm.Filter(False, self._tm.__file__), self._tm.Filter(False, __file__)]
+        return self._tm.take_snapshot().filter_traces(ignore)
+
+    def tick_done(self) -> None:
+        snapshot = self._snapshot()
+        diff = snapshot.compare_to(self._last, "lineno")
+        grown = sum(d.size_diff for d in diff)
+        traced = self._tm.get_traced_memory()[0]
+        self._lines.append(f"\ntick +{self.ticks}: {grown / 1024:+.1f} KiB, traced {traced / 1024:.0f} KiB")
+        for d in diff[:5]:
+            self._lines.append(f"  {d.size_diff / 1024:+9.1f} KiB {d.count_diff:+7} blocks  {d.traceback[0]}")
+        self._last = snapshot
+
+    def finish(self) -> List[str]:
+        snapshot_path = _dump_path("tracemalloc", ".snapshot")
+        self._last.dump(snapshot_path)
+        overall = self._last.compare_to(self._first, "traceback")
+        if self._owns_tracing:
+            self._tm.stop()
+        path = _dump_path("tracemalloc", ".txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"tracemalloc over {self.ticks} ticks; largest growth since the first tick\n")
+            for d in overall[:SUMMARY_TOP]:
+                f.write(f"  {d.size_diff / 1024:+9.1f} KiB {d.count_diff:+7} blocks\n")
+                for frame in d.traceback.format()[-6:]:
+                    f.write(f"      {frame}\n")
+            f.write("\nper tick:")
+            f.write("\n".join(self._lines) + "\n")
+        return [path, snapshot_path]
+
+
+class _SamplerSession(_Session):
+    """A daemon thread that samples the tick thread's stack every interval."""
+
+    kind = "sample"
+
+    def __init__(self, ticks: int, interval_ms: float):
+        super().__init__(ticks)
+        self._interval = interval_ms / 1000.0
+        self._thread_id = threading.get_ident()
+        self._stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._worker.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self._stacks[(_stage, tuple(reversed(names)))] += 1
+
+    def finish(self) -> List[str]:
+        self._stop.set()
+        self._worker.join()
+        folded_path = _dump_path("sample", ".folded")
+        with open(folded_path, "w", encoding="utf-8") as f:
+            for (stage, names), count in self._stacks.items():
+                f.write(";".join((stage,) + names).replace(" ", "_") + f" {count}\n")
+
+        per_stage: Dict[str, Counter] = {}
+        leaf: Dict[str, Counter] = {}
+        for (stage, names), count in self._stacks.items():
+            per_stage.setdefault(stage, Counter())
+            leaf.setdefault(stage, Counter())
+            for name in set(names):
+                per_stage[stage][name] += count
+            if names:
+                leaf[stage][names[-1]] += count
+        total = sum(self._stacks.values()) or 1
+        path = _dump_path("sample", ".txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"{total} wall-clock samples every {self._interval * 1e3:g} ms over {self.ticks} ticks\n")
+            for stage, counts in sorted(per_stage.items(), key=lambda kv: -sum(leaf[kv[0]].values())):
+                stage_total = sum(leaf[stage].values())
+                f.write(f"\n[{stage}] {stage_total / total:.1%} of samples\n")
+                f.write(f"  {'self':>7}{'total':>7}  function\n")
+                for name, own in leaf[stage].most_common(SUMMARY_TOP):
+                    f.write(f"  {own / total:>7.1%}{counts[name] / total:>7.1%}  {name}\n")
+        return [path, folded_path]
+
+
+def stage(name: str) -> None:
+    """Mark the tick thread as entering `name`; attributes profile samples and time."""
+    global _stage
+    _stage = name
+    if _sessions:
+        for kind, session in list(_sessions.items()):
+            try:
+                session.switch(name)
+            except Exception as exc:
+                log_internal(f"[profiling] {kind} failed entering stage {name}: {exc!r}")
+                _stats["failed"] += 1
+                _finish(kind, session)
+
+
+def _parse_args(kind: str, args: List[str]) -> List[float]:
+    """Checked numeric arguments for `kind` (see module docstring); ValueError says what is wrong."""
+    limits = [("ticks", 1, MAX_TICKS, True)]
+    if kind == "tracemalloc":
+        limits.append(("frames", 1, MAX_TRACEMALLOC_FRAMES, True))
+    elif kind == "sample":
+        limits.append(("interval_ms", MIN_SAMPLE_INTERVAL_MS, MAX_SAMPLE_INTERVAL_MS, False))
+    if len(args) > len(limits):
+        raise ValueError(f"{kind} takes at most {len(limits)} arguments ({', '.join(n for n, *_ in limits)})")
+    values: List[float] = []
+    for arg, (name, low, high, integral) in zip(args, limits):
+        try:
+            value = float(arg)
+        except ValueError:
+            value = math.nan
+        if not low <= value <= high or (integral and not value.is_integer()):  # also rejects nan
+            expected = "an integer" if integral else "a number"
+            raise ValueError(f"{name} must be {expected} from {low:g} to {high:g}, got {arg!r}")
+        values.append(int(value) if integral else value)
+    return values
+
+
+def request(command: str) -> str:
+    """Queue a profiling command (see module docstring). Returns a one-line reply."""
+    words = command.split()
+    if not words:
+        return "error: empty command"
+    kind, args = words[0].lower(), words[1:]
+    if kind == "status":
+        running = ", ".join(f"{s.kind} ({s.ticks_left} ticks left)" for s in _sessions.values()) or "nothing"
+        queued = ", ".join(k for k, _ in _requests) or "nothing"
+        return f"running: {running}; queued: {queued}; stage: {_stage}"
+    if kind not in ("cprofile", "tracemalloc", "sample"):
+        _stats["rejected"] += 1
+        return f"error: unknown command {kind!r}"
+    try:
+        values = _parse_args(kind, args)
+    except ValueError as exc:
+        _stats["rejected"] += 1
+        return f"error: {exc}"
+    _requests.append((kind, values))
+    _stats["requested"] += 1
+    return f"queued {kind} from the next tick"
+
+
+def _start(kind: str, values: List[float]) -> None:
+    if kind in _sessions:
+        log_internal(f"[profiling] {kind} is already running; request ignored")
+        _stats["rejected"] += 1
+        return
+    ticks = int(values[0]) if values else DEFAULT_TICKS
+    if kind == "cprofile":
+        session: _Session = _CProfileSession(ticks)
+    elif kind == "tracemalloc":
+        session = _TracemallocSession(ticks, int(values[1]) if len(values) > 1 else TRACEMALLOC_FRAMES)
+    else:
+        session = _SamplerSession(ticks, values[1] if len(values) > 1 else SAMPLE_INTERVAL_MS)
+    _sessions[kind] = session
+    log_internal(f"[profiling] {kind} started for {ticks} ticks")
+
+
+def _finish(kind: str, session: _Session) -> None:
+    """Stop `session` and write its dumps, logging instead of raising if that fails."""
+    _sessions.pop(kind, None)
+    try:
+        paths = session.finish()
+    except Exception as exc:
+        log_internal(f"[profiling] {kind} failed writing its dumps: {exc!r}")
+        _stats["failed"] += 1
+        return
+    _stats["completed"] += 1
+    log_internal(f"[profiling] {kind} done after {session.ticks} ticks: {paths[0]}")
+
+
+def tick_started() -> None:
+    """Called by the tick loop before each tick; starts queued profiles."""
+    while _requests:
+        kind, values = _requests.popleft()
+        try:
+            _start(kind, values)
+        except Exception as exc:  # e.g. another profiler already active in this process
+            log_internal(f"[profiling] {kind} failed to start: {exc!r}")
+            _stats["failed"] += 1
+
+
+def tick_finished() -> None:
+    """Called by the tick loop after each tick; finishes profiles whose ticks are done."""
+    if not _sessions:
+        stage("idle")
+        return
+    stage("profiler")  # keep the profilers' own bookkeeping out of the tick's stages
+    for kind, session in list(_sessions.items()):
+        session.ticks += 1
+        session.ticks_left -= 1
+        try:
+            session.tick_done()
+        except Exception as exc:
+            log_internal(f"[profiling] {kind} failed after tick +{session.ticks}; stopping it: {exc!r}")
+            _stats["failed"] += 1
+            session.ticks_left = 0
+        if session.ticks_left <= 0:
+            _finish(kind, session)
+    stage("idle")
+
+
+def stop_all() -> None:
+    """Finish every running profile now (e.g. at shutdown) so nothing is lost."""
+    for kind, session in list(_sessions.items()):
+        _finish(kind, session)
+
+
+def get_stats() -> Dict[str, Any]:
+    return dict(_stats, running=sorted(_sessions), queued=len(_requests))
+
+
+def install_signal_handlers() -> bool:
+    """SIGUSR1 queues cProfile, SIGUSR2 the sampler. Main thread and POSIX only."""
+    import signal
+
+    if not hasattr(signal, "SIGUSR1") or threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(signal.SIGUSR1, lambda *_: request("cprofile"))
+    signal.signal(signal.SIGUSR2, lambda *_: request("sample"))
+    return True
+
+
+def start_control_socket(path: str | None = None) -> threading.Event | None:
+    """
+    Serve profiling commands on a Unix socket (owner-only) until the
+    returned event is set. Returns None where Unix sockets are unavailable.
+    """
+    import socket
+
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    path = path or CONTROL_SOCKET
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        os.unlink(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    os.chmod(path, 0o600)
+    server.listen(4)
+    server.settimeout(0.5)
+    stop = threading.Event()
+
+    def _serve() -> None:
+        while not stop.is_set():
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            with conn:
+                conn.settimeout(2.0)
+                try:
+                    line = conn.makefile("r", encoding="utf-8").readline()
+                    conn.sendall((request(line) + "\n").encode("utf-8"))
+                except OSError as exc:
+                    log_internal(f"[profiling] control socket: {exc}")
+        server.close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+    threading.Thread(target=_serve, name="profiler-control", daemon=True).start()
+    return stop
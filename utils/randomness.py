@@ -2,10 +2,13 @@ import os
 import random
 from typing import List
 
+from utils.paths import DATA_DIR
 
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 WORDS_FILE = os.path.join(DATA_DIR, "random_words.txt")
 
+# (mtime, words) of the last parse, so ticks don't re-read an unchanged file
+_pool_cache: tuple[float, List[str]] | None = None
+
 
 def load_word_pool() -> List[str]:
     """
@@ -16,12 +19,24 @@ def load_word_pool() -> List[str]:
       - ignores blank lines and # comments
       - unlimited length
     """
-    if not os.path.exists(WORDS_FILE):
-        return []
+    global _pool_cache
+    path = WORDS_FILE
+    if not os.path.exists(path):
+        # A forked mind uses its template's pool until it has its own
+        from core import templates
+
+        template = templates.active()
+        path = template.file("random_words.txt") if template is not None else None
+        if path is None:
+            return []
+
+    mtime = os.path.getmtime(path)
+    if _pool_cache is not None and _pool_cache[0] == mtime:
+        return list(_pool_cache[1])
 
     words: List[str] = []
 
-    with open(WORDS_FILE, "r", encoding="utf-8") as f:
+    with open(path, "r", encoding="utf-8") as f:
         for line in f:
             line = line.strip()
 
@@ -42,7 +57,8 @@ def load_word_pool() -> List[str]:
             seen.add(w)
             unique_words.append(w)
 
-    return unique_words
+    _pool_cache = (mtime, unique_words)
+    return list(unique_words)
 
 
 def sample_random_seed_words(n: int = 3) -> List[str]:
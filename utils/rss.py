@@ -0,0 +1,107 @@
+"""
+Resident memory ceiling for the mind's process.
+
+The large stores are read as streams (utils.persistence.iter_items and
+iter_lines), so what stays resident between ticks is the bounded hot sets
+and caches that can be rebuilt. check() runs once per tick: above
+MAX_RSS_MB it runs the registered shedders (e.g. the prompt cache),
+collects garbage and asks the C allocator to hand freed pages back to the
+OS, at most once per SHED_INTERVAL_SECONDS, and logs if the process is
+still over the ceiling afterwards. MAX_RSS_MB defaults to the
+CONSCIO_MAX_RSS_MB environment variable; unset or 0 means no ceiling.
+"""
+import gc
+import os
+import sys
+from typing import Any, Callable, Dict
+
+from utils import clock
+from utils.logging_utils import log_internal
+
+MAX_RSS_MB: float | None = float(os.environ.get("CONSCIO_MAX_RSS_MB") or 0) or None
+SHED_INTERVAL_SECONDS = 30.0
+
+_shedders: Dict[str, Callable[[], Any]] = {}
+_malloc_trim: Any = None  # None: not looked up yet; False: unavailable
+_last_shed = float("-inf")
+_stats: Dict[str, Any] = {"checks": 0, "over": 0, "sheds": 0, "peak_mb": 0.0, "last_freed_mb": 0.0}
+
+
+def configure(**settings: Any) -> None:
+    """Override module settings, e.g. configure(MAX_RSS_MB=512)."""
+    for name, value in settings.items():
+        if name not in globals() or not name.isupper():
+            raise AttributeError(f"Unknown rss setting: {name}")
+        globals()[name] = value
+
+
+def register_shedder(name: str, fn: Callable[[], Any]) -> None:
+    """`fn()` drops a cache that can be rebuilt; called when the process is over the ceiling."""
+    _shedders[name] = fn
+
+
+def current_rss_mb() -> float:
+    """Resident set size now (Linux), or the peak so far where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def _trim_allocator() -> None:
+    global _malloc_trim
+    if _malloc_trim is None:
+        try:
+            import ctypes
+
+            _malloc_trim = ctypes.CDLL("libc.so.6").malloc_trim
+        except (OSError, AttributeError):  # not glibc
+            _malloc_trim = False
+    if _malloc_trim:
+        _malloc_trim(0)
+
+
+def shed() -> float:
+    """Run every shedder, collect and trim. Returns the MiB given back."""
+    global _last_shed
+    before = current_rss_mb()
+    for name, fn in list(_shedders.items()):
+        try:
+            fn()
+        except Exception as exc:  # a broken shedder must not break the tick
+            log_internal(f"[rss] shedder {name} failed: {exc!r}")
+    gc.collect()
+    _trim_allocator()
+    _last_shed = clock.now()
+    _stats["sheds"] += 1
+    _stats["last_freed_mb"] = round(max(0.0, before - current_rss_mb()), 1)
+    return _stats["last_freed_mb"]
+
+
+def check() -> bool:
+    """Enforce the ceiling; False if the process is still over it."""
+    _stats["checks"] += 1
+    if not MAX_RSS_MB:
+        return True
+    rss = current_rss_mb()
+    _stats["peak_mb"] = round(max(_stats["peak_mb"], rss), 1)
+    if rss <= MAX_RSS_MB:
+        return True
+    _stats["over"] += 1
+    if clock.now() - _last_shed < SHED_INTERVAL_SECONDS:
+        return False
+    freed = shed()
+    rss = current_rss_mb()
+    if rss > MAX_RSS_MB:
+        log_internal(f"[rss] {rss:.0f} MiB is over the {MAX_RSS_MB:.0f} MiB ceiling after shedding {freed:.1f} MiB")
+        return False
+    return True
+
+
+def get_stats() -> Dict[str, Any]:
+    return dict(_stats, rss_mb=round(current_rss_mb(), 1), max_rss_mb=MAX_RSS_MB)
@@ -0,0 +1,153 @@
+"""
+Pluggable serializers for everything we persist under data/.
+
+Documents written through `encode_document` start with a one-line header:
+
+    #conscio format=json version=1
+
+followed by the encoded payload. Files without the header are legacy
+pretty-printed JSON and are decoded as plain JSON, so old data/ directories
+keep working and get upgraded on their next save.
+
+Backends:
+  - json:    stdlib json, compact separators (always available, default)
+  - orjson:  used when the `orjson` package is installed
+  - msgpack: used when the `msgpack` package is installed (binary)
+
+Pick the backend with the CONSCIO_FORMAT environment variable or
+`set_default_format()`. Unknown or missing backends fall back to json.
+"""
+import json
+import os
+from typing import Any, Callable, Dict, List
+
+HEADER_PREFIX = b"#conscio "
+FORMAT_VERSION = 1
+
+
+class SerializationError(ValueError):
+    """Raised when a stored document cannot be decoded."""
+
+
+class Serializer:
+    __slots__ = ("name", "encode", "decode")
+
+    def __init__(self, name: str, encode: Callable[[Any], bytes], decode: Callable[[bytes], Any]):
+        self.name = name
+        self.encode = encode
+        self.decode = decode
+
+
+_serializers: Dict[str, Serializer] = {}
+
+
+def register_serializer(name: str, encode: Callable[[Any], bytes], decode: Callable[[bytes], Any]) -> None:
+    _serializers[name] = Serializer(name, encode, decode)
+
+
+def available_formats() -> List[str]:
+    return list(_serializers)
+
+
+def _json_encode(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _json_decode(raw: bytes) -> Any:
+    return json.loads(raw)
+
+
+register_serializer("json", _json_encode, _json_decode)
+
+try:
+    import orjson
+except ImportError:  # optional backend
+    orjson = None  # type: ignore[assignment]
+else:
+    register_serializer("orjson", orjson.dumps, orjson.loads)
+
+try:
+    import msgpack
+except ImportError:  # optional backend
+    msgpack = None  # type: ignore[assignment]
+else:
+    register_serializer(
+        "msgpack",
+        lambda data: msgpack.packb(data, use_bin_type=True),
+        lambda raw: msgpack.unpackb(raw, raw=False),
+    )
+
+
+_default_format = os.environ.get("CONSCIO_FORMAT", "json")
+
+
+def set_default_format(name: str) -> None:
+    global _default_format
+    _default_format = name
+
+
+def get_serializer(name: str | None = None) -> Serializer:
+    """Return the named serializer, falling back to json if it isn't installed."""
+    return _serializers.get(name or _default_format) or _serializers["json"]
+
+
+def encode_document(data: Any, fmt: str | None = None) -> bytes:
+    serializer = get_serializer(fmt)
+    header = HEADER_PREFIX + f"format={serializer.name} version={FORMAT_VERSION}\n".encode("ascii")
+    return header + serializer.encode(data)
+
+
+def read_header(raw: bytes) -> Dict[str, str] | None:
+    """Parse the `#conscio ...` header line, or return None for legacy files."""
+    if not raw.startswith(HEADER_PREFIX):
+        return None
+    end = raw.find(b"\n")
+    if end < 0:
+        raise SerializationError("Truncated document header")
+    fields: Dict[str, str] = {}
+    for part in raw[len(HEADER_PREFIX):end].decode("ascii", "replace").split():
+        key, _, value = part.partition("=")
+        fields[key] = value
+    fields["_offset"] = str(end + 1)
+    return fields
+
+
+def decode_document(raw: bytes) -> Any:
+    header = read_header(raw)
+    try:
+        if header is None:
+            # Legacy pretty-printed JSON written before the header existed.
+            return json.loads(raw)
+
+        version = int(header.get("version", "0") or 0)
+        if version > FORMAT_VERSION:
+            raise SerializationError(f"Unsupported document version {version}")
+        name = header.get("format", "json")
+        serializer = _serializers.get(name)
+        if serializer is None:
+            raise SerializationError(f"Serializer '{name}' is not installed")
+        return serializer.decode(raw[int(header["_offset"]):])
+    except SerializationError:
+        raise
+    except Exception as exc:  # backends raise assorted ValueError/TypeError subclasses
+        raise SerializationError(str(exc)) from exc
+
+
+# JSON Lines (append-only logs such as percepts.jsonl) stay plain JSON text,
+# one object per line, but use the fastest JSON encoder available.
+
+if orjson is not None:
+
+    def encode_line(obj: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+    def decode_line(line: str | bytes) -> Any:
+        return orjson.loads(line)
+
+else:
+
+    def encode_line(obj: Any) -> str:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+    def decode_line(line: str | bytes) -> Any:
+        return json.loads(line)